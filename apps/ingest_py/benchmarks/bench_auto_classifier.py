@@ -0,0 +1,196 @@
+"""
+Benchmark de throughput del clasificador de autos (textos por segundo).
+
+Compara ``classify_auto``/``analyze_actuacion`` (``KeywordMatcher``, una
+pasada por texto) con la implementación anterior, que buscaba cada
+patrón por separado (y ``is_auto`` con ``re.search`` por llamada) y
+repetía los del tipo ganador para la confianza.  La referencia usa la
+misma forma canónica del texto (``canonicalize``) y los mismos patrones
+plegados, de modo que solo cambia la estrategia de búsqueda.
+También mide ``analyze_actuacion`` con las clasificaciones ya
+memorizadas (``classification_cache``), como al reanalizar un proceso.
+Antes de medir verifica que ambas dan exactamente el mismo resultado
+en los casos de ``test_auto_detection.py``, en las actuaciones del
+corpus sintético y en textos aleatorios armados con las palabras clave.
+
+Ejecutar desde la raíz del repositorio con:
+    python -m apps.ingest_py.benchmarks.bench_auto_classifier [n_textos]
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from apps.ingest_py.benchmarks.corpus import ANOTACIONES, TIPOS_ACTUACION
+from apps.ingest_py.src.analyzers import auto_classifier
+from apps.ingest_py.src.analyzers.auto_classifier import (
+    AUTO_FOLDED,
+    HINTS_FOLDED,
+    PERENTORIO_KEYWORDS,
+    PERENTORIO_PATTERNS,
+    TRAMITE_KEYWORDS,
+    TRAMITE_PATTERNS,
+    AutoType,
+    analyze_actuacion,
+    classification_cache,
+    classify_auto,
+    is_auto,
+)
+from apps.ingest_py.src.analyzers.text_canon import canonicalize
+from apps.ingest_py.test_auto_detection import TEST_CASES
+
+
+def legacy_classify(texto: str) -> AutoType:
+    """``classify_auto`` previo a ``KeywordMatcher`` (referencia)."""
+    if not texto:
+        return AutoType.UNKNOWN
+    texto_norm = canonicalize(texto)
+    perentorio_matches = sum(1 for pattern in PERENTORIO_PATTERNS if pattern.search(texto_norm))
+    tramite_matches = sum(1 for pattern in TRAMITE_PATTERNS if pattern.search(texto_norm))
+    if perentorio_matches > tramite_matches:
+        return AutoType.PERENTORIO
+    elif tramite_matches > 0:
+        return AutoType.TRAMITE
+    else:
+        if any(keyword in texto_norm for keyword in HINTS_FOLDED):
+            return AutoType.PERENTORIO
+        return AutoType.UNKNOWN
+
+
+def legacy_is_auto(titulo: Any, descripcion: Any = None) -> bool:
+    """``is_auto`` con un ``re.search`` por patrón y llamada (referencia)."""
+    if not titulo:
+        return False
+    texto_completo = canonicalize(titulo)
+    if descripcion:
+        texto_completo += " " + canonicalize(descripcion)
+    return any(re.search(pattern, texto_completo) for pattern in AUTO_FOLDED)
+
+
+def legacy_analyze(actuacion: Dict[str, Any]) -> Dict[str, Any]:
+    """``analyze_actuacion`` previo a ``KeywordMatcher`` (referencia, sin logs)."""
+    tipo = actuacion.get("tipo", "")
+    descripcion = actuacion.get("descripcion", "")
+    es_auto = legacy_is_auto(tipo, descripcion)
+    result = {
+        **actuacion,
+        "is_auto": es_auto,
+        "auto_type": None,
+        "requires_action": False,
+        "classification_confidence": 0.0,
+    }
+    if not es_auto:
+        return result
+    texto_completo = f"{tipo} {descripcion}".strip()
+    auto_type = legacy_classify(texto_completo)
+    result["auto_type"] = auto_type.value
+    result["requires_action"] = auto_type == AutoType.PERENTORIO
+    texto_norm = canonicalize(texto_completo)
+    if auto_type == AutoType.PERENTORIO:
+        matches = sum(1 for p in PERENTORIO_PATTERNS if p.search(texto_norm))
+        confidence = min(matches / 3.0, 1.0)
+    elif auto_type == AutoType.TRAMITE:
+        matches = sum(1 for p in TRAMITE_PATTERNS if p.search(texto_norm))
+        confidence = min(matches / 2.0, 1.0)
+    else:
+        confidence = 0.0
+    result["classification_confidence"] = round(confidence, 2)
+    return result
+
+
+def _keyword_words() -> List[str]:
+    """Palabras sueltas de las palabras clave (sin la sintaxis regex)."""
+    words = []
+    for pattern in PERENTORIO_KEYWORDS + TRAMITE_KEYWORDS:
+        literal = re.sub(r"\\s\+|\\d\+|\.\*|\[ae\]", " 5 ", pattern)
+        words.extend(literal.split())
+    # Variantes sin tildes y en mayúsculas, que la forma canónica unifica
+    words += [canonicalize(w) for w in words] + [w.upper() for w in words]
+    return words + ["auto", "AUTO", "de", "la", "el", "demanda", "días", "Traslado", "ſe", "ıntegra"]
+
+
+def actuaciones(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Actuaciones de prueba: casos del test, corpus sintético y textos aleatorios."""
+    rng = random.Random(seed)
+    words = _keyword_words()
+    acts = [dict(test["actuacion"]) for test in TEST_CASES]
+    while len(acts) < n:
+        if rng.random() < 0.5:
+            descripcion = rng.choice(ANOTACIONES)
+        else:
+            descripcion = " ".join(rng.choice(words) for _ in range(rng.randint(1, 20)))
+        tipo = rng.choice(TIPOS_ACTUACION + ["Auto", "AUTO INTERLOCUTORIO"])
+        acts.append({"tipo": tipo, "descripcion": descripcion})
+    return acts
+
+
+def compare(fns: Dict[str, Callable[[], Any]], n: int, rounds: int = 10) -> Dict[str, float]:
+    """Textos por segundo de cada función (rondas intercaladas, mejor ronda)."""
+    best = dict.fromkeys(fns, float("inf"))
+    for _ in range(rounds):
+        for name, fn in fns.items():
+            start = time.perf_counter()
+            fn()
+            best[name] = min(best[name], time.perf_counter() - start)
+    return {name: n / seconds for name, seconds in best.items()}
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    # analyze_actuacion registra cada auto en INFO
+    logging.getLogger(auto_classifier.__name__).setLevel(logging.WARNING)
+
+    acts = actuaciones(n)
+    textos = [f"{a['tipo']} {a['descripcion']}" for a in acts]
+    for act in acts:
+        assert is_auto(act["tipo"], act["descripcion"]) == legacy_is_auto(act["tipo"], act["descripcion"])
+    for texto in textos:
+        assert classify_auto(texto) == legacy_classify(texto), f"classify_auto difiere: {texto!r}"
+    for _ in range(2):  # La segunda vuelta sale del cache de clasificación
+        for act in acts:
+            assert analyze_actuacion(act) == legacy_analyze(act), f"analyze_actuacion difiere: {act!r}"
+
+    autos = sum(1 for a in acts if is_auto(a["tipo"], a["descripcion"]))
+    print(f"Clasificador de autos: {n} actuaciones ({autos} autos), resultados idénticos")
+
+    classify = compare({
+        "anterior": lambda: [legacy_classify(t) for t in textos],
+        "matcher": lambda: [classify_auto(t) for t in textos],
+    }, n)
+
+    def analyze_cold():
+        # Cache vacío al inicio de cada ronda (los textos repetidos sí aciertan)
+        classification_cache.clear()
+        return [analyze_actuacion(a) for a in acts]
+
+    analyze = compare({
+        "anterior": lambda: [legacy_analyze(a) for a in acts],
+        "matcher": analyze_cold,
+    }, n)
+    for act in acts:  # Memorizar todas antes de medir los hits
+        analyze_actuacion(act)
+    memo = compare({
+        "anterior": lambda: [legacy_analyze(a) for a in acts],
+        "matcher": lambda: [analyze_actuacion(a) for a in acts],
+    }, n)
+    rows = (
+        ("classify_auto", classify),
+        ("analyze_actuacion", analyze),
+        ("  memorizado", memo),
+    )
+    for label, rates in rows:
+        print(
+            f"  {label:<18} anterior {rates['anterior']:>9,.0f} textos/s | "
+            f"nuevo {rates['matcher']:>9,.0f} textos/s | "
+            f"x{rates['matcher'] / rates['anterior']:.2f}"
+        )
+    print(f"  cache de clasificación: {classification_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Regresión de throughput y precisión del clasificador de autos.
+
+Genera un corpus etiquetado grande (``labeled_actuaciones``: plantillas
+propias, las actuaciones de ``generate_realistic_actuaciones`` y los
+casos de ``test_auto_detection.py``) y mide, para ``is_auto``,
+``classify_auto``, ``analyze_actuacion`` y ``batch_analyze``:
+
+- throughput (actuaciones por segundo, mejor de varias rondas), en frío
+  y con caches
+- latencia p99 por actuación (en lotes de ``BATCH`` para ``batch_analyze``)
+- memoria asignada: pico de ``tracemalloc`` por actuación
+- precisión frente a las etiquetas (detección de auto y tipo de auto)
+
+Cada actuación del corpus tiene un texto distinto, así que la primera
+pasada de cada ronda, con los caches vacíos (``classification_cache`` y
+``canonicalize``), mide el clasificador en frío (``acts_per_s``); una
+segunda pasada sobre el mismo corpus mide los aciertos de caché
+(``cached_acts_per_s``).  Los resultados se comparan con una línea base
+en JSON y el proceso termina con código 1 si alguno de los dos
+throughputs cae más de la tolerancia o si la precisión baja.  La línea base depende de la
+máquina: regenerarla con ``--update-baseline`` al cambiar de entorno o
+cuando un cambio de reglas mejora la precisión a propósito.
+
+Ejecutar desde la raíz del repositorio con:
+    python -m apps.ingest_py.benchmarks.bench_classifier_regression [--size N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from apps.ingest_py.benchmarks.corpus import labeled_actuaciones
+from apps.ingest_py.src.analyzers.auto_classifier import (
+    analyze_actuacion,
+    batch_analyze,
+    classification_cache,
+    classify_auto,
+    is_auto,
+)
+from apps.ingest_py.src.analyzers.text_canon import canonicalize
+from apps.ingest_py.test_auto_detection import TEST_CASES
+
+BASELINE_PATH = Path(__file__).with_name("baseline_classifier.json")
+
+# Tamaño de lote de batch_analyze (la latencia se reparte entre sus actuaciones)
+BATCH = 100
+
+# Actuaciones medidas con tracemalloc (lo hace mucho más lento)
+ALLOC_SAMPLE = 2000
+
+
+def _clear_caches() -> None:
+    classification_cache.clear()
+    canonicalize.cache_clear()
+
+
+def _workloads(acts: List[Dict[str, Any]]) -> Dict[str, Tuple[Callable[[Any], Any], List[Any], int]]:
+    """Nombre -> (función, argumentos por llamada, actuaciones por llamada)."""
+    textos = [f"{a['tipo']} {a['descripcion']}" for a in acts]
+    lotes = [acts[i:i + BATCH] for i in range(0, len(acts), BATCH)]
+    return {
+        "is_auto": (lambda a: is_auto(a["tipo"], a["descripcion"]), acts, 1),
+        "classify_auto": (classify_auto, textos, 1),
+        "analyze_actuacion": (analyze_actuacion, acts, 1),
+        "batch_analyze": (batch_analyze, lotes, BATCH),
+    }
+
+
+def _throughput(fn: Callable[[Any], Any], args: List[Any], n: int, rounds: int) -> Tuple[float, float]:
+    """Actuaciones por segundo en frío y con caches (mejor ronda de cada una).
+
+    Cada ronda vacía los caches, recorre el corpus (en frío) y lo vuelve
+    a recorrer (con caches).
+    """
+    cold = cached = float("inf")
+    for _ in range(rounds):
+        _clear_caches()
+        for pass_ in ("cold", "cached"):
+            start = time.perf_counter()
+            for arg in args:
+                fn(arg)
+            elapsed = time.perf_counter() - start
+            if pass_ == "cold":
+                cold = min(cold, elapsed)
+            else:
+                cached = min(cached, elapsed)
+    return n / cold, n / cached
+
+
+def _p99_us(fn: Callable[[Any], Any], args: List[Any], per_call: int) -> float:
+    """Latencia p99 por actuación en microsegundos."""
+    _clear_caches()
+    clock = time.perf_counter_ns
+    samples = []
+    for arg in args:
+        start = clock()
+        fn(arg)
+        samples.append((clock() - start) / per_call)
+    samples.sort()
+    return samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1000
+
+
+def _alloc_per_act(fn: Callable[[Any], Any], args: List[Any], per_call: int) -> float:
+    """Pico de memoria asignada (bytes) por actuación en una muestra del corpus."""
+    sample = args[:max(1, ALLOC_SAMPLE // per_call)]
+    _clear_caches()
+    tracemalloc.start()
+    try:
+        for arg in sample:
+            fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (len(sample) * per_call)
+
+
+def accuracy(corpus: List[Tuple[Dict[str, Any], Optional[str]]]) -> Dict[str, float]:
+    """Precisión del clasificador frente a las etiquetas del corpus."""
+    _clear_caches()
+    autos = [(act, label) for act, label in corpus if label is not None]
+    deteccion = sum(
+        is_auto(act["tipo"], act["descripcion"]) == (label is not None) for act, label in corpus
+    )
+    tipo = sum(
+        classify_auto(f"{act['tipo']} {act['descripcion']}").value == label for act, label in autos
+    )
+    acts = [act for act, _ in corpus]
+    resultados = batch_analyze(acts)
+    if resultados != [analyze_actuacion(act) for act in acts]:
+        raise AssertionError("batch_analyze difiere de analyze_actuacion")
+    total = sum(
+        r["is_auto"] == (label is not None) and (label is None or r["auto_type"] == label)
+        for r, (_, label) in zip(resultados, corpus)
+    )
+    return {
+        "is_auto": round(deteccion / len(corpus), 4),
+        "classify_auto": round(tipo / len(autos), 4),
+        "analyze_actuacion": round(total / len(corpus), 4),
+    }
+
+
+def run(size: int, rounds: int) -> Dict[str, Any]:
+    corpus = labeled_actuaciones(size, base=[
+        (t["actuacion"]["tipo"], t["actuacion"]["descripcion"], t["esperado"]) for t in TEST_CASES
+    ])
+    acts = [act for act, _ in corpus]
+    results = {}
+    for name, (fn, args, per_call) in _workloads(acts).items():
+        cold, cached = _throughput(fn, args, len(acts), rounds)
+        results[name] = {
+            "acts_per_s": round(cold),
+            "cached_acts_per_s": round(cached),
+            "p99_us": round(_p99_us(fn, args, per_call), 2),
+            "alloc_bytes_per_act": round(_alloc_per_act(fn, args, per_call)),
+        }
+    return {
+        "size": size,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "throughput": results,
+        "accuracy": accuracy(corpus),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regresiones frente a la línea base (lista vacía si no hay)."""
+    regressions = []
+    for name, base in baseline["throughput"].items():
+        for key, label in (("acts_per_s", ""), ("cached_acts_per_s", " con caches")):
+            if key not in base:
+                continue
+            rate = current["throughput"].get(name, {}).get(key, 0)
+            floor = base[key] * (1 - tolerance)
+            if rate < floor:
+                regressions.append(
+                    f"{name}{label}: {rate:,.0f} act/s < {floor:,.0f} "
+                    f"(línea base {base[key]:,.0f}, tolerancia {tolerance:.0%})"
+                )
+    for name, base in baseline["accuracy"].items():
+        value = current["accuracy"].get(name, 0.0)
+        if value < base:
+            regressions.append(f"precisión {name}: {value:.4f} < {base:.4f}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000, help="actuaciones del corpus")
+    parser.add_argument("--rounds", type=int, default=5, help="rondas de throughput")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="caída de throughput admitida (fracción)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="guardar los resultados como nueva línea base")
+    args = parser.parse_args()
+
+    # El clasificador registra cada auto en INFO y el scraper cada generación
+    logging.disable(logging.INFO)
+
+    current = run(args.size, args.rounds)
+    print(f"Clasificador de autos: {args.size} actuaciones etiquetadas")
+    for name, r in current["throughput"].items():
+        print(
+            f"  {name:<18} {r['acts_per_s']:>9,} act/s | con caches {r['cached_acts_per_s']:>9,} act/s | "
+            f"p99 {r['p99_us']:>7.1f} µs | "
+            f"{r['alloc_bytes_per_act']:>6,} B/act"
+        )
+    print("  precisión: " + ", ".join(f"{k} {v:.2%}" for k, v in current["accuracy"].items()))
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2, ensure_ascii=False) + "\n")
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"Sin línea base ({args.baseline}); ejecutar con --update-baseline")
+        return 1
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("size") != args.size:
+        print(f"Aviso: la línea base usa {baseline.get('size')} actuaciones")
+    regressions = compare(current, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESIÓN {regression}")
+    if not regressions:
+        print("Sin regresiones frente a la línea base")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
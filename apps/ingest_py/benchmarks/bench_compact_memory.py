@@ -0,0 +1,83 @@
+"""
+Benchmark de memoria: actuaciones como diccionarios con alias frente a
+``CompactCase`` (``__slots__`` + alias expandidos al serializar).
+
+Ejecutar desde la raíz del repositorio con:
+    python -m apps.ingest_py.benchmarks.bench_compact_memory [n_acts ...]
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+from apps.ingest_py.benchmarks.corpus import synthetic_case
+from apps.ingest_py.src.normalizers import compact
+from apps.ingest_py.src.normalizers.compact import CompactCase
+from apps.ingest_py.src.normalizers.rama import normalize_rama_response
+
+SIZES = [500, 1000, 2000]
+
+
+def retained_bytes(build: Callable[[], Any], repeat: int = 3) -> Tuple[Any, int]:
+    """Bytes que siguen vivos tras construir el objeto (datos crudos liberados).
+
+    Se toma el mínimo de varias repeticiones: la primera incluye el
+    crecimiento de estructuras globales (tabla de cadenas internadas).
+    """
+    best = None
+    obj = None
+    for _ in range(repeat):
+        obj = None
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        obj = build()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        best = retained if best is None else min(best, retained)
+    return obj, best
+
+
+def run(n_acts: int):
+    def as_dict():
+        return normalize_rama_response(*synthetic_case(n_acts))
+
+    def as_compact():
+        return CompactCase.from_normalized(normalize_rama_response(*synthetic_case(n_acts)))
+
+    normalized, dict_bytes = retained_bytes(as_dict)
+    packed, compact_bytes = retained_bytes(as_compact)
+
+    # La expansión debe reproducir exactamente la salida del normalizador
+    assert packed.to_dict() == normalized, "to_dict() no coincide con normalize_rama_response"
+
+    start = time.perf_counter()
+    packed.to_dict()
+    expand_ms = (time.perf_counter() - start) * 1000
+
+    json_dict = len(json.dumps(normalized))
+    json_compact = len(json.dumps(compact.encode(packed)))
+
+    print(
+        f"{n_acts:>6} actos | memoria dict {dict_bytes / 1024:>8.0f} KiB "
+        f"compacto {compact_bytes / 1024:>7.0f} KiB ({compact_bytes / dict_bytes:>4.0%}) | "
+        f"JSON {json_dict / 1024:>6.0f} -> {json_compact / 1024:>5.0f} KiB | "
+        f"to_dict {expand_ms:.1f} ms"
+    )
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print("Memoria retenida por un proceso normalizado (tracemalloc)")
+    for n_acts in sizes:
+        run(n_acts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark de la clasificación de autos por páginas con parada temprana.
+
+Genera autos en PDF con la estructura habitual (encabezado,
+consideraciones, sección resolutiva "RESUELVE" ... "NOTIFÍQUESE Y
+CÚMPLASE" y anexos de longitud variable) y compara, para cada
+documento servido por un servidor simulado (``httpx.MockTransport``):
+
+- extracción completa (``extract_document_text``) + ``classify_auto``
+- ``classify_document``: páginas leídas hasta que la clasificación es
+  segura o termina la sección resolutiva
+
+Reporta páginas leídas, tiempo, motivos de parada y coincidencia de la
+clasificación con la extracción completa y con la etiqueta del auto.
+
+Ejecutar desde la raíz del repositorio con:
+    python -m apps.ingest_py.benchmarks.bench_document_classify [documentos]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import httpx
+
+from apps.ingest_py.benchmarks.corpus import pdf_document
+from apps.ingest_py.src.analyzers import document_extractor
+from apps.ingest_py.src.analyzers.auto_classifier import classify_auto
+
+CONSIDERACIONES = [
+    "Procede el Despacho a pronunciarse sobre el escrito allegado por el apoderado",
+    "Revisado el expediente se observa que la parte actora aporto los anexos",
+    "De conformidad con lo previsto en el Codigo General del Proceso",
+    "El memorial fue radicado a traves del correo institucional del Juzgado",
+    "Se verifica la constancia secretarial que antecede",
+]
+
+RESOLUTIVA = {
+    "perentorio": [
+        "PRIMERO: Requierase a la parte demandante para que en el termino de 5 dias allegue los documentos",
+        "SEGUNDO: Lo anterior so pena de decretar el desistimiento tacito",
+        "TERCERO: Corrase traslado por 3 dias de la liquidacion presentada",
+        "CUARTO: Cumplido lo anterior, ingrese el expediente al despacho",
+    ],
+    "tramite": [
+        "PRIMERO: Tengase por notificado por conducta concluyente al demandado",
+        "SEGUNDO: Agreguese al expediente el memorial allegado",
+        "TERCERO: Reconozcase personeria juridica al apoderado",
+    ],
+}
+
+ANEXOS = [
+    "Anexo: copia del certificado de existencia y representacion legal",
+    "Folio de matricula inmobiliaria No. 50C-123456",
+    "Poder especial otorgado al apoderado de la parte demandante",
+    "Liquidacion del credito presentada con corte al mes anterior",
+    "Constancia de envio de la notificacion por correo electronico",
+]
+
+
+def _auto(i: int, label: str, annex_pages: int, rng: random.Random) -> bytes:
+    header = [f"JUZGADO TERCERO CIVIL DEL CIRCUITO - AUTO INTERLOCUTORIO No. {i}",
+              f"Radicado 11001310300320230{i:04d}00"]
+    considerations = [rng.choice(CONSIDERACIONES) for _ in range(rng.randint(30, 60))]
+    operative = ["RESUELVE:"] + RESOLUTIVA[label] + ["NOTIFIQUESE Y CUMPLASE", "El Juez,"]
+    body = header + considerations + operative
+    pages = [body[start:start + 40] for start in range(0, len(body), 40)]
+    pages += [[rng.choice(ANEXOS) for _ in range(40)] for _ in range(annex_pages)]
+    return pdf_document(pages)
+
+
+def _documents(n: int) -> Dict[str, Tuple[bytes, str]]:
+    rng = random.Random(0)
+    return {
+        f"https://docs.rama/auto_{i}.pdf": (
+            _auto(i, label, rng.choice((0, 5, 20, 60, 150)), rng), label
+        )
+        for i, label in enumerate(rng.choice(("perentorio", "tramite")) for _ in range(n))
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    logging.disable(logging.WARNING)
+    docs = _documents(n)
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=docs[str(request.url)][0])
+    )
+    original = httpx.AsyncClient
+    httpx.AsyncClient = lambda **kwargs: original(transport=transport, **kwargs)
+    document_extractor.document_store = None
+
+    async def completo() -> List[str]:
+        results = []
+        for url in docs:
+            text = await document_extractor.extract_document_text(url, use_ocr=False)
+            results.append(classify_auto(text).value)
+        return results
+
+    async def por_paginas() -> List[Dict]:
+        return [await document_extractor.classify_document(url, use_ocr=False) for url in docs]
+
+    try:
+        start = time.perf_counter()
+        full = asyncio.run(completo())
+        full_s = time.perf_counter() - start
+        start = time.perf_counter()
+        early = asyncio.run(por_paginas())
+        early_s = time.perf_counter() - start
+    finally:
+        httpx.AsyncClient = original
+
+    labels = [label for _, label in docs.values()]
+    total_pages = sum(r["pages_total"] for r in early)
+    read_pages = sum(r["pages_read"] for r in early)
+    agree = sum(r["auto_type"] == f for r, f in zip(early, full))
+    print(f"{n} autos en PDF, {total_pages} páginas en total")
+    print(f"  extracción completa  {full_s:>6.2f} s | {total_pages:>5} páginas | "
+          f"acierto {sum(f == l for f, l in zip(full, labels)) / n:.0%}")
+    print(f"  por páginas          {early_s:>6.2f} s | {read_pages:>5} páginas "
+          f"({read_pages / total_pages:.0%}) | acierto "
+          f"{sum(r['auto_type'] == l for r, l in zip(early, labels)) / n:.0%} | x{full_s / early_s:.1f}")
+    print(f"  coincide con la extracción completa: {agree}/{n}")
+    print("  paradas: " + ", ".join(f"{k or 'documento completo'} {v}"
+                                    for k, v in Counter(r["stopped"] for r in early).items()))
+
+
+if __name__ == "__main__":
+    main()
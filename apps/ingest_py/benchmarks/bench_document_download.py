@@ -0,0 +1,92 @@
+"""
+Benchmark de memoria de la descarga de documentos.
+
+Compara el pico de memoria asignada (``tracemalloc``) al descargar un
+documento grande a memoria (``download_document``) y en streaming a
+disco (``download_document_to_file``), con un servidor simulado
+(``httpx.MockTransport``) que entrega el documento en bloques.  Verifica
+que el archivo y el SHA-256 calculado durante la descarga coinciden con
+el contenido.
+
+Ejecutar desde la raíz del repositorio con:
+    python -m apps.ingest_py.benchmarks.bench_document_download [MB]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Tuple
+
+import httpx
+
+from apps.ingest_py.src.analyzers import document_extractor
+from apps.ingest_py.src.analyzers.document_extractor import download_document_to_file
+
+
+class _Chunks(httpx.AsyncByteStream):
+    """Cuerpo de respuesta entregado en bloques de 64 KiB."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def __aiter__(self):
+        view = memoryview(self.data)
+        for start in range(0, len(view), 64 * 1024):
+            yield bytes(view[start:start + 64 * 1024])
+
+
+def _measure(fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, float, float]:
+    """Resultado, pico de memoria (MB) y segundos de una corrutina."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = asyncio.run(fn())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / 1024 / 1024, time.perf_counter() - start
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    logging.disable(logging.INFO)
+    data = os.urandom(size_mb * 1024 * 1024)
+    expected = hashlib.sha256(data).hexdigest()
+    headers = {"content-type": "application/pdf", "content-length": str(len(data))}
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, headers=headers, stream=_Chunks(data)))
+    document_extractor.DOCUMENT_MAX_BYTES = 0
+
+    async def to_memory():
+        # download_document crea su propio cliente: se sustituye el transporte
+        original = httpx.AsyncClient
+        httpx.AsyncClient = lambda **kwargs: original(transport=transport, **kwargs)
+        try:
+            return await document_extractor.download_document("https://docs/expediente.pdf")
+        finally:
+            httpx.AsyncClient = original
+
+    with tempfile.TemporaryDirectory() as directory:
+        async def to_disk():
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await download_document_to_file("https://docs/expediente.pdf", directory, client=client)
+
+        content, memory_peak, memory_s = _measure(to_memory)
+        assert content == data
+        del content
+        document, disk_peak, disk_s = _measure(to_disk)
+        assert document.sha256 == expected and document.path.read_bytes() == data
+
+    print(f"Descarga de un documento de {size_mb} MB")
+    print(f"  a memoria   pico {memory_peak:>8.1f} MB | {memory_s:.2f} s")
+    print(f"  a disco     pico {disk_peak:>8.1f} MB | {disk_s:.2f} s (sha256 verificado)")
+
+
+if __name__ == "__main__":
+    main()
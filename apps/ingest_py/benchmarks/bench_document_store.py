@@ -0,0 +1,125 @@
+"""
+Benchmark del almacén de documentos y texto extraído.
+
+Simula consultas repetidas de ``extract_document_text`` sobre un
+conjunto de autos en PDF (con repeticiones sesgadas, como cuando varias
+vigilancias consultan los mismos procesos, y algunas URLs distintas con
+el mismo documento).  Un servidor simulado (``httpx.MockTransport``)
+entrega PDFs con texto generados al vuelo y cuenta los bytes servidos.
+Compara el tiempo y los bytes descargados sin almacén, con almacén y
+con un almacén pequeño que obliga a desalojar, y reporta las tasas de
+acierto.
+
+Ejecutar desde la raíz del repositorio con:
+    python -m apps.ingest_py.benchmarks.bench_document_store [consultas]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from apps.ingest_py.benchmarks.corpus import ANOTACIONES, pdf_document
+from apps.ingest_py.src.analyzers import document_extractor
+from apps.ingest_py.src.storage.document_store import DocumentStore
+
+DOCUMENTS = 40
+PAGES = 30
+# URLs adicionales que entregan el mismo contenido que otra
+ALIASES = 5
+
+
+def _documents() -> Dict[str, bytes]:
+    """URL -> PDF; las últimas ``ALIASES`` URLs repiten documentos."""
+    rng = random.Random(0)
+    docs = {}
+    for i in range(DOCUMENTS):
+        lines = [a.encode("ascii", "ignore").decode() for a in rng.sample(ANOTACIONES[:-1], 8)]
+        docs[f"https://docs.rama/auto_{i}.pdf"] = pdf_document(
+            [[f"AUTO No. {i}"] + [f"{line} - pagina {page}" for line in lines] for page in range(1, PAGES + 1)]
+        )
+    originals = list(docs.values())
+    for i in range(ALIASES):
+        docs[f"https://docs.rama/copia_{i}.pdf"] = originals[i]
+    return docs
+
+
+def _requests(urls: List[str], n: int) -> List[str]:
+    """Consultas sesgadas: pocos autos concentran la mayoría."""
+    rng = random.Random(1)
+    weights = [1 / (rank + 1) for rank in range(len(urls))]
+    return rng.choices(urls, weights, k=n)
+
+
+def _run(docs: Dict[str, bytes], requests: List[str], store: Optional[DocumentStore]) -> Dict[str, float]:
+    served = {"bytes": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = docs[str(request.url)]
+        served["bytes"] += len(body)
+        return httpx.Response(200, headers={"content-type": "application/pdf"}, content=body)
+
+    transport = httpx.MockTransport(handler)
+    original = httpx.AsyncClient
+    httpx.AsyncClient = lambda **kwargs: original(transport=transport, **kwargs)
+    document_extractor.document_store = store
+
+    async def consultas():
+        texts = {}
+        for url in requests:
+            text = await document_extractor.extract_document_text(url, use_ocr=False)
+            assert text and texts.setdefault(url, text) == text
+        return texts
+
+    try:
+        start = time.perf_counter()
+        asyncio.run(consultas())
+        elapsed = time.perf_counter() - start
+    finally:
+        httpx.AsyncClient = original
+        document_extractor.document_store = None
+    return {"seconds": elapsed, "downloaded": served["bytes"]}
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    logging.disable(logging.WARNING)
+    docs = _documents()
+    requests = _requests(list(docs), n)
+    total_docs = sum(len(body) for body in docs.values())
+    print(
+        f"{n} consultas sobre {len(docs)} URLs ({DOCUMENTS} documentos de {PAGES} páginas, "
+        f"{total_docs / 1024 / 1024:.1f} MB en total)"
+    )
+
+    base = _run(docs, requests, None)
+    print(f"  sin almacén          {base['seconds']:>6.2f} s | descargado {base['downloaded'] / 1024 / 1024:>7.1f} MB")
+
+    for label, max_bytes in (("almacén sin límite", 0), ("almacén de 1/4", total_docs // 4)):
+        with tempfile.TemporaryDirectory() as directory:
+            store = DocumentStore(directory, max_bytes=max_bytes)
+            result = _run(docs, requests, store)
+            st = store.stats()
+            store.close()
+        print(
+            f"  {label:<20} {result['seconds']:>6.2f} s | descargado "
+            f"{result['downloaded'] / 1024 / 1024:>7.1f} MB | x{base['seconds'] / result['seconds']:.1f}"
+        )
+        print(
+            f"    aciertos URL {st['url_hit_rate']:.1%}, texto {st['text_hit_rate']:.1%} | "
+            f"ahorrado {st['bytes_saved'] / 1024 / 1024:.1f} MB y "
+            f"{st['extraction_seconds_saved']:.2f} s de extracción | "
+            f"{st['deduplicated']} duplicados, {st['evictions']} desalojos, "
+            f"{st['bytes'] / 1024 / 1024:.1f} MB en disco"
+        )
+
+
+if __name__ == "__main__":
+    main()
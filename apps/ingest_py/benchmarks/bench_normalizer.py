@@ -0,0 +1,334 @@
+"""
+Benchmark de throughput del normalizador (actuaciones por segundo).
+
+Compara ``normalize_rama_response`` (resolver de alias declarativo con
+extractor especializado por familia) con la implementación anterior de
+cadenas ``a.get(...) or a.get(...)``, copiada abajo como referencia, y
+verifica que ambas producen exactamente la misma salida para cada
+familia de alias (API v2, API v1, Playwright, scraper y mezclas).
+
+También mide el refresco incremental de un proceso cacheado
+(``previous_acts``): normalizar y compactar la lista completa frente a
+normalizar solo las actuaciones nuevas y reutilizar la cola.
+
+Ejecutar desde la raíz del repositorio con:
+    python -m apps.ingest_py.benchmarks.bench_normalizer [n_acts]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from apps.ingest_py.benchmarks.corpus import synthetic_case
+from apps.ingest_py.src.normalizers.compact import CompactCase
+from apps.ingest_py.src.normalizers.rama import _hash, _text, normalize_rama_response
+
+
+def legacy_normalize(raw: Dict[str, Any], actuaciones_raw: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Implementación previa al resolver de alias (referencia)."""
+    # Si la respuesta contiene una lista de procesos, tomar el primero
+    if isinstance(raw, dict) and isinstance(raw.get("Procesos"), list):
+        detalle = (raw["Procesos"][0] if raw["Procesos"] else {}) or {}
+    elif isinstance(raw, dict) and isinstance(raw.get("procesos"), list):
+        detalle = (raw["procesos"][0] if raw["procesos"] else {}) or {}
+    else:
+        detalle = raw or {}
+
+    # Extraer campos principales del proceso (radicado, jurisdicción, etc.)
+    radicado = _text(
+        detalle.get("Radicado")
+        or detalle.get("numeroRadicacion")
+        or detalle.get("llaveProceso")
+    )
+    jurisdiccion = _text(
+        detalle.get("Jurisdiccion")
+        or detalle.get("jurisdiccion")
+        or detalle.get("departamento")
+    )
+    juzgado = _text(
+        detalle.get("Despacho")
+        or detalle.get("juzgado")
+        or detalle.get("despacho")
+    )
+    estado_actual = _text(
+        detalle.get("Estado")
+        or detalle.get("estadoActual")
+    )
+
+    # Campos adicionales de Rama Judicial
+    id_proceso_rama = detalle.get("idProceso")
+    fecha_radicacion = _text(detalle.get("fechaProceso"))
+    fecha_ultima_actuacion = _text(detalle.get("fechaUltimaActuacion"))
+    es_privado = detalle.get("esPrivado", False)
+    ponente = _text(detalle.get("ponente"))
+    clase_proceso = _text(detalle.get("clase"))
+    subclase_proceso = _text(detalle.get("subClase"))
+    tipo_proceso = _text(detalle.get("tipoProceso") or detalle.get("tipoProcesoRadicacion"))
+    ubicacion_expediente = _text(detalle.get("ubicacion"))
+    recurso = _text(detalle.get("recurso"))
+    contenido_radicacion = _text(detalle.get("contenidoRadicacion"))
+
+    case: Dict[str, Any] = {
+        "radicado": radicado,
+        "jurisdiccion": jurisdiccion,
+        "juzgado": juzgado,
+        "court": juzgado,  # Alias para compatibilidad con Laravel
+        "despacho": juzgado,  # Alias adicional
+        "status": estado_actual,  # Alias para compatibilidad
+        "estado_actual": estado_actual,
+        "fuente": "RAMA_API",
+        # Campos adicionales de Rama Judicial
+        "id_proceso": id_proceso_rama,  # Alias para Laravel
+        "id_proceso_rama": id_proceso_rama,
+        "fecha_radicacion": fecha_radicacion,
+        "fecha_ultima_actuacion": fecha_ultima_actuacion,
+        "es_privado": es_privado,
+        "ponente": ponente,
+        "clase_proceso": clase_proceso,
+        "subclase_proceso": subclase_proceso,
+        "tipo_proceso": tipo_proceso,
+        "ubicacion_expediente": ubicacion_expediente,
+        "recurso": recurso,
+        "contenido_radicacion": contenido_radicacion,
+    }
+
+    # Normalizar partes
+    parties: List[Dict[str, Optional[str]]] = []
+    partes_raw = detalle.get("Partes") or detalle.get("partes")
+
+    # Si viene en formato lista
+    if isinstance(partes_raw, list) and len(partes_raw) > 0:
+        for p in partes_raw:
+            rol = _text(p.get("Rol") or p.get("rol"))
+            nombre = _text(p.get("Nombre") or p.get("nombre"))
+            documento = _text(p.get("Documento") or p.get("documento"))
+            parties.append({
+                "rol": rol,
+                "role": rol,  # Alias para Laravel
+                "nombre": nombre,
+                "name": nombre,  # Alias para Laravel
+                "documento": documento,
+            })
+    # Si viene en formato string "Demandado: NOMBRE | Fiscalia: NOMBRE2"
+    elif isinstance(detalle.get("sujetosProcesales"), str):
+        sujetos_str = detalle.get("sujetosProcesales", "")
+        for parte_str in sujetos_str.split("|"):
+            parte_str = parte_str.strip()
+            if ":" in parte_str:
+                rol, nombre = parte_str.split(":", 1)
+                # Filtrar entradas que no son partes reales (como "Numero Interno")
+                if rol.strip().lower() not in ["numero interno", "número interno"]:
+                    rol_text = _text(rol.strip())
+                    nombre_text = _text(nombre.strip())
+                    parties.append({
+                        "rol": rol_text,
+                        "role": rol_text,  # Alias para Laravel
+                        "nombre": nombre_text,
+                        "name": nombre_text,  # Alias para Laravel
+                        "documento": None,
+                    })
+
+    # Normalizar actuaciones
+    acts: List[Dict[str, Optional[str]]] = []
+
+    # Si se pasaron actuaciones por separado (API v2)
+    if actuaciones_raw and isinstance(actuaciones_raw.get("actuaciones"), list):
+        acts_raw = actuaciones_raw["actuaciones"]
+    else:
+        # Buscar en el detalle del proceso (API v1 o legacy)
+        acts_raw = detalle.get("Actuaciones") or detalle.get("actuaciones") or []
+
+    if isinstance(acts_raw, list):
+        for a in acts_raw:
+            # API v2 usa fechaActuacion, actuacion, anotacion
+            fecha = _text(
+                a.get("fechaActuacion") or
+                a.get("Fecha") or
+                a.get("fecha")
+            )
+            tipo = _text(
+                a.get("actuacion") or
+                a.get("Tipo") or
+                a.get("tipo")
+            )
+            # Separar anotación y descripción según estándar Rama Judicial
+            anotacion = _text(
+                a.get("anotacion") or
+                a.get("Anotacion")
+            )
+            # Descripción adicional de observación
+            descripcion = _text(
+                a.get("Observacion") or
+                a.get("observacion") or
+                a.get("Descripcion") or
+                a.get("descripcion")
+            )
+
+            # Verificar si tiene documentos
+            con_documentos = a.get("conDocumentos", False)
+            doc_url = _text(a.get("DocumentoURL") or a.get("documentoUrl") or a.get("documento_url"))
+
+            # Campos adicionales de Rama Judicial (plazos e identificadores)
+            id_reg_actuacion = a.get("idRegActuacion")
+            cons_actuacion = a.get("consActuacion")
+            fecha_inicial = _text(a.get("fechaInicial"))
+            fecha_final = _text(a.get("fechaFinal"))  # CRÍTICO para alertas de plazos
+            fecha_registro = _text(a.get("fechaRegistro"))
+            cod_regla = _text(a.get("codRegla"))
+
+            # Crear título combinado para visualización
+            title = anotacion if anotacion else descripcion
+
+            uniq_key = _hash(fecha, tipo, anotacion or descripcion)
+            acts.append({
+                "fecha": fecha,
+                "date": fecha,  # Alias para Laravel
+                "tipo": tipo,
+                "type": tipo,  # Alias para Laravel
+                "actuacion": tipo,  # Nombre oficial Rama Judicial
+                "anotacion": anotacion,  # Campo oficial Rama Judicial
+                "descripcion": descripcion,
+                "title": title,  # Alias para Laravel
+                "description": descripcion,  # Alias adicional
+                "documento_url": doc_url,
+                "con_documentos": con_documentos,
+                "origen": "RAMA_API",
+                "uniq_key": uniq_key,
+                "hash": uniq_key,  # Alias para compatibilidad
+                # Campos adicionales de Rama Judicial
+                "id_reg_actuacion": id_reg_actuacion,
+                "cons_actuacion": cons_actuacion,
+                "fecha_inicial": fecha_inicial,
+                "fecha_final": fecha_final,
+                "fecha_registro": fecha_registro,
+                "cod_regla": cod_regla,
+            })
+
+    return {
+        "case": case,
+        "parties": parties,
+        "acts": acts,
+    }
+
+
+def _rename(acts: List[Dict[str, Any]], mapping: Dict[str, Optional[str]]) -> List[Dict[str, Any]]:
+    """Renombra (o elimina, con ``None``) claves para simular otra familia."""
+    renamed = []
+    for act in acts:
+        out = {}
+        for key, value in act.items():
+            target = mapping.get(key, key)
+            if target is not None:
+                out[target] = value
+        renamed.append(out)
+    return renamed
+
+
+def families(n_acts: int) -> Dict[str, Any]:
+    """Payloads de cada familia de alias con ``n_acts`` actuaciones."""
+    proceso, actuaciones = synthetic_case(n_acts)
+    v2 = actuaciones["actuaciones"]
+    v1 = _rename(v2, {
+        "fechaActuacion": "Fecha", "actuacion": "Tipo", "anotacion": "Anotacion",
+        "conDocumentos": None, "fechaInicial": None,
+    })
+    for i, act in enumerate(v1):
+        act["Observacion"] = "  " if i % 7 == 0 else f"Observación {i}"
+        act["DocumentoURL"] = f"https://example.org/doc/{i}.pdf" if i % 5 == 0 else ""
+    playwright = [
+        {"fecha": a["fechaActuacion"][:10], "actuacion": a["actuacion"],
+         "anotacion": a["anotacion"] or "", "tiene_archivo": False}
+        for a in v2
+    ]
+    scraper = [
+        {"fecha": a["fechaActuacion"][:10], "tipo": a["actuacion"],
+         "descripcion": a["anotacion"], "documento_url": None, "origen": "web_scraping"}
+        for a in v2
+    ]
+    # Mezcla: claves distintas a las del primer registro cada pocos actos
+    mixed = [dict(a) for a in v2]
+    for i, act in enumerate(mixed):
+        if i % 3 == 0:
+            act.pop("anotacion", None)
+            act["Descripcion"] = 0 if i % 2 else "   "
+        if i % 4 == 0:
+            act["Fecha"] = "2020-01-01"
+            act["fechaActuacion"] = ""
+    return {
+        "api_v2": (proceso, {"actuaciones": v2}),
+        "api_v1": ({"Procesos": [{"Radicado": " 123 ", "Actuaciones": v1}]}, None),
+        "playwright": ({"procesos": [{"llaveProceso": "123"}]}, {"actuaciones": playwright}),
+        "scraper": ({"actuaciones": scraper}, None),
+        "mixta": (proceso, {"actuaciones": mixed}),
+    }
+
+
+def compare(payload, n_acts: int, rounds: int = 30) -> Tuple[float, float]:
+    """Actuaciones por segundo (anterior, resolver).
+
+    Las dos implementaciones se ejecutan intercaladas y se toma la mejor
+    ronda de cada una, para que el ruido de la máquina afecte a ambas.
+    """
+    best = {legacy_normalize: float("inf"), normalize_rama_response: float("inf")}
+    for _ in range(rounds):
+        for fn in best:
+            start = time.perf_counter()
+            fn(*payload)
+            best[fn] = min(best[fn], time.perf_counter() - start)
+    return n_acts / best[legacy_normalize], n_acts / best[normalize_rama_response]
+
+
+def refresh(n_acts: int, n_new: int, rounds: int = 30) -> Tuple[float, float]:
+    """Milisegundos por refresco (completo, incremental) con ``n_new`` actuaciones nuevas.
+
+    Ambos caminos incluyen guardar el resultado como ``CompactCase``,
+    como hace el cliente tras cada consulta.
+    """
+    proceso_raw, actuaciones_raw = synthetic_case(n_acts)
+    previous = {"actuaciones": actuaciones_raw["actuaciones"][n_new:]}
+    cached = CompactCase.from_normalized(normalize_rama_response(proceso_raw, previous))
+
+    def full():
+        return CompactCase.from_normalized(normalize_rama_response(proceso_raw, actuaciones_raw))
+
+    def incremental():
+        previous_acts, reuse = cached.act_dicts()
+        normalized = normalize_rama_response(proceso_raw, actuaciones_raw, previous_acts)
+        return CompactCase.from_normalized(normalized, reuse)
+
+    assert incremental().to_dict() == full().to_dict(), "El modo incremental cambia la salida"
+    best = {full: float("inf"), incremental: float("inf")}
+    for _ in range(rounds):
+        for fn in best:
+            start = time.perf_counter()
+            fn()
+            best[fn] = min(best[fn], time.perf_counter() - start)
+    return best[full] * 1000, best[incremental] * 1000
+
+
+def main():
+    n_acts = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print(f"Normalizador: {n_acts} actuaciones por proceso")
+    for family, payload in families(n_acts).items():
+        assert normalize_rama_response(*payload) == legacy_normalize(*payload), (
+            f"Salida distinta para la familia {family}"
+        )
+        old, new = compare(payload, n_acts)
+        print(
+            f"  {family:<11} anterior {old:>10,.0f} actos/s | "
+            f"resolver {new:>10,.0f} actos/s | x{new / old:.2f}"
+        )
+
+    print(f"Refresco de un proceso cacheado con {n_acts} actuaciones")
+    for n_new in (1, 5, 50):
+        full_ms, incremental_ms = refresh(n_acts, n_new)
+        print(
+            f"  {n_new:>3} nuevas  completo {full_ms:>6.2f} ms | "
+            f"incremental {incremental_ms:>6.2f} ms | x{full_ms / incremental_ms:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark del motor vectorial del clasificador de autos.
+
+Compara ``batch_analyze`` con el motor de reglas (``engine="rules"``)
+y con el vectorial (``engine="vector"``, n-gramas hasheados puntuados
+con NumPy) al reclasificar un corpus grande con los caches vacíos:
+
+- throughput (actuaciones por segundo, mejor de varias rondas) de
+  ``batch_analyze`` completo y solo de la clasificación (sin el cache
+  ni la copia de cada actuación)
+- en dos corpus: textos armados con las palabras clave (muchas
+  palabras por actuación) y actuaciones etiquetadas (textos cortos y
+  repetidos, cada una con su ``uniq_key``, como al reclasificar todo)
+- coincidencia de la clasificación del motor vectorial con las reglas
+  (``is_auto``/``auto_type`` y confianza)
+- precisión frente a las etiquetas de ``labeled_actuaciones`` con los
+  pesos iniciales (palabras clave) y reentrenados fuera de línea con
+  otro corpus etiquetado (otra semilla)
+
+Ejecutar desde la raíz del repositorio con:
+    python -m apps.ingest_py.benchmarks.bench_vector_classifier [n_actuaciones]
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from apps.ingest_py.benchmarks.bench_auto_classifier import actuaciones
+from apps.ingest_py.benchmarks.corpus import labeled_actuaciones
+from apps.ingest_py.src.analyzers.auto_classifier import (
+    _classify_texts,
+    batch_analyze,
+    classification_cache,
+    get_vector_model,
+)
+from apps.ingest_py.src.analyzers.text_canon import canonicalize
+from apps.ingest_py.src.analyzers.vector_classifier import VectorClassifier
+from apps.ingest_py.test_auto_detection import TEST_CASES
+
+
+def _cold(engine: str, acts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    classification_cache.clear()
+    canonicalize.cache_clear()
+    return batch_analyze(acts, engine)
+
+
+def throughput(fns: Dict[str, Callable[[], Any]], n: int, rounds: int = 3) -> Dict[str, float]:
+    """Actuaciones por segundo de cada función (rondas intercaladas, mejor ronda)."""
+    best = dict.fromkeys(fns, float("inf"))
+    for _ in range(rounds):
+        for name, fn in fns.items():
+            canonicalize.cache_clear()
+            start = time.perf_counter()
+            fn()
+            best[name] = min(best[name], time.perf_counter() - start)
+    return {name: n / seconds for name, seconds in best.items()}
+
+
+def accuracy(model: VectorClassifier, corpus: List[Tuple[Dict[str, Any], Optional[str]]]) -> float:
+    """Fracción de actuaciones con detección y tipo iguales a la etiqueta."""
+    classifications = model.classify([(a["tipo"], a["descripcion"]) for a, _ in corpus])
+    return sum(
+        es_auto == (label is not None) and (label is None or auto_type == label)
+        for (es_auto, auto_type, _), (_, label) in zip(classifications, corpus)
+    ) / len(corpus)
+
+
+def compare_engines(title: str, acts: List[Dict[str, Any]]) -> None:
+    """Coincidencia con las reglas y throughput de ambos motores en un corpus."""
+    n = len(acts)
+    rules = _cold("rules", acts)
+    vector = _cold("vector", acts)
+    fields = ("is_auto", "auto_type")
+    same_type = sum(all(r[f] == v[f] for f in fields) for r, v in zip(rules, vector))
+    same_all = sum(r == v for r, v in zip(rules, vector))
+    print(f"  {title} ({n} actuaciones)")
+    print(f"    coincide con las reglas: tipo {same_type / n:.2%}, incluida la confianza {same_all / n:.2%}")
+
+    model = get_vector_model()
+    pairs = [(a["tipo"], a["descripcion"]) for a in acts]
+    rows = (
+        ("batch_analyze", throughput({
+            "rules": lambda: _cold("rules", acts),
+            "vector": lambda: _cold("vector", acts),
+        }, n)),
+        ("clasificación", throughput({
+            "rules": lambda: [_classify_texts(tipo, descripcion) for tipo, descripcion in pairs],
+            "vector": lambda: model.classify(pairs),
+        }, n)),
+    )
+    for label, rates in rows:
+        print(
+            f"    {label:<14} reglas {rates['rules']:>9,.0f} act/s | "
+            f"vectorial {rates['vector']:>9,.0f} act/s | x{rates['vector'] / rates['rules']:.2f}"
+        )
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    # El motor de reglas registra cada auto en INFO
+    logging.disable(logging.INFO)
+
+    model = get_vector_model()
+    print(f"Motor vectorial: modelo {model.describe()}")
+    compare_engines("textos con palabras clave", actuaciones(n))
+    # Reclasificación del corpus: cada actuación con su uniq_key (sin hits)
+    compare_engines("actuaciones etiquetadas", [
+        {**act, "uniq_key": f"act-{i}"} for i, (act, _) in enumerate(labeled_actuaciones(n))
+    ])
+
+    base = [(t["actuacion"]["tipo"], t["actuacion"]["descripcion"], t["esperado"]) for t in TEST_CASES]
+    evaluation = labeled_actuaciones(20_000, seed=0, base=base)
+    training = labeled_actuaciones(20_000, seed=1)
+    start = time.perf_counter()
+    trained = model.train([(a["tipo"], a["descripcion"]) for a, _ in training], [l for _, l in training])
+    elapsed = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "modelo.npz")
+        trained.save(path)
+        assert VectorClassifier.load(path).version == trained.version
+    print(
+        f"  precisión (etiquetas): pesos iniciales {accuracy(model, evaluation):.2%} | "
+        f"reentrenado {accuracy(trained, evaluation):.2%} ({elapsed:.1f} s de entrenamiento)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Generador de procesos sintéticos para los benchmarks.
+
+Produce respuestas con la forma de la API v2 de la Rama Judicial
+(``/Procesos/Consulta`` y ``/Proceso/Actuaciones``) con la cantidad de
+actuaciones que se pida.  Los textos combinan los tipos de actuación y
+anotaciones más frecuentes, de modo que los tipos y fechas se repiten
+como en los expedientes reales.  La generación es determinista por
+``seed``.
+
+``labeled_actuaciones`` genera además actuaciones etiquetadas
+(perentorio / trámite / no es auto) para medir la precisión del
+clasificador de autos, y ``pdf_document`` PDFs con capa de texto para
+los benchmarks de documentos.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+TIPOS_ACTUACION = [
+    "Fijacion estado",
+    "Auto requiere",
+    "Auto admite demanda",
+    "Auto de tramite",
+    "Auto decreta medida cautelar",
+    "Auto fija fecha audiencia",
+    "Notificación personal",
+    "Recepción memorial",
+    "Constancia secretarial",
+    "Al despacho",
+    "Traslado",
+    "Sentencia",
+]
+
+ANOTACIONES = [
+    "Requiérase a la parte demandante para que en el término de 5 días allegue los documentos",
+    "Se fija el presente auto en estado electrónico",
+    "Córrase traslado por 3 días de la liquidación presentada",
+    "Cítese a las partes a audiencia inicial",
+    "Memorial allegado por el apoderado de la parte demandada",
+    "Se agrega al expediente y se pone en conocimiento",
+    "Ingresa al despacho para proveer",
+    "Téngase por notificado por conducta concluyente",
+    "Auto que admite la demanda y ordena notificar al demandado",
+    "Se reconoce personería jurídica al apoderado",
+    "Decrétase el embargo y secuestro del inmueble",
+    "Emplácese al demandado conforme al artículo 108 del C.G.P.",
+    "Notifíquese y cúmplase",
+    "",
+]
+
+
+def synthetic_case(
+    n_acts: int, seed: int = 0, radicado: str = "11001310300020230012300"
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Genera ``(proceso_raw, actuaciones_raw)`` con ``n_acts`` actuaciones.
+
+    Las actuaciones se devuelven de la más reciente a la más antigua,
+    como las entrega la API.
+    """
+    rng = random.Random(seed)
+    proceso_raw = {
+        "procesos": [{
+            "idProceso": 100000 + seed,
+            "llaveProceso": radicado,
+            "fechaProceso": "2023-02-01T00:00:00",
+            "fechaUltimaActuacion": "2024-10-01T00:00:00",
+            "despacho": "JUZGADO 003 CIVIL DEL CIRCUITO DE BOGOTÁ",
+            "departamento": "BOGOTÁ",
+            "sujetosProcesales": "Demandante: PÉREZ JUAN | Demandado: GARCÍA MARÍA",
+            "esPrivado": False,
+        }]
+    }
+
+    day = date(2023, 2, 1)
+    acts: List[Dict[str, Any]] = []
+    for i in range(n_acts):
+        day += timedelta(days=rng.choice((0, 0, 1, 2, 5)))
+        fecha = f"{day.isoformat()}T00:00:00"
+        anotacion = rng.choice(ANOTACIONES)
+        acts.append({
+            "idRegActuacion": 5_000_000 + seed * 10_000 + i,
+            "llaveProceso": radicado,
+            "consActuacion": i + 1,
+            "fechaActuacion": fecha,
+            "actuacion": rng.choice(TIPOS_ACTUACION),
+            "anotacion": anotacion or None,
+            "fechaInicial": fecha if "término" in anotacion or "traslado" in anotacion else None,
+            "fechaFinal": None,
+            "fechaRegistro": fecha,
+            "codRegla": "00                              ",
+            "conDocumentos": rng.random() < 0.2,
+            "cant": n_acts,
+        })
+    acts.reverse()
+    return proceso_raw, {"actuaciones": acts, "paginacion": {"cantidadRegistros": n_acts}}
+
+
+# Actuaciones etiquetadas para medir la precisión del clasificador de
+# autos: (tipo, descripción, etiqueta), con etiqueta "perentorio",
+# "tramite" o None si la actuación no es un auto.  La etiqueta es la
+# lectura de un abogado, no la salida actual del clasificador.
+LABELED_ACTUACIONES = [
+    ("Auto requiere", "Requiérase a la parte demandante para que en el término de 5 días allegue los documentos", "perentorio"),
+    ("Auto", "Córrase traslado por 3 días de la liquidación presentada", "perentorio"),
+    ("Auto", "Cítese a las partes a audiencia inicial so pena de las sanciones de ley", "perentorio"),
+    ("Auto", "Emplácese al demandado conforme al artículo 108 del C.G.P.", "perentorio"),
+    ("Auto", "Requiérase al apoderado, bajo apercibimiento de decretar el desistimiento tácito", "perentorio"),
+    ("Auto interlocutorio", "Se concede el término de 10 días para subsanar la demanda so pena de rechazo", "perentorio"),
+    ("Auto", "Conteste dentro de los 20 días siguientes a la notificación", "perentorio"),
+    ("Auto", "Prevéngase al demandado para que comparezca al despacho", "perentorio"),
+    ("Auto", "Se corre traslado del recurso de reposición", "perentorio"),
+    ("Auto", "Téngase por notificado por conducta concluyente", "tramite"),
+    ("Auto", "Agréguese al expediente y póngase en conocimiento de las partes", "tramite"),
+    ("Auto", "Se reconoce personería jurídica al apoderado", "tramite"),
+    ("Auto de tramite", "Remítase el expediente al superior para lo de su cargo", "tramite"),
+    ("Auto", "Archívese el expediente", "tramite"),
+    ("Auto", "Tómese nota del embargo de remanentes", "tramite"),
+    ("Auto de tramite", "Infórmese a la oficina de apoyo", "tramite"),
+    ("Auto", "Inscríbase la medida cautelar en el folio de matrícula", "tramite"),
+    ("Fijacion estado", "Se fija el presente auto en estado electrónico", None),
+    ("Recepción memorial", "Memorial allegado por el apoderado de la parte demandada", None),
+    ("Constancia secretarial", "Ingresa al despacho para proveer", None),
+    ("Al despacho", "Pasa al despacho con escrito de la parte actora", None),
+    ("Notificación personal", "Se notifica personalmente al demandado", None),
+    ("Sentencia", "Sentencia que pone fin a la instancia", None),
+]
+
+# Etiquetas de las actuaciones de ``generate_realistic_actuaciones``
+# (datos de demostración del scraper), por descripción
+REALISTIC_LABELS = {
+    "AUTO ADMITE DEMANDA": "tramite",
+    "NOTIFICACIÓN PERSONAL AL DEMANDADO": None,
+    "AUTO AVOCA CONOCIMIENTO": "tramite",
+    "TRASLADO PARA CONTESTAR DEMANDA": "perentorio",
+    "CONTESTACIÓN DE LA DEMANDA": None,
+    "AUTO DECRETO DE PRUEBAS": "tramite",
+    "PRÁCTICA DE PRUEBAS TESTIMONIALES": None,
+    "AUTO CORRE TRASLADO PARA ALEGAR": "perentorio",
+    "ALEGATOS DE CONCLUSIÓN": None,
+    "SENTENCIA DE PRIMERA INSTANCIA": None,
+}
+
+# Texto adicional sin palabras clave que se añade a algunas variantes
+_RELLENO = [
+    "",
+    " Rad. 2023-00123.",
+    " (Juzgado 3 Civil del Circuito)",
+    " - Ver documento adjunto",
+    " NOTIFÍQUESE Y CÚMPLASE",
+]
+
+
+def _variante(texto: str, rng: random.Random, numero: int) -> str:
+    """Variante de un texto con la misma lectura (mayúsculas, espacios, relleno).
+
+    Termina con el radicado ``numero`` para que cada variante sea un
+    texto distinto, como en la práctica (la anotación suele citar el
+    proceso, el folio o la fecha).
+    """
+    forma = rng.random()
+    if forma < 0.25:
+        texto = texto.upper()
+    elif forma < 0.4:
+        texto = texto.lower()
+    if rng.random() < 0.2:
+        texto = texto.replace(" ", "  ", 1)
+    return f"{texto}{rng.choice(_RELLENO)} Rad. 11001310300320{numero:09d}00"
+
+
+def labeled_actuaciones(
+    n: int, seed: int = 0, base: List[Tuple[str, str, Optional[str]]] = ()
+) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+    """Genera ``n`` pares ``(actuación, etiqueta)`` deterministas por ``seed``.
+
+    Las plantillas son ``LABELED_ACTUACIONES``, las actuaciones de
+    demostración de ``generate_realistic_actuaciones`` y ``base`` (p. ej.
+    los casos de ``test_auto_detection.py``); cada actuación generada es
+    una variante de una plantilla con su misma etiqueta y un texto
+    distinto del de las demás.
+    """
+    from apps.ingest_py.src.scrapers.ramajud_scraper import generate_realistic_actuaciones
+
+    plantillas = list(LABELED_ACTUACIONES) + list(base)
+    for i in range(20):
+        for act in generate_realistic_actuaciones(f"1100131030002023{i:05d}00"):
+            plantilla = (act["tipo"], act["descripcion"], REALISTIC_LABELS[act["descripcion"]])
+            if plantilla not in plantillas:
+                plantillas.append(plantilla)
+
+    rng = random.Random(seed)
+    result = [({"tipo": tipo, "descripcion": descripcion}, label) for tipo, descripcion, label in plantillas]
+    while len(result) < n:
+        tipo, descripcion, label = rng.choice(plantillas)
+        result.append(({"tipo": tipo, "descripcion": _variante(descripcion, rng, len(result))}, label))
+    return result[:n]
+
+
+def _pdf_string(line: str) -> bytes:
+    """Literal de cadena PDF (latin-1, con paréntesis y barras escapados)."""
+    escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return escaped.encode("latin-1", "replace")
+
+
+def pdf_document(pages: List[List[str]]) -> bytes:
+    """PDF mínimo con una página por lista de líneas (Helvetica, capa de texto).
+
+    Una lista vacía produce una página sin texto, como la de un escaneo.
+    """
+    objects: List[Optional[bytes]] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>", None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        content = b" ".join(
+            b"BT /F1 10 Tf 40 %d Td (%s) Tj ET" % (780 - 14 * (i % 54), _pdf_string(line))
+            for i, line in enumerate(lines)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(pages))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
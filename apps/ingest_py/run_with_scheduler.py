@@ -10,7 +10,7 @@ import logging
 import uvicorn
 from contextlib import asynccontextmanager
 
-from apps.ingest_py.src.main import app
+from apps.ingest_py.src.main import app, lifespan as app_lifespan
 from apps.ingest_py.src.sched.cron import start_scheduler
 
 # Configurar logging
@@ -26,24 +26,28 @@ logger = logging.getLogger(__name__)
 async def lifespan(app):
     """
     Lifecycle manager para iniciar/detener el scheduler.
+
+    Envuelve el lifespan de la aplicación para conservar el pool HTTP
+    compartido y demás recursos que ésta gestiona.
     """
-    # Startup
-    logger.info("🚀 Iniciando servidor con vigilancia automática de autos...")
+    async with app_lifespan(app):
+        # Startup
+        logger.info("🚀 Iniciando servidor con vigilancia automática de autos...")
 
-    # Iniciar scheduler (cada 24 horas por defecto)
-    # Para testing, cambiar a: start_scheduler(interval_hours=1)
-    scheduler = start_scheduler()
+        # Iniciar scheduler (cada 24 horas por defecto)
+        # Para testing, cambiar a: start_scheduler(interval_hours=1)
+        scheduler = start_scheduler()
 
-    logger.info("✓ Servidor iniciado y scheduler activo")
-    logger.info("📡 API disponible en: http://localhost:8001")
-    logger.info("📚 Documentación en: http://localhost:8001/docs")
+        logger.info("✓ Servidor iniciado y scheduler activo")
+        logger.info("📡 API disponible en: http://localhost:8001")
+        logger.info("📚 Documentación en: http://localhost:8001/docs")
 
-    yield
+        yield
 
-    # Shutdown
-    logger.info("🛑 Deteniendo scheduler...")
-    scheduler.shutdown()
-    logger.info("✓ Scheduler detenido")
+        # Shutdown
+        logger.info("🛑 Deteniendo scheduler...")
+        scheduler.shutdown()
+        logger.info("✓ Scheduler detenido")
 
 
 # Asignar lifecycle al app
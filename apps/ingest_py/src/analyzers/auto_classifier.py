@@ -5,15 +5,40 @@ Este módulo detecta y clasifica automáticamente los autos judiciales
 en dos categorías:
 - Perentorio: requiere actuación urgente del abogado
 - Trámite: avance procesal sin acción inmediata requerida
+
+Las clasificaciones se memorizan en un LRU acotado por ``uniq_key`` de
+la actuación y versión de las reglas (``RULESET_VERSION``), de modo que
+volver a analizar las mismas actuaciones no repite la búsqueda.
+
+Hay dos motores con el mismo contrato, seleccionables por llamada
+(``engine=``) o con ``AUTO_CLASSIFIER_ENGINE``:
+- ``rules``: patrones regex por actuación (por defecto)
+- ``vector``: n-gramas hasheados puntuados por lotes con NumPy
+  (``vector_classifier``), para reclasificar el corpus completo; sin
+  NumPy se usan las reglas
+
+Todo el texto se compara en forma canónica (``text_canon``: sin tildes,
+en minúsculas y con espacios colapsados), por lo que cada palabra clave
+se escribe una sola vez, con su ortografía correcta.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import os
 import re
 import logging
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, Hashable, Tuple
 from enum import Enum
 
+from .keyword_matcher import KeywordMatcher
+from .text_canon import canonicalize, fold_case, fold_pattern
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +52,6 @@ class AutoType(str, Enum):
 # Palabras clave para clasificación de autos perentorios
 PERENTORIO_KEYWORDS = [
     # Requerimientos directos
-    r"requiérase",
     r"requier[ae]se",
     r"requiera",
     r"deberá\s+presentar",
@@ -86,30 +110,161 @@ PERENTORIO_KEYWORDS = [
 # Palabras clave para clasificación de autos de trámite
 TRAMITE_KEYWORDS = [
     r"admítase",
-    r"admitase",
     r"téngase\s+por",
-    r"tengase\s+por",
     r"tómese\s+nota",
-    r"tomese\s+nota",
     r"inscríbase",
-    r"inscribase",
     r"infórmese",
-    r"informese",
     r"remítase",
-    r"remitase",
     r"agrégue",
-    r"agreguese",
     r"siga\s+el\s+trámite",
     r"continúe",
     r"archívese",
-    r"archivese",
     r"avócase",
     r"avoca\s+conocimiento",
 ]
 
-# Compilar patrones regex
-PERENTORIO_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in PERENTORIO_KEYWORDS]
-TRAMITE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in TRAMITE_KEYWORDS]
+# Patrones comunes de autos
+AUTO_PATTERNS = [
+    r"\bauto\b",
+    r"providencia",
+    r"decisión\s+de\s+fondo",
+]
+
+# Indicadores generales de plazo cuando no hay coincidencias claras
+PERENTORIO_HINTS = ["plazo", "término", "días", "requerir"]
+
+
+def _fold_all(patterns: list[str]) -> list[str]:
+    """Pliega los patrones a la forma canónica, sin repetidos."""
+    return list(dict.fromkeys(fold_pattern(p) for p in patterns))
+
+
+# Patrones plegados: se comparan con el texto canónico
+PERENTORIO_FOLDED = _fold_all(PERENTORIO_KEYWORDS)
+TRAMITE_FOLDED = _fold_all(TRAMITE_KEYWORDS)
+AUTO_FOLDED = _fold_all(AUTO_PATTERNS)
+HINTS_FOLDED = _fold_all(PERENTORIO_HINTS)
+
+# Compilar patrones regex (una vez, al importar el módulo)
+PERENTORIO_PATTERNS = [re.compile(pattern) for pattern in PERENTORIO_FOLDED]
+TRAMITE_PATTERNS = [re.compile(pattern) for pattern in TRAMITE_FOLDED]
+AUTO_REGEX = re.compile("|".join(f"(?:{pattern})" for pattern in AUTO_FOLDED))
+
+# Todas las palabras clave en una sola expresión (una pasada por texto)
+KEYWORD_MATCHER = KeywordMatcher({
+    AutoType.PERENTORIO.value: PERENTORIO_FOLDED,
+    AutoType.TRAMITE.value: TRAMITE_FOLDED,
+})
+
+# Versión de las reglas: cambia con cualquier lista de palabras clave o
+# con la forma canónica del texto, lo que invalida las clasificaciones
+# memorizadas con reglas anteriores
+CANON_VERSION = "nfkd-sin-marcas-minusculas-espacios"
+RULESET_VERSION = hashlib.sha256(
+    json.dumps(
+        [CANON_VERSION, PERENTORIO_FOLDED, TRAMITE_FOLDED, AUTO_FOLDED, HINTS_FOLDED],
+        ensure_ascii=False,
+    ).encode("utf-8")
+).hexdigest()[:12]
+
+# Sección resolutiva de un auto: empieza en "RESUELVE" (o "DISPONE:",
+# "DECIDE:") y termina con la fórmula "NOTIFÍQUESE Y CÚMPLASE"
+OPERATIVE_START = re.compile(r"\bresuelve\b|\b(?:dispone|decide)\s*:")
+OPERATIVE_END = re.compile(r"\bcumplase\b")
+
+# Clasificación de documentos por páginas: se considera segura cuando el
+# auto es perentorio con confianza 1.0 y los patrones perentorios superan
+# a los de trámite por al menos este margen
+DOCUMENT_CONFIDENT_MARGIN = int(os.getenv("AUTO_DOCUMENT_CONFIDENT_MARGIN", "2"))
+
+# Máximo de clasificaciones memorizadas (0 desactiva el cache)
+CLASSIFICATION_CACHE_SIZE = int(os.getenv("AUTO_CLASSIFICATION_CACHE_SIZE", "50000"))
+
+# Valor de AutoType.PERENTORIO (sin el acceso al enum en cada actuación)
+_PERENTORIO = AutoType.PERENTORIO.value
+
+# Clasificación memorizada: (is_auto, auto_type, classification_confidence)
+Classification = Tuple[bool, Optional[str], float]
+
+
+class ClassificationCache:
+    """
+    LRU acotado de clasificaciones de actuaciones.
+
+    - La clave incluye ``RULESET_VERSION``: al cambiar las palabras clave
+      las entradas anteriores dejan de coincidir y salen por LRU
+    - Con ``uniq_key`` se guarda también el texto clasificado (tipo y
+      descripción) y se compara en cada hit, por si dos actuaciones con la
+      misma clave traen descripciones distintas
+    - Contadores de hits/misses/desalojos para ``/metrics``
+    """
+
+    def __init__(self, max_entries: int = CLASSIFICATION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Tuple[Any, Classification]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, texts: Any = None) -> Optional[Classification]:
+        """Clasificación guardada para ``key`` si el texto coincide."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != texts:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, texts: Any, value: Classification):
+        """Guarda una clasificación, desalojando la menos usada si está lleno."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (texts, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Vacía el cache (los contadores se conservan)."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamaño, hits, misses y tasa de acierto para ``/metrics``."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "ruleset_version": RULESET_VERSION,
+        }
+
+
+classification_cache = ClassificationCache()
+
+# Lotes con al menos este número de actuaciones por clasificar se envían
+# a un pool de procesos (``batch_analyze_async``); 0 lo desactiva
+BATCH_PROCESS_THRESHOLD = int(os.getenv("AUTO_BATCH_PROCESS_THRESHOLD", "2000"))
+BATCH_PROCESS_WORKERS = int(os.getenv("AUTO_BATCH_PROCESS_WORKERS", "0"))  # 0 = núcleos
+BATCH_CHUNK_SIZE = int(os.getenv("AUTO_BATCH_CHUNK_SIZE", "500"))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+# Motor de clasificación por defecto: "rules" (patrones regex) o
+# "vector" (n-gramas hasheados con NumPy, para lotes grandes)
+ENGINES = ("rules", "vector")
+CLASSIFIER_ENGINE = os.getenv("AUTO_CLASSIFIER_ENGINE", "rules")
+# Modelo vectorial reentrenado (.npz); vacío usa los pesos de las palabras clave
+VECTOR_MODEL_PATH = os.getenv("AUTO_VECTOR_MODEL_PATH", "")
+
+_vector_model: Any = None  # None: sin cargar; False: NumPy no disponible
 
 
 def is_auto(titulo: Optional[str], descripcion: Optional[str] = None) -> bool:
@@ -126,18 +281,11 @@ def is_auto(titulo: Optional[str], descripcion: Optional[str] = None) -> bool:
     if not titulo:
         return False
 
-    texto_completo = titulo.lower()
+    texto_completo = canonicalize(titulo)
     if descripcion:
-        texto_completo += " " + descripcion.lower()
-
-    # Patrones comunes de autos
-    auto_patterns = [
-        r"\bauto\b",
-        r"providencia",
-        r"decisión\s+de\s+fondo",
-    ]
+        texto_completo += " " + canonicalize(descripcion)
 
-    return any(re.search(pattern, texto_completo) for pattern in auto_patterns)
+    return AUTO_REGEX.search(texto_completo) is not None
 
 
 def classify_auto(texto: str) -> AutoType:
@@ -160,19 +308,22 @@ def classify_auto(texto: str) -> AutoType:
         return AutoType.UNKNOWN
 
     # Normalizar texto
-    texto_norm = texto.lower()
+    texto_norm = canonicalize(texto)
+    auto_type, _ = _classify_normalized(texto_norm)
+    return auto_type
 
-    # Contar coincidencias de patrones perentorios
-    perentorio_matches = sum(
-        1 for pattern in PERENTORIO_PATTERNS
-        if pattern.search(texto_norm)
-    )
 
-    # Contar coincidencias de patrones de trámite
-    tramite_matches = sum(
-        1 for pattern in TRAMITE_PATTERNS
-        if pattern.search(texto_norm)
-    )
+def _classify_normalized(texto_norm: str) -> tuple[AutoType, int]:
+    """Clasifica un texto ya en forma canónica (``canonicalize``).
+
+    Returns:
+        Tupla ``(tipo, coincidencias)`` con el número de patrones del
+        tipo ganador, que ``analyze_actuacion`` usa para la confianza.
+    """
+    # Contar coincidencias de patrones perentorios y de trámite en una pasada
+    counts = KEYWORD_MATCHER.counts(texto_norm)
+    perentorio_matches = counts[AutoType.PERENTORIO.value]
+    tramite_matches = counts[AutoType.TRAMITE.value]
 
     logger.debug(
         f"Clasificación: {perentorio_matches} perentorios, {tramite_matches} trámite"
@@ -180,23 +331,166 @@ def classify_auto(texto: str) -> AutoType:
 
     # Clasificar basado en coincidencias
     if perentorio_matches > tramite_matches:
-        return AutoType.PERENTORIO
+        return AutoType.PERENTORIO, perentorio_matches
     elif tramite_matches > 0:
-        return AutoType.TRAMITE
+        return AutoType.TRAMITE, tramite_matches
     else:
         # Si no hay coincidencias claras, buscar indicadores generales
-        if any(keyword in texto_norm for keyword in ["plazo", "término", "días", "requerir"]):
-            return AutoType.PERENTORIO
-        return AutoType.UNKNOWN
+        if any(keyword in texto_norm for keyword in HINTS_FOLDED):
+            return AutoType.PERENTORIO, perentorio_matches
+        return AutoType.UNKNOWN, 0
+
+
+def _confidence(auto_type: AutoType, matches: int) -> float:
+    """Confianza de una clasificación según el número de coincidencias."""
+    if auto_type == AutoType.PERENTORIO:
+        return min(matches / 3.0, 1.0)  # Máximo 3 coincidencias = 100%
+    elif auto_type == AutoType.TRAMITE:
+        return min(matches / 2.0, 1.0)  # Máximo 2 coincidencias = 100%
+    return 0.0
 
 
-def analyze_actuacion(actuacion: Dict[str, Any]) -> Dict[str, Any]:
+def _cache_key(
+    actuacion: Dict[str, Any], tipo: Any, descripcion: Any, version: str = RULESET_VERSION
+) -> Tuple[Hashable, Any]:
+    """Clave de ``classification_cache`` y texto a verificar en cada hit.
+
+    ``version`` identifica al motor y sus reglas o pesos.
+    """
+    uniq_key = actuacion.get("uniq_key")
+    if uniq_key:
+        return (version, uniq_key), (tipo, descripcion)
+    return (version, tipo, descripcion), None
+
+
+def _classify_texts(tipo: Any, descripcion: Any) -> Classification:
+    """Detecta y clasifica un auto a partir de su tipo y descripción."""
+    # Forma canónica, una vez por actuación, compartida por la detección
+    # y la clasificación
+    tipo_norm = canonicalize(str(tipo)) if tipo else ""
+    descripcion_norm = canonicalize(str(descripcion)) if descripcion else ""
+    texto_norm = f"{tipo_norm} {descripcion_norm}".strip()
+
+    # Detectar si es auto
+    es_auto = bool(tipo) and AUTO_REGEX.search(texto_norm) is not None
+    if not es_auto:
+        return False, None, 0.0
+
+    # Clasificar el auto (las coincidencias se reutilizan para la confianza)
+    if texto_norm:
+        auto_type, matches = _classify_normalized(texto_norm)
+    else:
+        auto_type, matches = AutoType.UNKNOWN, 0
+
+    confidence = _confidence(auto_type, matches)
+
+    logger.info(
+        f"Actuación analizada: tipo={tipo}, es_auto={es_auto}, "
+        f"clasificación={auto_type.value}, confianza={confidence:.2f}"
+    )
+
+    return es_auto, auto_type.value, round(confidence, 2)
+
+
+def _with_classification(actuacion: Dict[str, Any], classification: Classification) -> Dict[str, Any]:
+    """Copia de la actuación con los campos de la clasificación."""
+    es_auto, auto_type_value, confidence = classification
+    return {
+        **actuacion,
+        "is_auto": es_auto,
+        "auto_type": auto_type_value,
+        "requires_action": auto_type_value == _PERENTORIO,
+        "classification_confidence": confidence,
+    }
+
+
+def get_vector_model():
+    """
+    Modelo del motor vectorial (se crea al primer uso).
+
+    Usa el modelo de ``AUTO_VECTOR_MODEL_PATH`` si está configurado o,
+    si no, los pesos iniciales de las palabras clave.
+
+    Returns:
+        ``VectorClassifier``, o None si NumPy no está instalado
+    """
+    global _vector_model
+    if _vector_model is None:
+        try:
+            from .vector_classifier import VectorClassifier
+        except ImportError:
+            logger.warning("NumPy no está instalado; el motor vectorial usará las reglas")
+            _vector_model = False
+        else:
+            if VECTOR_MODEL_PATH:
+                _vector_model = VectorClassifier.load(VECTOR_MODEL_PATH)
+            else:
+                _vector_model = VectorClassifier.from_keywords({
+                    "auto": AUTO_FOLDED,
+                    AutoType.PERENTORIO.value: PERENTORIO_FOLDED,
+                    AutoType.TRAMITE.value: TRAMITE_FOLDED,
+                    "plazo": HINTS_FOLDED,
+                })
+            logger.info(f"Motor vectorial listo: {_vector_model.describe()}")
+    return _vector_model or None
+
+
+def _resolve_engine(engine: Optional[str]):
+    """Modelo vectorial si el motor es ``vector`` (y hay NumPy); None para las reglas."""
+    engine = engine or CLASSIFIER_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Motor de clasificación desconocido: {engine} (opciones: {ENGINES})")
+    return get_vector_model() if engine == "vector" else None
+
+
+def _analyze_rules(actuacion: Dict[str, Any]) -> Dict[str, Any]:
+    """``analyze_actuacion`` con el motor de reglas."""
+    tipo = actuacion.get("tipo", "")
+    descripcion = actuacion.get("descripcion", "")
+
+    # Clasificación memorizada de la misma actuación con las mismas reglas
+    cache_key, texts = _cache_key(actuacion, tipo, descripcion)
+    classification = classification_cache.get(cache_key, texts)
+    if classification is None:
+        classification = _classify_texts(tipo, descripcion)
+        classification_cache.set(cache_key, texts, classification)
+
+    return _with_classification(actuacion, classification)
+
+
+def _analyze_vector(actuaciones: list[Dict[str, Any]], model) -> list[Dict[str, Any]]:
+    """``batch_analyze`` con el motor vectorial: un solo lote para las no memorizadas."""
+    results: list[Optional[Dict[str, Any]]] = [None] * len(actuaciones)
+    pending: list[Tuple[int, Hashable, Any, Any, Any]] = []
+    for index, act in enumerate(actuaciones):
+        tipo = act.get("tipo", "")
+        descripcion = act.get("descripcion", "")
+        cache_key, texts = _cache_key(act, tipo, descripcion, model.version)
+        classification = classification_cache.get(cache_key, texts)
+        if classification is None:
+            pending.append((index, cache_key, texts, tipo, descripcion))
+        else:
+            results[index] = _with_classification(act, classification)
+
+    classifications = model.classify([(tipo, descripcion) for _, _, _, tipo, descripcion in pending])
+    for (index, cache_key, texts, _, _), classification in zip(pending, classifications):
+        classification_cache.set(cache_key, texts, classification)
+        results[index] = _with_classification(actuaciones[index], classification)
+    logger.debug(
+        f"Lote vectorial: {len(actuaciones)} actuaciones, {len(pending)} clasificadas"
+    )
+    return results  # type: ignore[return-value]
+
+
+def analyze_actuacion(actuacion: Dict[str, Any], engine: Optional[str] = None) -> Dict[str, Any]:
     """
     Analiza una actuación para detectar y clasificar autos.
 
     Args:
         actuacion: Diccionario con los datos de la actuación
                    (debe contener 'tipo' y opcionalmente 'descripcion')
+        engine: Motor de clasificación (``rules``/``vector``); por
+                defecto ``AUTO_CLASSIFIER_ENGINE``
 
     Returns:
         Diccionario con los campos originales más:
@@ -204,61 +498,245 @@ def analyze_actuacion(actuacion: Dict[str, Any]) -> Dict[str, Any]:
         - auto_type: str (perentorio|tramite|unknown|null)
         - requires_action: bool
         - classification_score: float (confianza de la clasificación)
+
+    El resultado se memoriza en ``classification_cache``; una actuación
+    ya analizada (misma ``uniq_key`` y texto) no se vuelve a clasificar.
     """
-    tipo = actuacion.get("tipo", "")
-    descripcion = actuacion.get("descripcion", "")
+    model = _resolve_engine(engine)
+    if model is not None:
+        return _analyze_vector([actuacion], model)[0]
+    return _analyze_rules(actuacion)
 
-    # Detectar si es auto
-    es_auto = is_auto(tipo, descripcion)
 
-    result = {
-        **actuacion,
-        "is_auto": es_auto,
-        "auto_type": None,
-        "requires_action": False,
-        "classification_confidence": 0.0,
-    }
+def batch_analyze(actuaciones: list[Dict[str, Any]], engine: Optional[str] = None) -> list[Dict[str, Any]]:
+    """
+    Analiza un lote de actuaciones para detectar autos.
 
-    if not es_auto:
-        return result
+    Args:
+        actuaciones: Lista de diccionarios con actuaciones
+        engine: Motor de clasificación (``rules``/``vector``); el
+                vectorial puntúa todo el lote de una vez
 
-    # Clasificar el auto
-    texto_completo = f"{tipo} {descripcion}".strip()
-    auto_type = classify_auto(texto_completo)
+    Returns:
+        Lista de actuaciones con análisis agregado
+    """
+    model = _resolve_engine(engine)
+    if model is not None:
+        return _analyze_vector(actuaciones, model)
+    return [_analyze_rules(act) for act in actuaciones]
 
-    result["auto_type"] = auto_type.value
-    result["requires_action"] = auto_type == AutoType.PERENTORIO
 
-    # Calcular confianza (basado en número de coincidencias)
-    texto_norm = texto_completo.lower()
+def _init_worker():
+    """Inicializador de cada proceso del pool.
 
-    if auto_type == AutoType.PERENTORIO:
-        matches = sum(1 for p in PERENTORIO_PATTERNS if p.search(texto_norm))
-        confidence = min(matches / 3.0, 1.0)  # Máximo 3 coincidencias = 100%
-    elif auto_type == AutoType.TRAMITE:
-        matches = sum(1 for p in TRAMITE_PATTERNS if p.search(texto_norm))
-        confidence = min(matches / 2.0, 1.0)  # Máximo 2 coincidencias = 100%
-    else:
-        confidence = 0.0
+    Los patrones (``KEYWORD_MATCHER``, ``PERENTORIO_PATTERNS``...) se
+    compilan al importar el módulo, una vez por proceso; aquí solo se
+    silencia el log por actuación, que en lotes grandes domina el tiempo.
+    """
+    logging.getLogger(__name__).setLevel(logging.WARNING)
 
-    result["classification_confidence"] = round(confidence, 2)
 
-    logger.info(
-        f"Actuación analizada: tipo={tipo}, es_auto={es_auto}, "
-        f"clasificación={auto_type.value}, confianza={confidence:.2f}"
-    )
+def _classify_chunk(textos: list[Tuple[Any, Any]]) -> list[Classification]:
+    """Clasifica un bloque de ``(tipo, descripcion)`` dentro del pool."""
+    return [_classify_texts(tipo, descripcion) for tipo, descripcion in textos]
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Pool de procesos para ``batch_analyze_async`` (se crea al primer uso)."""
+    global _process_pool
+    if _process_pool is None:
+        workers = BATCH_PROCESS_WORKERS or os.cpu_count() or 1
+        _process_pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        logger.info(f"Pool de clasificación iniciado ({workers} procesos)")
+    return _process_pool
 
-    return result
 
+def _discard_process_pool(pool: ProcessPoolExecutor):
+    """Descarta un pool roto; el siguiente bloque crea otro."""
+    global _process_pool
+    if _process_pool is pool:
+        _process_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Pool de clasificación roto (un proceso terminó de forma abrupta); se creará otro")
 
-def batch_analyze(actuaciones: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
+
+def shutdown_process_pool():
+    """Cierra el pool de clasificación (al apagar la aplicación)."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+        logger.info("Pool de clasificación cerrado")
+
+
+async def batch_analyze_async(
+    actuaciones: list[Dict[str, Any]], engine: Optional[str] = None
+) -> list[Dict[str, Any]]:
     """
-    Analiza un lote de actuaciones para detectar autos.
+    Versión asíncrona de ``batch_analyze`` que no bloquea el event loop.
+
+    - Las clasificaciones memorizadas se resuelven en el proceso actual
+    - Si quedan menos de ``BATCH_PROCESS_THRESHOLD`` actuaciones por
+      clasificar, se clasifican en línea (el pool no compensa)
+    - Si no, se dividen en bloques de ``BATCH_CHUNK_SIZE`` que se
+      clasifican en un ``ProcessPoolExecutor``; solo viajan
+      ``(tipo, descripcion)`` y la clasificación de vuelta.  Si un
+      proceso muere, el pool roto se sustituye y el bloque se reintenta
+
+    El resultado es el mismo que el de ``batch_analyze`` y las nuevas
+    clasificaciones quedan en ``classification_cache``.  Con el motor
+    vectorial no se usa el pool: el lote se puntúa en este proceso, por
+    bloques, cediendo el event loop entre bloques.
 
     Args:
         actuaciones: Lista de diccionarios con actuaciones
+        engine: Motor de clasificación (``rules``/``vector``)
 
     Returns:
         Lista de actuaciones con análisis agregado
     """
-    return [analyze_actuacion(act) for act in actuaciones]
+    model = _resolve_engine(engine)
+    if model is not None:
+        analyzed: list[Dict[str, Any]] = []
+        for start in range(0, len(actuaciones), model.block_size):
+            analyzed.extend(_analyze_vector(actuaciones[start:start + model.block_size], model))
+            await asyncio.sleep(0)
+        return analyzed
+
+    if BATCH_PROCESS_THRESHOLD <= 0 or len(actuaciones) < BATCH_PROCESS_THRESHOLD:
+        return batch_analyze(actuaciones, "rules")
+
+    chunk = max(1, BATCH_CHUNK_SIZE)
+    results: list[Optional[Dict[str, Any]]] = [None] * len(actuaciones)
+    pending: list[Tuple[int, Hashable, Any, Any, Any]] = []
+    for start in range(0, len(actuaciones), chunk):
+        for index in range(start, min(start + chunk, len(actuaciones))):
+            act = actuaciones[index]
+            tipo = act.get("tipo", "")
+            descripcion = act.get("descripcion", "")
+            cache_key, texts = _cache_key(act, tipo, descripcion)
+            classification = classification_cache.get(cache_key, texts)
+            if classification is None:
+                pending.append((index, cache_key, texts, tipo, descripcion))
+            else:
+                results[index] = _with_classification(act, classification)
+        await asyncio.sleep(0)  # Ceder el event loop entre bloques
+
+    def merge(block, classifications):
+        for (index, cache_key, texts, _, _), classification in zip(block, classifications):
+            classification_cache.set(cache_key, texts, classification)
+            results[index] = _with_classification(actuaciones[index], classification)
+
+    if len(pending) < BATCH_PROCESS_THRESHOLD:
+        merge(pending, [_classify_texts(tipo, descripcion) for _, _, _, tipo, descripcion in pending])
+        return results  # type: ignore[return-value]
+
+    loop = asyncio.get_running_loop()
+
+    async def classify_block(block):
+        textos = [(tipo, descripcion) for _, _, _, tipo, descripcion in block]
+        for _ in range(2):
+            pool = _get_process_pool()
+            try:
+                return block, await loop.run_in_executor(pool, _classify_chunk, textos)
+            except BrokenProcessPool:
+                # Los bloques en curso fallan todos a la vez: solo el
+                # primero descarta el pool y cada uno se reintenta una vez
+                _discard_process_pool(pool)
+        # Pool roto dos veces: el bloque se clasifica en un hilo
+        logger.error(f"Pool de clasificación roto de nuevo; bloque de {len(block)} actuaciones en un hilo")
+        return block, await loop.run_in_executor(None, _classify_chunk, textos)
+
+    blocks = [pending[start:start + chunk] for start in range(0, len(pending), chunk)]
+    # Cada bloque se incorpora en cuanto termina, sin esperar a los demás
+    for finished in asyncio.as_completed([classify_block(block) for block in blocks]):
+        merge(*await finished)
+    logger.info(
+        f"Lote de {len(actuaciones)} actuaciones: {len(pending)} clasificadas "
+        f"en {len(blocks)} bloques del pool"
+    )
+    return results  # type: ignore[return-value]
+
+
+class IncrementalAutoClassifier:
+    """
+    Clasificación de ``classify_auto`` sobre un texto que llega por partes.
+
+    Pensado para el documento de un auto leído página a página
+    (``document_extractor.classify_document``):
+
+    - ``feed`` pasa cada página a forma canónica, la acumula y busca sus
+      patrones (``KEYWORD_MATCHER.hits``) junto con el final de la
+      anterior (``OVERLAP`` caracteres), para decidir cuándo parar sin
+      volver a recorrer lo ya leído
+    - ``result`` clasifica el texto acumulado con ``_classify_normalized``:
+      leído entero, el resultado es el de ``classify_auto`` sobre el texto
+      completo, también para los patrones con ``.*``, que pueden unir
+      páginas lejanas
+    - ``confident``: el auto ya es perentorio con confianza 1.0 y margen
+      ``DOCUMENT_CONFIDENT_MARGIN`` sobre los patrones de trámite.  Los
+      patrones encontrados por páginas son un subconjunto de los del
+      texto acumulado y ningún patrón de trámite usa ``.*``, así que el
+      margen solo puede crecer al clasificar el texto completo.  Un
+      trámite no se da por seguro antes de tiempo: la parte resolutiva
+      puede traer el requerimiento o el plazo
+    - ``operative_done``: se leyó la sección resolutiva completa (de
+      "RESUELVE" a "CÚMPLASE"); lo que sigue son anexos
+    """
+
+    OVERLAP = 200
+
+    def __init__(self, margin: int = DOCUMENT_CONFIDENT_MARGIN):
+        self.margin = margin
+        self.hits: set[int] = set()
+        self.parts = 0
+        self.operative_started = False
+        self.operative_done = False
+        self._texts: list[str] = []
+        self._tail = ""
+
+    def feed(self, text: str):
+        """Incorpora la siguiente parte del texto (p. ej. una página)."""
+        self.parts += 1
+        norm = " ".join(fold_case(text).split())
+        if not norm:
+            return
+        self._texts.append(norm)
+        window = f"{self._tail} {norm}" if self._tail else norm
+        self.hits |= KEYWORD_MATCHER.hits(window)
+        if not self.operative_started:
+            start = OPERATIVE_START.search(window)
+            if start:
+                self.operative_started = True
+                self.operative_done = OPERATIVE_END.search(window, start.end()) is not None
+        elif not self.operative_done:
+            self.operative_done = OPERATIVE_END.search(window) is not None
+        self._tail = norm[-self.OVERLAP:]
+
+    def counts(self) -> Dict[str, int]:
+        """Patrones distintos encontrados por páginas, por etiqueta."""
+        counts = dict.fromkeys(KEYWORD_MATCHER.labels, 0)
+        for index in self.hits:
+            counts[KEYWORD_MATCHER.labels[KEYWORD_MATCHER.label_of[index]]] += 1
+        return counts
+
+    def result(self) -> Tuple[AutoType, float]:
+        """Tipo de auto y confianza del texto leído hasta ahora."""
+        if not self._texts:
+            return AutoType.UNKNOWN, 0.0
+        auto_type, matches = _classify_normalized(" ".join(self._texts))
+        return auto_type, round(_confidence(auto_type, matches), 2)
+
+    @property
+    def confident(self) -> bool:
+        counts = self.counts()
+        perentorio_matches = counts[AutoType.PERENTORIO.value]
+        return (
+            perentorio_matches >= 3
+            and perentorio_matches - counts[AutoType.TRAMITE.value] >= self.margin
+        )
+
+    @property
+    def done(self) -> bool:
+        """Si se puede dejar de leer el documento."""
+        return self.operative_done or self.confident
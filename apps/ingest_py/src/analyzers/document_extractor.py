@@ -3,23 +3,233 @@ Extractor de texto de documentos judiciales (PDF, DOCX).
 
 Este módulo descarga y extrae texto de documentos adjuntos
 a las actuaciones judiciales.
+
+Los documentos se descargan en streaming a disco
+(``download_document_to_file``): bloques escritos a un archivo
+``.part``, SHA-256 calculado mientras llegan los datos, tamaño máximo
+configurable y reanudación con peticiones ``Range`` si la conexión se
+corta.  La extracción trabaja sobre el archivo: PyPDF2 lee el PDF
+mapeado en memoria (``mmap``) y el OCR (``ocr_engine``) rasteriza y
+reconoce cada página en un pool de procesos, de modo que un expediente
+escaneado de cientos de páginas no se carga entero en memoria ni
+bloquea el event loop.
+
+La decisión de OCR es por página: se usa la capa de texto de las
+páginas que pasan ``text_layer_ok`` (caracteres suficientes y casi
+todos imprimibles) y solo las demás pasan por OCR, así que una carátula
+digitada con anexos escaneados se reconoce completa y un escaneado con
+páginas digitadas no las reconoce de nuevo.
+
+``classify_document`` decide si el auto de un documento es perentorio
+leyéndolo página a página (``iter_document_pages``) y deja de extraer
+(y de pasar OCR) en cuanto la clasificación es segura o se terminó la
+sección resolutiva: los anexos de un expediente grande no se leen.
+
+Con ``DOCUMENT_STORE_DIR`` los documentos descargados y su texto
+extraído se guardan en un almacén direccionado por contenido
+(``DocumentStore``): las llamadas repetidas con la misma URL no vuelven
+a descargar ni a extraer (ni a pasar OCR).
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import io
+import json
 import logging
+import mmap
+import os
+import re
+import sqlite3
 import tempfile
+import time
+import unicodedata
+from contextlib import aclosing, contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import IO, Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 import httpx
 
+try:
+    import fcntl
+except ImportError:  # Windows: sin candado, cada descarga usa su propia parte
+    fcntl = None
+
+from ..storage.document_store import DocumentStore, StoredDocument
+from .auto_classifier import AutoType, IncrementalAutoClassifier
+from .ocr_engine import OcrResult, ocr_engine
+
 logger = logging.getLogger(__name__)
 
+# Tamaño máximo de un documento descargado (0 sin límite)
+DOCUMENT_MAX_BYTES = int(os.getenv("DOCUMENT_MAX_MB", "100")) * 1024 * 1024
+# Tamaño de los bloques que se escriben a disco durante la descarga
+DOCUMENT_CHUNK_BYTES = int(os.getenv("DOCUMENT_CHUNK_KB", "256")) * 1024
+# Intentos de descarga (los siguientes reanudan con Range)
+DOCUMENT_DOWNLOAD_ATTEMPTS = int(os.getenv("DOCUMENT_DOWNLOAD_ATTEMPTS", "3"))
+# Espera antes de reintentar un 5xx (se duplica en cada intento)
+DOCUMENT_RETRY_BACKOFF = float(os.getenv("DOCUMENT_RETRY_BACKOFF_SECONDS", "1"))
+# Directorio de descargas (vacío: directorio temporal del sistema)
+DOCUMENT_DOWNLOAD_DIR = os.getenv("DOCUMENT_DOWNLOAD_DIR", "")
+
+# Versión de la extracción (PyPDF2 + OCR). Cambiarla cuando cambie el
+# texto que producen: el texto guardado en el almacén con otra versión
+# se vuelve a extraer del documento ya descargado
+EXTRACTOR_VERSION = "2"
+
+# Capa de texto utilizable de una página: mínimo de caracteres visibles
+# (no espacios) y fracción mínima de ellos que son imprimibles (sin
+# controles, U+FFFD ni uso privado, típicos de fuentes sin mapa Unicode)
+PAGE_TEXT_MIN_CHARS = int(os.getenv("PAGE_TEXT_MIN_CHARS", "40"))
+PAGE_TEXT_MIN_PRINTABLE = float(os.getenv("PAGE_TEXT_MIN_PRINTABLE", "0.9"))
+
+# Páginas por camino de extracción (del proceso actual, para /metrics)
+page_paths: Dict[str, int] = {
+    "documents": 0,
+    "text_layer": 0,
+    "ocr": 0,
+    "weak_text_layer": 0,
+    "empty": 0,
+}
+
+# Almacén de documentos y texto extraído (vacío: sin almacén; cada
+# llamada descarga y extrae de nuevo)
+DOCUMENT_STORE_DIR = os.getenv("DOCUMENT_STORE_DIR", "")
+DOCUMENT_STORE_MAX_BYTES = int(os.getenv("DOCUMENT_STORE_MAX_MB", "2048")) * 1024 * 1024
+DOCUMENT_STORE_URL_TTL = float(os.getenv("DOCUMENT_STORE_URL_TTL_HOURS", "0")) * 3600
+# Espera máxima del bloqueo del índice (compartido entre workers)
+DOCUMENT_STORE_BUSY_TIMEOUT = int(os.getenv("DOCUMENT_STORE_BUSY_MS", "500")) / 1000
+
+document_store = (
+    DocumentStore(
+        DOCUMENT_STORE_DIR, DOCUMENT_STORE_MAX_BYTES, DOCUMENT_STORE_URL_TTL,
+        busy_timeout=DOCUMENT_STORE_BUSY_TIMEOUT,
+    )
+    if DOCUMENT_STORE_DIR else None
+)
+
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-\d+/(\d+|\*)")
+
+# Documento en memoria (bytes) o descargado en disco (ruta)
+DocumentSource = Union[bytes, bytearray, str, Path]
+
+
+class DocumentTooLarge(Exception):
+    """El documento supera el tamaño máximo permitido."""
+
+
+@dataclass
+class DocumentPage:
+    """Página de un documento con su texto y el camino por el que se obtuvo."""
+    number: int
+    total: int
+    text: str
+    method: str  # "pdf" (capa de texto) u "ocr"
+
+
+@dataclass
+class DownloadedDocument:
+    """Documento descargado a disco.
+
+    ``resumes`` cuenta las veces que la descarga se reanudó con ``Range``.
+    """
+    url: str
+    path: Path
+    size: int
+    sha256: str
+    content_type: Optional[str] = None
+    resumes: int = 0
+
+
+def _download_dir(directory: Optional[Union[str, Path]]) -> Path:
+    """Directorio de descargas (se crea si no existe)."""
+    path = Path(directory or DOCUMENT_DOWNLOAD_DIR or Path(tempfile.gettempdir()) / "arconte_documentos")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _hash_file(path: Path) -> "hashlib._Hash":
+    """SHA-256 de un archivo (para continuar el cálculo al reanudar una parte)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest
+
+
+def _read_meta(meta_path: Path, url: str) -> dict:
+    """Validadores (ETag/Last-Modified) de una parte descargada de ``url``."""
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return meta if meta.get("url") == url else {}
+
+
+def _try_lock(path: Path) -> Optional[IO[str]]:
+    """Toma sin esperar el candado ``path``; None si lo tiene otra llamada.
+
+    Si al tomarlo el archivo ya no es el de la ruta (su dueño anterior
+    lo borró al terminar) se reintenta con el archivo nuevo.
+    """
+    while True:
+        lock = open(path, "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return None
+        try:
+            if os.fstat(lock.fileno()).st_ino == os.stat(path).st_ino:
+                return lock
+        except FileNotFoundError:
+            pass
+        lock.close()
+
+
+@contextmanager
+def _download_part(folder: Path, name: str) -> Iterator[Tuple[Path, bool]]:
+    """Archivo parcial de una descarga.
+
+    La llamada que toma el candado ``<hash>.lock`` (de este u otro
+    proceso) escribe la parte reanudable ``<hash>.part``; las llamadas
+    concurrentes con la misma URL descargan a una parte propia, que se
+    borra al salir.  El candado se borra (aún tomado) cuando no queda
+    parte que reanudar, así que solo persiste junto a una parte.
+
+    Yields:
+        (ruta de la parte, si es la parte reanudable)
+    """
+    lock_path = folder / f"{name}.lock"
+    lock = _try_lock(lock_path) if fcntl is not None else None
+    if lock is not None:
+        part = folder / f"{name}.part"
+        try:
+            yield part, True
+        finally:
+            if not part.exists():
+                lock_path.unlink(missing_ok=True)
+            lock.close()
+        return
+
+    fd, path = tempfile.mkstemp(prefix=f"{name}.", suffix=".part", dir=folder)
+    os.close(fd)
+    part = Path(path)
+    try:
+        yield part, False
+    finally:
+        part.unlink(missing_ok=True)
+        part.with_name(f"{part.name}.json").unlink(missing_ok=True)
+
 
 async def download_document(url: str, timeout: int = 30) -> Optional[bytes]:
     """
-    Descarga un documento desde una URL.
+    Descarga un documento desde una URL a memoria.
+
+    Para documentos grandes usar ``download_document_to_file``; aquí el
+    contenido se lee en streaming y se descarta si supera
+    ``DOCUMENT_MAX_BYTES``.
 
     Args:
         url: URL del documento a descargar
@@ -30,48 +240,244 @@ async def download_document(url: str, timeout: int = 30) -> Optional[bytes]:
     """
     try:
         async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(url, follow_redirects=True)
-            if response.status_code == 200:
-                logger.info(f"Documento descargado exitosamente: {url}")
-                return response.content
-            else:
-                logger.warning(f"Error descargando documento: {url} - Status {response.status_code}")
-                return None
+            async with client.stream("GET", url, follow_redirects=True) as response:
+                if response.status_code != 200:
+                    logger.warning(f"Error descargando documento: {url} - Status {response.status_code}")
+                    return None
+                content = bytearray()
+                async for chunk in response.aiter_bytes(DOCUMENT_CHUNK_BYTES):
+                    content += chunk
+                    if DOCUMENT_MAX_BYTES and len(content) > DOCUMENT_MAX_BYTES:
+                        raise DocumentTooLarge(f"más de {DOCUMENT_MAX_BYTES} bytes")
+        logger.info(f"Documento descargado exitosamente: {url}")
+        return bytes(content)
     except Exception as e:
         logger.error(f"Excepción descargando documento {url}: {e}")
         return None
 
 
-def extract_text_from_pdf(pdf_content: bytes) -> Optional[str]:
+async def download_document_to_file(
+    url: str,
+    directory: Optional[Union[str, Path]] = None,
+    max_bytes: Optional[int] = None,
+    timeout: int = 30,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Optional[DownloadedDocument]:
     """
-    Extrae texto de un PDF usando PyPDF2.
+    Descarga un documento a disco en streaming.
+
+    - Los bloques se escriben a ``<directorio>/<hash de la URL>.part`` y
+      el SHA-256 del contenido se calcula mientras llegan.  Si otra
+      llamada ya está descargando la misma URL, esta escribe a una parte
+      propia (sin reanudación entre llamadas)
+    - Si el servidor anuncia (``Content-Length``) o entrega más de
+      ``max_bytes``, la descarga se aborta y se borra la parte
+    - Si la conexión se corta se reanuda desde lo ya escrito con
+      ``Range`` (con ``If-Range`` para no mezclar versiones del
+      documento), hasta ``DOCUMENT_DOWNLOAD_ATTEMPTS`` intentos; la parte
+      que deja una llamada fallida se reanuda en la siguiente.  Si el
+      servidor responde el documento completo se vuelve a empezar.  Los
+      5xx se reintentan tras ``DOCUMENT_RETRY_BACKOFF`` segundos,
+      duplicados en cada intento
+    - Al terminar, la parte se renombra a un archivo final propio de la
+      llamada, que quien llama mueve o borra
 
     Args:
-        pdf_content: Contenido del PDF en bytes
+        url: URL del documento
+        directory: Directorio de descarga (por defecto ``DOCUMENT_DOWNLOAD_DIR``)
+        max_bytes: Tamaño máximo (por defecto ``DOCUMENT_MAX_BYTES``; 0 sin límite)
+        timeout: Tiempo máximo de espera por operación en segundos
+        client: Cliente httpx a reutilizar (por defecto uno propio)
 
     Returns:
-        Texto extraído o None si falla
+        ``DownloadedDocument`` o None si falla
     """
-    try:
-        import PyPDF2
+    limit = DOCUMENT_MAX_BYTES if max_bytes is None else max_bytes
+    name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+    folder = _download_dir(directory)
+
+    with _download_part(folder, name) as (part, resumable):
+        meta_path = part.with_name(f"{part.name}.json")
+
+        # Parte de una llamada anterior: se reanuda si es de la misma URL
+        meta = _read_meta(meta_path, url) if resumable and part.exists() else {}
+        if resumable and part.exists() and not meta:
+            part.unlink()
+        size = part.stat().st_size if meta else 0
+        # Hash de lo ya descargado (hasta DOCUMENT_MAX_MB): en un hilo
+        digest = await asyncio.to_thread(_hash_file, part) if size else hashlib.sha256()
+
+        own_client = client is None
+        if own_client:
+            client = httpx.AsyncClient(timeout=timeout)
+        attempts = max(1, DOCUMENT_DOWNLOAD_ATTEMPTS)
+        resumes = 0
+        complete = False
+        try:
+            for attempt in range(1, attempts + 1):
+                headers = {}
+                if size:
+                    headers["Range"] = f"bytes={size}-"
+                    validator = meta.get("etag") or meta.get("last_modified")
+                    if validator:
+                        headers["If-Range"] = validator
+                    resumes += 1
+                    logger.info(f"Reanudando descarga de {url} desde el byte {size}")
+                try:
+                    async with client.stream(
+                        "GET", url, headers=headers, follow_redirects=True, timeout=timeout
+                    ) as response:
+                        status = response.status_code
+                        content_range = _CONTENT_RANGE.match(response.headers.get("content-range", ""))
+                        if status == 416 and size:
+                            # Rango no satisfacible: la parte ya estaba completa
+                            # (``bytes */<tamaño>``) o el documento cambió
+                            total = response.headers.get("content-range", "").rsplit("/", 1)[-1]
+                            if total == str(size):
+                                complete = True
+                                break
+                            part.unlink(missing_ok=True)
+                            digest, size = hashlib.sha256(), 0
+                            continue
+                        if status == 206 and content_range and int(content_range.group(1)) == size:
+                            mode = "ab"
+                        elif status == 200:
+                            if size:
+                                logger.info(f"El servidor no reanudó {url}; se descarga completo")
+                            digest, size, mode = hashlib.sha256(), 0, "wb"
+                        elif status == 206:
+                            logger.warning(f"Content-Range inesperado en {url}; se descarga completo")
+                            part.unlink(missing_ok=True)
+                            digest, size = hashlib.sha256(), 0
+                            continue
+                        elif status >= 500 and attempt < attempts:
+                            delay = DOCUMENT_RETRY_BACKOFF * 2 ** (attempt - 1)
+                            logger.warning(
+                                f"Error descargando documento: {url} - Status {status}, "
+                                f"reintentando en {delay:.1f} s"
+                            )
+                            await asyncio.sleep(delay)
+                            continue
+                        else:
+                            logger.warning(f"Error descargando documento: {url} - Status {status}")
+                            return None
+
+                        expected = response.headers.get("content-length", "")
+                        if limit and expected.isdigit() and size + int(expected) > limit:
+                            raise DocumentTooLarge(f"{size + int(expected)} bytes anunciados")
+                        meta = {
+                            "url": url,
+                            "etag": response.headers.get("etag"),
+                            "last_modified": response.headers.get("last-modified"),
+                            "content_type": response.headers.get("content-type", meta.get("content_type")),
+                        }
+                        meta_path.write_text(json.dumps(meta))
+
+                        # Cada bloque se escribe y se suma al hash antes de pedir
+                        # el siguiente: la parte y el hash quedan siempre alineados
+                        with open(part, mode) as fh:
+                            async for chunk in response.aiter_bytes(DOCUMENT_CHUNK_BYTES):
+                                if limit and size + len(chunk) > limit:
+                                    raise DocumentTooLarge(f"más de {limit} bytes")
+                                fh.write(chunk)
+                                digest.update(chunk)
+                                size += len(chunk)
+                        complete = True
+                        break
+                except httpx.TransportError as e:
+                    logger.warning(f"Descarga de {url} interrumpida en el byte {size} (intento {attempt}): {e}")
+        except DocumentTooLarge as e:
+            logger.warning(f"Documento demasiado grande, descarga abortada: {url} ({e}, máximo {limit})")
+            part.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            return None
+        except Exception as e:
+            logger.error(f"Excepción descargando documento {url}: {e}")
+            return None
+        finally:
+            if own_client:
+                await client.aclose()
+
+        if not complete:
+            logger.error(
+                f"No se pudo completar la descarga de {url}"
+                f"{'; la parte se reanudará en otra llamada' if resumable else ''}"
+            )
+            return None
 
-        pdf_file = io.BytesIO(pdf_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        # Archivo final propio de la llamada: quien llama lo mueve o lo
+        # borra sin afectar a otra descarga concurrente de la misma URL
+        suffix = Path(httpx.URL(url).path).suffix.lower()[:10]
+        fd, final_name = tempfile.mkstemp(prefix=f"{name}.", suffix=suffix, dir=folder)
+        os.close(fd)
+        final = Path(final_name)
+        os.replace(part, final)
+        meta_path.unlink(missing_ok=True)
+        document = DownloadedDocument(url, final, size, digest.hexdigest(), meta.get("content_type"), resumes)
+        logger.info(
+            f"Documento descargado exitosamente: {url} ({size} bytes, "
+            f"sha256 {document.sha256[:12]}, {resumes} reanudaciones)"
+        )
+        return document
 
-        text_parts = []
-        for page in pdf_reader.pages:
-            text = page.extract_text()
-            if text:
-                text_parts.append(text)
 
-        full_text = "\n".join(text_parts).strip()
+@contextmanager
+def _open_pdf(source: DocumentSource) -> Iterator[IO[bytes]]:
+    """Stream para PyPDF2: bytes en memoria o archivo mapeado con ``mmap``.
 
-        if full_text:
-            logger.info(f"Texto extraído del PDF: {len(full_text)} caracteres")
-            return full_text
-        else:
-            logger.warning("PDF no contiene texto extraíble, puede requerir OCR")
-            return None
+    PyPDF2 lee una ruta copiándola entera a un ``BytesIO``; con el mapa
+    el sistema operativo carga solo las páginas del archivo que se leen.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            yield fh  # mmap no admite archivos vacíos
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped  # type: ignore[misc]
+
+
+def text_layer_ok(text: Optional[str]) -> bool:
+    """
+    Indica si la capa de texto de una página es utilizable sin OCR.
+
+    Args:
+        text: Texto extraído de la página con PyPDF2
+
+    Returns:
+        True si tiene al menos ``PAGE_TEXT_MIN_CHARS`` caracteres visibles
+        y al menos ``PAGE_TEXT_MIN_PRINTABLE`` de ellos son imprimibles
+    """
+    if not text:
+        return False
+    visible = "".join(text.split())
+    if len(visible) < PAGE_TEXT_MIN_CHARS:
+        return False
+    garbage = sum(
+        1 for c in visible
+        if not c.isprintable() or c == "\ufffd" or unicodedata.category(c) == "Co"
+    )
+    return 1 - garbage / len(visible) >= PAGE_TEXT_MIN_PRINTABLE
+
+
+def extract_pdf_pages(pdf_content: DocumentSource) -> Optional[List[str]]:
+    """
+    Extrae la capa de texto de cada página de un PDF usando PyPDF2.
+
+    Args:
+        pdf_content: Contenido del PDF en bytes o ruta del archivo descargado
+
+    Returns:
+        Texto de cada página (vacío si no tiene) o None si falla
+    """
+    try:
+        import PyPDF2
+
+        with _open_pdf(pdf_content) as pdf_file:
+            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            return [page.extract_text() or "" for page in pdf_reader.pages]
 
     except ImportError:
         logger.error("PyPDF2 no está instalado. Instala con: pip install PyPDF2")
@@ -81,34 +487,54 @@ def extract_text_from_pdf(pdf_content: bytes) -> Optional[str]:
         return None
 
 
-def extract_text_with_ocr(pdf_content: bytes) -> Optional[str]:
+def extract_text_from_pdf(pdf_content: DocumentSource) -> Optional[str]:
     """
-    Extrae texto de un PDF escaneado usando OCR (Tesseract).
+    Extrae texto de un PDF usando PyPDF2.
 
     Args:
-        pdf_content: Contenido del PDF en bytes
+        pdf_content: Contenido del PDF en bytes o ruta del archivo descargado
 
     Returns:
         Texto extraído o None si falla
     """
-    try:
-        import pytesseract
-        from pdf2image import convert_from_bytes
-        from PIL import Image
+    pages = extract_pdf_pages(pdf_content)
+    if pages is None:
+        return None
+
+    full_text = "\n".join(text for text in pages if text).strip()
+
+    if full_text:
+        logger.info(f"Texto extraído del PDF: {len(full_text)} caracteres")
+        return full_text
+    else:
+        logger.warning("PDF no contiene texto extraíble, puede requerir OCR")
+        return None
+
 
-        # Convertir PDF a imágenes
-        images = convert_from_bytes(pdf_content)
+async def extract_text_with_ocr_async(pdf_content: DocumentSource) -> Optional[str]:
+    """
+    Extrae texto de un PDF escaneado usando OCR (Tesseract) sin bloquear el event loop.
 
-        text_parts = []
-        for i, image in enumerate(images):
-            logger.info(f"Aplicando OCR a página {i + 1}/{len(images)}")
+    Las páginas se rasterizan y reconocen en el pool de ``ocr_engine``
+    (ver ``OCR_WORKERS`` y ``OCR_MAX_INFLIGHT_PAGES``) y el texto se
+    reensambla en orden de página.
+
+    Args:
+        pdf_content: Contenido del PDF en bytes o ruta del archivo descargado
 
-            # Aplicar OCR con configuración para español
-            text = pytesseract.image_to_string(image, lang='spa')
-            if text:
-                text_parts.append(text)
+    Returns:
+        Texto extraído o None si falla
+    """
+    try:
+        with tempfile.TemporaryDirectory(prefix="ocr_") as workdir:
+            if isinstance(pdf_content, (bytes, bytearray)):
+                pdf_path = Path(workdir) / "documento.pdf"
+                pdf_path.write_bytes(pdf_content)
+            else:
+                pdf_path = Path(pdf_content)
+            result = await ocr_engine.ocr(pdf_path)
 
-        full_text = "\n".join(text_parts).strip()
+        full_text = result.text
 
         if full_text:
             logger.info(f"Texto extraído con OCR: {len(full_text)} caracteres")
@@ -128,12 +554,300 @@ def extract_text_with_ocr(pdf_content: bytes) -> Optional[str]:
         return None
 
 
+def extract_text_with_ocr(pdf_content: DocumentSource) -> Optional[str]:
+    """
+    Versión síncrona de ``extract_text_with_ocr_async`` (scripts y código
+    fuera del event loop; dentro de él usar la versión asíncrona).
+
+    Args:
+        pdf_content: Contenido del PDF en bytes o ruta del archivo descargado
+
+    Returns:
+        Texto extraído o None si falla
+    """
+    return asyncio.run(extract_text_with_ocr_async(pdf_content))
+
+
+async def _ocr_pages(path: Path, pages: Optional[Sequence[int]] = None) -> Optional[OcrResult]:
+    """OCR de un PDF (o de ``pages``) en el pool; None si el OCR no pudo ejecutarse."""
+    try:
+        return await ocr_engine.ocr(path, pages=pages)
+    except ImportError as e:
+        logger.error(
+            f"Dependencias de OCR no instaladas: {e}. "
+            "Instala con: pip install pytesseract pdf2image pillow"
+        )
+    except Exception as e:
+        logger.error(f"Error aplicando OCR: {e}")
+    return None
+
+
+async def _extract_pages(path: Path, use_ocr: bool) -> tuple[Optional[str], str, bool]:
+    """Texto de un PDF decidiendo por página entre capa de texto y OCR.
+
+    Las páginas cuya capa de texto no pasa ``text_layer_ok`` se
+    reconocen con OCR (si ``use_ocr``); si el OCR no devuelve nada para
+    una de ellas se conserva su capa de texto, aunque sea pobre.
+
+    Returns:
+        ``(texto, método, completo)`` con método ``pdf``, ``ocr`` o
+        ``pdf+ocr``; ``completo`` es False si quedaron páginas por
+        reconocer (OCR no permitido, no disponible, con error o sin
+        texto reconocido) y el texto no debe guardarse como definitivo
+    """
+    # PyPDF2 extrae la capa de texto de todas las páginas: en un hilo
+    pages = await asyncio.to_thread(extract_pdf_pages, path)
+    if pages is None:
+        # PyPDF2 no pudo leer el documento: OCR completo
+        if not use_ocr:
+            return None, "pdf", False
+        logger.info("PDF ilegible con PyPDF2, intentando OCR...")
+        result = await _ocr_pages(path)
+        if result is None:
+            return None, "ocr", False
+        recognized = sum(1 for page in result.pages if page.text.strip())
+        page_paths["documents"] += 1
+        page_paths["ocr"] += recognized
+        page_paths["empty"] += len(result.pages) - recognized
+        if not result.text:
+            logger.warning("OCR no pudo extraer texto del documento")
+        return result.text or None, "ocr", not result.errors and recognized == len(result.pages)
+
+    weak = [number for number, text in enumerate(pages, 1) if not text_layer_ok(text)]
+    ocr_pages = 0
+    if weak and use_ocr:
+        logger.info(f"{len(weak)} de {len(pages)} páginas sin capa de texto utilizable, intentando OCR...")
+        result = await _ocr_pages(path, weak)
+        if result is not None:
+            for page in result.pages:
+                if page.text.strip():
+                    pages[page.page - 1] = page.text
+                    ocr_pages += 1
+
+    text_layer = len(pages) - len(weak)
+    empty = sum(1 for text in pages if not text.strip())
+    page_paths["documents"] += 1
+    page_paths["text_layer"] += text_layer
+    page_paths["ocr"] += ocr_pages
+    page_paths["weak_text_layer"] += len(weak) - ocr_pages - empty
+    page_paths["empty"] += empty
+    logger.info(
+        f"Páginas: {text_layer} con capa de texto, {ocr_pages} con OCR, "
+        f"{len(weak) - ocr_pages - empty} con capa de texto pobre, {empty} vacías"
+    )
+
+    full_text = "\n".join(text for text in pages if text).strip()
+    method = "ocr" if ocr_pages and not text_layer else "pdf+ocr" if ocr_pages else "pdf"
+    # Solo es definitivo si todas las páginas débiles se reconocieron
+    return full_text or None, method, ocr_pages == len(weak)
+
+
+def _page_texts(pages: Sequence[Any], start: int, stop: int) -> List[str]:
+    """Capa de texto de las páginas ``start``..``stop - 1`` (PyPDF2)."""
+    return [pages[index].extract_text() or "" for index in range(start, stop)]
+
+
+def _count_layer_page(text: str):
+    """Cuenta en ``page_paths`` una página que se queda con su capa de texto."""
+    if text_layer_ok(text):
+        page_paths["text_layer"] += 1
+    elif text.strip():
+        page_paths["weak_text_layer"] += 1
+    else:
+        page_paths["empty"] += 1
+
+
+async def iter_document_pages(pdf_path: Path, use_ocr: bool = True) -> AsyncIterator[DocumentPage]:
+    """
+    Extrae un PDF página a página, en orden, como generador asíncrono.
+
+    La capa de texto de cada página se extrae solo cuando se pide la
+    página.  Al llegar a una página sin capa de texto utilizable
+    (``text_layer_ok``) se extraen también las siguientes hasta completar
+    una tanda de ``ocr_engine.max_inflight`` páginas y las que lo
+    necesitan pasan juntas por el pool de OCR; si el consumidor deja de
+    iterar, las páginas siguientes no se extraen ni se reconocen.  La
+    extracción de cada página (o tanda) corre en un hilo, sin bloquear
+    el event loop.
+
+    Args:
+        pdf_path: Ruta del PDF en disco
+        use_ocr: Si debe usar OCR para las páginas sin capa de texto
+
+    Yields:
+        ``DocumentPage`` por página
+    """
+    import PyPDF2
+
+    with _open_pdf(pdf_path) as pdf_file:
+        # PyPDF2 (lectura del índice y extracción de cada página) corre
+        # en un hilo; la página siguiente se pide solo al reanudar
+        pages = await asyncio.to_thread(lambda: PyPDF2.PdfReader(pdf_file).pages)
+        total = await asyncio.to_thread(len, pages)
+        page_paths["documents"] += 1
+        index = 0
+        while index < total:
+            [text] = await asyncio.to_thread(_page_texts, pages, index, index + 1)
+            if not use_ocr or text_layer_ok(text):
+                _count_layer_page(text)
+                index += 1
+                yield DocumentPage(index, total, text, "pdf")
+                continue
+
+            end = min(total, index + max(1, ocr_engine.max_inflight))
+            batch = [text] + await asyncio.to_thread(_page_texts, pages, index + 1, end)
+            weak = [index + offset + 1 for offset, page_text in enumerate(batch) if not text_layer_ok(page_text)]
+            result = await _ocr_pages(pdf_path, weak)
+            recognized: Dict[int, str] = {
+                page.page: page.text for page in result.pages if page.text.strip()
+            } if result is not None else {}
+
+            for page_text in batch:
+                index += 1
+                if index in recognized:
+                    page_paths["ocr"] += 1
+                    yield DocumentPage(index, total, recognized[index], "ocr")
+                    continue
+                _count_layer_page(page_text)
+                yield DocumentPage(index, total, page_text, "pdf")
+
+
+async def _store_lookup(store: Optional[DocumentStore], url: str) -> Optional[StoredDocument]:
+    """Busca la URL en el almacén desde un hilo.
+
+    El índice SQLite se comparte entre workers: si está bloqueado la
+    consulta se trata como un fallo del almacén.
+    """
+    if not store:
+        return None
+    try:
+        return await asyncio.to_thread(store.lookup, url, EXTRACTOR_VERSION)
+    except sqlite3.Error as e:
+        logger.warning(f"Almacén de documentos no disponible para {url}: {e}")
+        return None
+
+
+async def _store_put(store: Optional[DocumentStore], document: DownloadedDocument) -> Optional[Path]:
+    """Mueve el documento descargado al almacén desde un hilo.
+
+    Devuelve None sin almacén o si el índice sigue bloqueado; el archivo
+    queda entonces en ``document.path``.
+    """
+    if not store:
+        return None
+    try:
+        return await asyncio.to_thread(
+            store.put, document.url, document.path, document.sha256, document.content_type
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"No se pudo guardar {document.url} en el almacén: {e}")
+        return None
+
+
+async def classify_document(url: str, use_ocr: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Clasifica el auto de un documento leyéndolo solo hasta donde hace falta.
+
+    Las páginas de ``iter_document_pages`` alimentan un
+    ``IncrementalAutoClassifier`` (las reglas de ``classify_auto``) y la
+    lectura se detiene cuando el auto ya es perentorio con confianza
+    plena o cuando se consumió la sección resolutiva ("RESUELVE" ...
+    "CÚMPLASE").  Si el texto completo ya está en el almacén de
+    documentos se clasifica ese texto, sin extraer nada; si no, el
+    documento descargado se guarda en el almacén (el texto parcial no).
+
+    Args:
+        url: URL del documento (PDF)
+        use_ocr: Si debe usar OCR para las páginas sin capa de texto
+
+    Returns:
+        Diccionario con ``auto_type``, ``classification_confidence``,
+        ``requires_action``, páginas leídas y totales, páginas con OCR y
+        motivo de la parada (``confident``, ``operative_section`` o None
+        si se leyó entero), o None si el documento no se pudo obtener
+    """
+    if not url.lower().endswith('.pdf'):
+        logger.warning(f"Tipo de documento no soportado: {url}")
+        return None
+
+    classifier = IncrementalAutoClassifier()
+    store = document_store
+    stored = await _store_lookup(store, url)
+    if stored and stored.text is not None:
+        classifier.feed(stored.text)
+        auto_type, confidence = classifier.result()
+        return {
+            "auto_type": auto_type.value,
+            "classification_confidence": confidence,
+            "requires_action": auto_type == AutoType.PERENTORIO,
+            "pages_read": None,
+            "pages_total": None,
+            "ocr_pages": 0,
+            "stopped": None,
+            "source": "store",
+        }
+
+    if stored:
+        path = stored.path
+    else:
+        document = await download_document_to_file(url, directory=store.staging if store else None)
+        if not document:
+            return None
+        path = await _store_put(store, document)
+        if path is None:
+            store, path = None, document.path
+
+    pages_read = pages_total = ocr_pages = 0
+    stopped = None
+    try:
+        async with aclosing(iter_document_pages(path, use_ocr)) as pages:
+            async for page in pages:
+                pages_read, pages_total = page.number, page.total
+                ocr_pages += page.method == "ocr"
+                classifier.feed(page.text)
+                if classifier.done and page.number < page.total:
+                    stopped = "confident" if classifier.confident else "operative_section"
+                    break
+    except Exception as e:
+        logger.error(f"Error extrayendo texto del PDF: {e}")
+        return None
+    finally:
+        if not store:
+            path.unlink(missing_ok=True)
+
+    auto_type, confidence = classifier.result()
+    logger.info(
+        f"Documento {url} clasificado como {auto_type.value} ({confidence:.2f}) con "
+        f"{pages_read}/{pages_total} páginas ({ocr_pages} con OCR"
+        f"{f', parada: {stopped}' if stopped else ''})"
+    )
+    return {
+        "auto_type": auto_type.value,
+        "classification_confidence": confidence,
+        "requires_action": auto_type == AutoType.PERENTORIO,
+        "pages_read": pages_read,
+        "pages_total": pages_total,
+        "ocr_pages": ocr_pages,
+        "stopped": stopped,
+        "source": "pages",
+    }
+
+
 async def extract_document_text(url: str, use_ocr: bool = True) -> Optional[str]:
     """
     Descarga y extrae texto de un documento judicial.
 
-    Primero intenta extraer texto directamente del PDF.
-    Si falla y use_ocr es True, aplica OCR para PDFs escaneados.
+    Usa la capa de texto de las páginas que la tienen utilizable y, si
+    use_ocr es True, aplica OCR solo a las demás (páginas escaneadas).
+    El documento se descarga a disco y se procesa desde el archivo.
+
+    Con almacén de documentos (``document_store``), si la URL ya se
+    descargó y su texto se extrajo con ``EXTRACTOR_VERSION`` se devuelve
+    ese texto; si solo está el documento, se extrae de él sin
+    descargarlo.  El texto extraído se guarda para las siguientes
+    llamadas (un resultado vacío, o sin el OCR de páginas que lo
+    necesitaban, no, para reintentarlo).  Sin almacén el
+    archivo se borra al terminar.
 
     Args:
         url: URL del documento a procesar
@@ -142,34 +856,52 @@ async def extract_document_text(url: str, use_ocr: bool = True) -> Optional[str]
     Returns:
         Texto completo del documento o None si falla
     """
-    # Descargar documento
-    content = await download_document(url)
-    if not content:
-        return None
-
     # Detectar tipo de documento por extensión
     url_lower = url.lower()
 
-    if url_lower.endswith('.pdf'):
-        # Intentar extracción normal
-        text = extract_text_from_pdf(content)
-
-        # Si falla y OCR está habilitado, intentar con OCR
-        if not text and use_ocr:
-            logger.info("PDF sin texto extraíble, intentando OCR...")
-            text = extract_text_with_ocr(content)
-
-        return text
-
-    elif url_lower.endswith(('.doc', '.docx')):
+    if url_lower.endswith(('.doc', '.docx')):
         # Para documentos Word (implementación futura)
         logger.warning("Extracción de documentos Word no implementada aún")
         return None
 
-    else:
+    if not url_lower.endswith('.pdf'):
         logger.warning(f"Tipo de documento no soportado: {url}")
         return None
 
+    store = document_store
+    stored = await _store_lookup(store, url)
+    if stored and stored.text is not None:
+        logger.info(f"Texto de {url} servido desde el almacén ({stored.method}, sha256 {stored.sha256[:12]})")
+        return stored.text
+
+    if stored:
+        logger.info(f"Documento {url} en el almacén; se extrae sin descargar")
+        path, sha256 = stored.path, stored.sha256
+    else:
+        # Descargar documento (al directorio del almacén para moverlo sin copiar)
+        document = await download_document_to_file(url, directory=store.staging if store else None)
+        if not document:
+            return None
+        sha256 = document.sha256
+        path = await _store_put(store, document)
+        if path is None:
+            store, path = None, document.path
+
+    try:
+        start = time.perf_counter()
+        text, method, complete = await _extract_pages(path, use_ocr)
+        if text and complete and store:
+            try:
+                await asyncio.to_thread(
+                    store.put_text, sha256, EXTRACTOR_VERSION, method, text, time.perf_counter() - start
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"No se pudo guardar el texto de {url} en el almacén: {e}")
+        return text
+    finally:
+        if not store:
+            path.unlink(missing_ok=True)
+
 
 def save_document_locally(content: bytes, filename: str, directory: str = "downloads") -> Path:
     """
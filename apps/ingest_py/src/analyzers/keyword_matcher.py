@@ -0,0 +1,148 @@
+"""
+Búsqueda de muchas palabras clave (regex) en una sola pasada.
+
+El clasificador de autos tenía unos 60 patrones que se buscaban uno a
+uno con ``re.search`` (y el ganador se repetía para la confianza).
+``KeywordMatcher`` los combina en una sola expresión regular con forma
+de trie: los prefijos literales de los patrones se factorizan por
+carácter (como en Aho–Corasick) y el resto de cada patrón queda en su
+rama, marcado con un grupo nombrado vacío que identifica al patrón.
+
+Una pasada con ``search`` desde cada inicio de coincidencia encuentra,
+en cada posición, un patrón que coincide allí.  Dos patrones solo
+pueden coincidir en la misma posición si el prefijo literal de uno es
+prefijo del otro; esos "conflictos" se calculan al construir el
+matcher y se verifican con ``match`` en la posición encontrada.  Así el
+conjunto de patrones encontrados es el mismo que con un ``search`` por
+patrón.
+
+El texto debe llegar en minúsculas (como en el clasificador).  Los
+patrones se pasan a minúsculas y se compilan sin ``IGNORECASE``, que es
+bastante más lento en expresiones combinadas; las únicas minúsculas que
+``IGNORECASE`` iguala con otra letra latina (``ı`` y ``ſ``) se traducen
+antes de buscar, de modo que el resultado no cambia.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Mapping, Pattern, Sequence, Set, Tuple
+
+# Caracteres con significado especial fuera de una clase
+_META = frozenset(".^$*+?{}[]\\|()")
+
+# Minúsculas que IGNORECASE considera iguales a otra letra latina
+_FOLD = str.maketrans({"ı": "i", "ſ": "s"})
+
+
+def _lower_pattern(pattern: str) -> str:
+    """Pasa a minúsculas los literales del patrón (no las secuencias ``\\X``)."""
+    out = []
+    escaped = False
+    for ch in pattern:
+        out.append(ch if escaped else ch.lower())
+        escaped = not escaped and ch == "\\"
+    return "".join(out)
+
+
+def _literal_prefix_len(pattern: str) -> int:
+    """Longitud del prefijo del patrón que es texto literal obligatorio."""
+    if "|" in pattern:
+        # Una alternativa de primer nivel puede empezar por cualquier cosa
+        return 0
+    length = 0
+    for ch in pattern:
+        if ch in _META:
+            if ch in "*?{" and length:
+                length -= 1  # El carácter anterior es opcional o repetido
+            break
+        length += 1
+    return length
+
+
+class KeywordMatcher:
+    """
+    Patrones agrupados por etiqueta, buscados en una sola pasada.
+
+    - ``hits(text)``: índices de los patrones que aparecen en el texto
+    - ``counts(text)``: cuántos patrones distintos de cada etiqueta aparecen
+    """
+
+    def __init__(self, groups: Mapping[str, Sequence[str]]):
+        """
+        Args:
+            groups: Etiqueta -> patrones regex (p. ej. ``perentorio``/``tramite``)
+        """
+        self.labels: Tuple[str, ...] = tuple(groups)
+        self.patterns: List[str] = []
+        self.label_of: List[int] = []
+        for label_index, label in enumerate(self.labels):
+            for pattern in groups[label]:
+                self.patterns.append(_lower_pattern(pattern))
+                self.label_of.append(label_index)
+
+        self._single: List[Pattern[str]] = [re.compile(p) for p in self.patterns]
+
+        items = []
+        for index, pattern in enumerate(self.patterns):
+            cut = _literal_prefix_len(pattern)
+            items.append((pattern[:cut], pattern[cut:], index))
+
+        # Patrones que pueden coincidir en la misma posición que cada uno
+        self._conflicts: List[Tuple[int, ...]] = [
+            tuple(
+                other for other_prefix, _, other in items
+                if other != index
+                and (prefix.startswith(other_prefix) or other_prefix.startswith(prefix))
+            )
+            for prefix, _, index in items
+        ]
+        self._combined: Pattern[str] = re.compile(self._trie(items, 0))
+
+    @classmethod
+    def _trie(cls, items: Sequence[Tuple[str, str, int]], depth: int) -> str:
+        """Expresión con los prefijos literales factorizados a partir de ``depth``."""
+        branches: Dict[str, List[Tuple[str, str, int]]] = {}
+        leaves = []
+        for prefix, rest, index in items:
+            if len(prefix) == depth:
+                leaves.append(f"(?:{rest})(?P<k{index}>)" if rest else f"(?P<k{index}>)")
+            else:
+                branches.setdefault(prefix[depth], []).append((prefix, rest, index))
+        alternatives = [
+            re.escape(ch) + cls._trie(children, depth + 1)
+            for ch, children in branches.items()
+        ]
+        alternatives.extend(leaves)
+        if len(alternatives) == 1 and not leaves:
+            return alternatives[0]
+        return "(?:" + "|".join(alternatives) + ")"
+
+    def hits(self, text: str) -> Set[int]:
+        """Índices de los patrones con al menos una coincidencia en ``text``."""
+        text = text.translate(_FOLD)
+        found: Set[int] = set()
+        search = self._combined.search
+        single = self._single
+        conflicts = self._conflicts
+        pos = 0
+        while True:
+            match = search(text, pos)
+            if match is None:
+                return found
+            index = int(match.lastgroup[1:])
+            start = match.start()
+            found.add(index)
+            for other in conflicts[index]:
+                if other not in found and single[other].match(text, start):
+                    found.add(other)
+            pos = start + 1
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Patrones distintos encontrados por etiqueta."""
+        counts = dict.fromkeys(self.labels, 0)
+        labels = self.labels
+        label_of = self.label_of
+        for index in self.hits(text):
+            counts[labels[label_of[index]]] += 1
+        return counts
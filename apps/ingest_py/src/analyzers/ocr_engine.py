@@ -0,0 +1,265 @@
+"""
+Motor de OCR por páginas en un pool de procesos.
+
+El OCR de un expediente escaneado es CPU pura (Tesseract) y puede
+tardar minutos; hecho en serie dentro de una petición bloquea el event
+loop.  ``OcrEngine`` reparte las páginas entre procesos:
+
+- Cada tarea es una página: el proceso la rasteriza él mismo
+  (``convert_from_path`` con ``first_page``/``last_page``) y le aplica
+  Tesseract, así que solo viajan la ruta y el número de página, y el
+  texto de vuelta
+- Las páginas se envían a medida que se liberan huecos: como mucho
+  ``max_inflight`` páginas en curso entre todos los documentos, de modo
+  que la memoria queda acotada a una imagen por página en curso y los
+  documentos concurrentes se intercalan en lugar de esperar en cola
+- El texto se reensambla en orden de página
+- Si un proceso muere (p. ej. por falta de memoria) el pool queda roto
+  (``BrokenProcessPool``): se descarta, se crea otro y la página se
+  reintenta una vez
+- Cada página registra su tiempo de rasterizado y de OCR en las etapas
+  ``ocr_rasterize`` y ``ocr_page`` (``/metrics``)
+
+Tesseract se limita a un hilo por proceso (``OMP_THREAD_LIMIT=1``): el
+paralelismo lo da el pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..utils.timing import record_stage
+
+logger = logging.getLogger(__name__)
+
+# Procesos de OCR (0 = uno por núcleo)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0"))
+# Páginas en curso como máximo entre todos los documentos (0 = OCR_WORKERS)
+OCR_MAX_INFLIGHT_PAGES = int(os.getenv("OCR_MAX_INFLIGHT_PAGES", "0"))
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_LANG = os.getenv("OCR_LANG", "spa")
+
+
+@dataclass
+class PageText:
+    """Texto de una página con sus tiempos (ms)."""
+    page: int
+    text: str
+    rasterize_ms: float
+    ocr_ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class OcrResult:
+    """Resultado del OCR de un documento, páginas en orden."""
+    pages: List[PageText] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(p.text for p in self.pages if p.text).strip()
+
+    @property
+    def errors(self) -> int:
+        return sum(1 for p in self.pages if p.error)
+
+
+def _init_worker():
+    """Inicializador de cada proceso: Tesseract de un solo hilo."""
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ocr_page(pdf_path: str, page: int, dpi: int, lang: str) -> Tuple[str, float, float]:
+    """Rasteriza y reconoce una página (se ejecuta en el pool).
+
+    Returns:
+        ``(texto, ms de rasterizado, ms de OCR)``
+    """
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    start = time.perf_counter()
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page, last_page=page, grayscale=True)
+    rasterized = time.perf_counter()
+    text = ""
+    for image in images:
+        text += pytesseract.image_to_string(image, lang=lang)
+        image.close()
+    done = time.perf_counter()
+    return text, (rasterized - start) * 1000, (done - rasterized) * 1000
+
+
+def page_count(pdf_path: Union[str, Path]) -> int:
+    """Número de páginas de un PDF (``pdfinfo``)."""
+    from pdf2image import pdfinfo_from_path
+
+    return int(pdfinfo_from_path(str(pdf_path))["Pages"])
+
+
+class OcrEngine:
+    """
+    OCR de PDFs por páginas en un ``ProcessPoolExecutor``.
+
+    El pool se crea al primer uso y se cierra con ``shutdown``.
+    """
+
+    def __init__(
+        self,
+        workers: int = OCR_WORKERS,
+        max_inflight: int = OCR_MAX_INFLIGHT_PAGES,
+        dpi: int = OCR_DPI,
+        lang: str = OCR_LANG,
+    ):
+        """
+        Args:
+            workers: Procesos del pool (0 = uno por núcleo)
+            max_inflight: Páginas en curso como máximo (0 = ``workers``)
+            dpi: Resolución del rasterizado
+            lang: Idioma de Tesseract
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_inflight = max_inflight or self.workers
+        self.dpi = dpi
+        self.lang = lang
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.inflight = 0
+        self.documents = 0
+        self.pages = 0
+        self.page_errors = 0
+        self.pool_restarts = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            logger.info(f"Pool de OCR iniciado ({self.workers} procesos, {self.max_inflight} páginas en curso)")
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Descarta un pool roto; la siguiente página crea otro."""
+        if self._pool is pool:
+            self._pool = None
+            self.pool_restarts += 1
+            pool.shutdown(wait=False, cancel_futures=True)
+            logger.warning("Pool de OCR roto (un proceso terminó de forma abrupta); se creará otro")
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """Semáforo de páginas en curso del event loop actual."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_inflight)
+            self._slots_loop = loop
+        return self._slots
+
+    async def ocr(
+        self,
+        pdf_path: Union[str, Path],
+        first_page: int = 1,
+        last_page: Optional[int] = None,
+        pages: Optional[Sequence[int]] = None,
+    ) -> OcrResult:
+        """
+        Aplica OCR a las páginas ``first_page``..``last_page`` de un PDF
+        (o solo a ``pages``, si se indican).
+
+        Una página que falla queda con texto vacío y su error en
+        ``PageText.error``; el resto del documento sigue.
+
+        Args:
+            pdf_path: Ruta del PDF en disco
+            first_page: Primera página (desde 1)
+            last_page: Última página (por defecto la última del documento)
+            pages: Páginas concretas (desde 1); sustituye al rango
+
+        Returns:
+            ``OcrResult`` con el texto de cada página en orden
+
+        Raises:
+            ImportError: Si faltan pytesseract o pdf2image
+        """
+        import pytesseract  # noqa: F401  (fallar aquí y no en cada página)
+
+        path = str(pdf_path)
+        loop = asyncio.get_running_loop()
+        if pages is not None:
+            numbers: Sequence[int] = sorted(pages)
+            last_page = numbers[-1] if numbers else 0
+        else:
+            if last_page is None:
+                last_page = await loop.run_in_executor(None, page_count, path)
+            numbers = range(first_page, last_page + 1)
+        slots = self._get_slots()
+        start = time.perf_counter()
+        self.documents += 1
+
+        async def run_in_pool(page: int) -> Tuple[str, float, float]:
+            for attempt in (1, 2):
+                pool = self._get_pool()
+                try:
+                    return await loop.run_in_executor(pool, _ocr_page, path, page, self.dpi, self.lang)
+                except BrokenProcessPool:
+                    # Las páginas en curso fallan todas a la vez: solo la
+                    # primera descarta el pool y cada una se reintenta una vez
+                    self._discard_pool(pool)
+                    if attempt == 2:
+                        raise
+
+        async def run_page(page: int) -> PageText:
+            async with slots:
+                self.inflight += 1
+                try:
+                    text, raster_ms, ocr_ms = await run_in_pool(page)
+                except Exception as e:
+                    self.page_errors += 1
+                    logger.error(f"Error aplicando OCR a la página {page} de {path}: {e}")
+                    return PageText(page, "", 0.0, 0.0, str(e))
+                finally:
+                    self.inflight -= 1
+            self.pages += 1
+            record_stage("ocr_rasterize", raster_ms)
+            record_stage("ocr_page", ocr_ms)
+            logger.debug(f"OCR página {page}/{last_page}: {raster_ms:.0f} + {ocr_ms:.0f} ms")
+            return PageText(page, text, raster_ms, ocr_ms)
+
+        # gather conserva el orden de las páginas; el semáforo decide
+        # cuántas están en el pool a la vez
+        pages = await asyncio.gather(*(run_page(page) for page in numbers))
+        result = OcrResult(list(pages), time.perf_counter() - start)
+        logger.info(
+            f"OCR de {len(pages)} páginas en {result.seconds:.1f} s "
+            f"({self.workers} procesos, {result.errors} con error)"
+        )
+        return result
+
+    def shutdown(self):
+        """Cierra el pool de OCR (al apagar la aplicación)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            logger.info("Pool de OCR cerrado")
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado del motor para ``/metrics`` (tiempos por página en ``stages``)."""
+        return {
+            "workers": self.workers,
+            "max_inflight": self.max_inflight,
+            "inflight": self.inflight,
+            "documents": self.documents,
+            "pages": self.pages,
+            "page_errors": self.page_errors,
+            "pool_restarts": self.pool_restarts,
+        }
+
+
+ocr_engine = OcrEngine()
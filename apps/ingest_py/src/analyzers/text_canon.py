@@ -0,0 +1,55 @@
+"""
+Forma canónica del texto de las actuaciones para el clasificador.
+
+``canonicalize`` aplica, una sola vez por texto, la descomposición
+Unicode NFKD, elimina las marcas diacríticas (tildes, diéresis, la
+virgulilla de la ñ), pasa a minúsculas y colapsa los espacios.  Las
+palabras clave se pliegan igual (``fold_pattern``), de modo que una
+sola entrada ``admítase`` cubre ``admítase``, ``admitase`` y ``ADMITASE``.
+
+Los tipos y anotaciones de actuación se repiten mucho entre procesos,
+por lo que los resultados se guardan en un LRU por texto.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Bloques de marcas combinantes que deja NFKD en textos latinos
+_COMBINING = re.compile("[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fold_case(text: str) -> str:
+    """Texto sin diacríticos y en minúsculas, sin colapsar espacios.
+
+    Sin cache: para bloques grandes de texto que luego se dividen en
+    palabras con ``str.split`` (``vector_classifier``).
+    """
+    if not text.isascii():
+        text = _COMBINING.sub("", unicodedata.normalize("NFKD", text))
+    return text.lower()
+
+
+@lru_cache(maxsize=8192)
+def canonicalize(text: str) -> str:
+    """Texto sin diacríticos, en minúsculas y con espacios colapsados."""
+    return _WHITESPACE.sub(" ", fold_case(text)).strip()
+
+
+def fold_pattern(pattern: str) -> str:
+    """Pliega los literales de un patrón regex como ``canonicalize``.
+
+    Las secuencias de escape (``\\s``, ``\\d``...) se conservan tal cual.
+    """
+    out = []
+    escaped = False
+    for ch in pattern:
+        if escaped:
+            out.append(ch)
+        else:
+            out.append(_COMBINING.sub("", unicodedata.normalize("NFKD", ch)).lower())
+        escaped = not escaped and ch == "\\"
+    return "".join(out)
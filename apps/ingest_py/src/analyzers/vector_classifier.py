@@ -0,0 +1,365 @@
+"""
+Motor vectorial del clasificador de autos (NumPy).
+
+Alternativa a las reglas regex de ``auto_classifier`` para reclasificar
+lotes grandes (el corpus completo de actuaciones).  En lugar de buscar
+patrones actuación por actuación, todo el lote se convierte en una
+matriz dispersa de n-gramas y se puntúa con un producto contra una
+matriz de pesos:
+
+- El texto se pliega como en las reglas (sin tildes y en minúsculas,
+  ``fold_case``), una vez por bloque de actuaciones, y se divide en
+  palabras (sin signos de puntuación); cada palabra se reduce a sus primeros
+  ``STEM_LEN`` caracteres (``agréguese`` y ``agregue`` comparten
+  ``agregu``) y los números a ``0`` (como ``\\d+`` en las reglas)
+- Los n-gramas de 1 a ``max_n`` raíces se proyectan por hashing en
+  ``2**bits`` columnas; cada n-grama cuenta una vez por actuación
+- ``puntajes = X @ W + b`` con una columna por cabeza (``HEADS``); el
+  producto se calcula como suma de filas de ``W`` por actuación, sin
+  materializar ``X``
+
+Los pesos iniciales salen de las listas de palabras clave
+(``from_keywords``): cada palabra clave es un n-grama con peso 1 en su
+cabeza, de modo que el puntaje aproxima el número de patrones que
+coinciden y la decisión suele ser la misma que la de las reglas.  No
+siempre: la raíz de ``STEM_LEN`` caracteres no distingue formas que las
+reglas sí separan (``requiera`` y ``requieren`` comparten ``requie``,
+así que "Se requieren los documentos" es perentorio para el motor
+vectorial y desconocido para las reglas).  ``bench_vector_classifier``
+mide la coincidencia con las reglas en cada corpus.  Los pesos
+se pueden reentrenar fuera de línea con actuaciones etiquetadas
+(``train``) y guardar en un ``.npz`` (``save``/``load``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import zlib
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .text_canon import fold_case
+
+logger = logging.getLogger(__name__)
+
+# Columnas de la matriz de pesos
+HEADS = ("auto", "perentorio", "tramite", "plazo")
+_AUTO, _PERENTORIO, _TRAMITE, _PLAZO = range(len(HEADS))
+
+# Caracteres de cada palabra que se conservan como raíz
+STEM_LEN = 6
+
+# Actuaciones por bloque al puntuar (acota la memoria de los n-gramas)
+BLOCK_SIZE = 4096
+
+# Máximo de palabras distintas con su hash memorizado
+_MAX_VOCABULARY = 500_000
+
+_WORD = re.compile(r"\w+")
+_NON_WORD = re.compile(r"\W+")
+_DIGITS = re.compile(r"\d+")
+
+# Separador de las actuaciones de un bloque (palabra propia entre espacios)
+_SEPARATOR_WORD = "\x00"
+# Hashes reservados (los de las raíces son de 32 bits): separador y
+# palabras sin letras ni números (signos sueltos), que se descartan
+_SEPARATOR = 1 << 63
+_SKIP = 1 << 62
+_MAX_STEM_HASH = (1 << 32) - 1
+
+# Constantes del hash de n-gramas (aritmética módulo 2**64)
+_PRIME = 0x100000001B3
+_MIX = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+
+# Clasificación: (is_auto, auto_type, classification_confidence)
+Classification = Tuple[bool, Optional[str], float]
+
+
+def _stem_hash(word: str) -> int:
+    """Hash estable (entre procesos) de la raíz de una palabra."""
+    return zlib.crc32(_DIGITS.sub("0", word)[:STEM_LEN].encode("utf-8"))
+
+
+class _StemHashes(dict):
+    """Palabra del texto -> hash de su raíz, calculado la primera vez.
+
+    Las palabras salen de ``str.split`` (mucho más rápido que una
+    regex); los signos pegados (``días,``) se quitan aquí, una vez por
+    palabra distinta.
+    """
+
+    def __init__(self):
+        super().__init__({_SEPARATOR_WORD: _SEPARATOR})
+
+    def __missing__(self, token: str) -> int:
+        word = _NON_WORD.sub("", token)
+        value = self[token] = _stem_hash(word) if word else _SKIP
+        return value
+
+
+def _keyword_phrases(pattern: str) -> List[Tuple[List[str], float]]:
+    """Frases de palabras de un patrón plegado y el peso de cada una.
+
+    ``\\s+`` separa palabras, ``\\d+`` es un número y ``[ae]`` genera una
+    frase por alternativa.  Un patrón con ``.*`` se divide en partes que
+    reparten el peso.
+    """
+    parts = pattern.split(".*")
+    phrases = []
+    for part in parts:
+        part = part.replace(r"\s+", " ").replace(r"\d+", "0").replace(r"\b", "")
+        variants = [part]
+        while any("[" in v for v in variants):
+            expanded = []
+            for variant in variants:
+                match = re.search(r"\[(\w+)\]", variant)
+                if match is None:
+                    raise ValueError(f"Patrón no soportado por el motor vectorial: {pattern!r}")
+                expanded.extend(
+                    variant[:match.start()] + ch + variant[match.end():] for ch in match.group(1)
+                )
+            variants = expanded
+        for variant in variants:
+            if re.search(r"[\\^$*+?{}()|.]", variant):
+                raise ValueError(f"Patrón no soportado por el motor vectorial: {pattern!r}")
+            phrases.append((_WORD.findall(variant), 1.0 / len(parts)))
+    return phrases
+
+
+class VectorClassifier:
+    """
+    Clasificador lineal sobre n-gramas hasheados, por lotes.
+
+    - ``classify(pairs)``: clasificaciones de una lista de ``(tipo, descripcion)``
+    - ``scores(pairs)``: matriz de puntajes (lote × ``HEADS``) de un bloque
+    - ``version``: huella de los pesos (para memorizar clasificaciones)
+    """
+
+    block_size = BLOCK_SIZE
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, max_n: int):
+        """
+        Args:
+            weights: Matriz ``2**bits × len(HEADS)`` (float32)
+            bias: Sesgo por cabeza
+            max_n: Longitud máxima de los n-gramas
+        """
+        rows = weights.shape[0]
+        if rows & (rows - 1) or weights.shape[1] != len(HEADS):
+            raise ValueError(f"Pesos con forma inválida: {weights.shape}")
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.max_n = max_n
+        self.bits = rows.bit_length() - 1
+        self._active = self.weights.any(axis=1)
+        self._stems = _StemHashes()
+        digest = hashlib.sha256(self.weights.tobytes())
+        digest.update(self.bias.tobytes())
+        digest.update(f"{max_n}|{STEM_LEN}".encode())
+        self.version = "vector-" + digest.hexdigest()[:12]
+
+    @classmethod
+    def from_keywords(
+        cls, keywords: Mapping[str, Sequence[str]], bits: int = 20
+    ) -> "VectorClassifier":
+        """Modelo inicial con las palabras clave (patrones plegados) por cabeza."""
+        phrases = {
+            head: [p for pattern in keywords.get(head, ()) for p in _keyword_phrases(pattern)]
+            for head in HEADS
+        }
+        max_n = max(len(words) for head in phrases.values() for words, _ in head)
+        weights = np.zeros((1 << bits, len(HEADS)), dtype=np.float32)
+        for column, head in enumerate(HEADS):
+            for words, weight in phrases[head]:
+                weights[cls._phrase_feature(words, bits), column] += weight
+        # Umbral a la mitad de un patrón: auto/plazo con una coincidencia;
+        # perentorio/trámite comparan conteos como las reglas
+        bias = np.full(len(HEADS), -0.5, dtype=np.float32)
+        return cls(weights, bias, max_n)
+
+    @staticmethod
+    def _phrase_feature(words: Sequence[str], bits: int) -> int:
+        """Columna del n-grama ``words`` (mismo hash que ``_features``)."""
+        value = 0
+        for i, word in enumerate(words):
+            h = _stem_hash(word)
+            value = h if i == 0 else (value * _PRIME + h) & _MASK
+        return ((value * _MIX) & _MASK) >> (64 - bits)
+
+    @staticmethod
+    def _block_tokens(pairs: Sequence[Tuple[Any, Any]]) -> List[str]:
+        """Palabras plegadas de un bloque de ``(tipo, descripcion)``, con separadores.
+
+        Todo el bloque se pliega de una vez (una sola normalización NFKD
+        y un ``lower``); equivale a ``canonicalize`` por actuación porque
+        el separador va entre espacios.
+        """
+        textos = [
+            f"{tipo if tipo else ''} {descripcion if descripcion else ''}"
+            for tipo, descripcion in pairs
+        ]
+        separator = f" {_SEPARATOR_WORD} "
+        block = separator.join(textos)
+        if block.count(_SEPARATOR_WORD) != max(len(textos) - 1, 0):
+            # Un texto contiene el carácter separador: se quita antes de unir
+            block = separator.join(t.replace(_SEPARATOR_WORD, " ") for t in textos)
+        return fold_case(block).split()
+
+    def _features(
+        self, tokens: List[str], active: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Pares únicos ``(actuación, columna)`` de los n-gramas de un bloque.
+
+        Con ``active`` solo se conservan las columnas marcadas (las de peso
+        no nulo), lo que evita deduplicar los n-gramas que no puntúan.
+        """
+        stems = self._stems
+        if len(stems) > _MAX_VOCABULARY:
+            stems.clear()
+            stems[_SEPARATOR_WORD] = _SEPARATOR
+        hashes = np.fromiter(map(stems.__getitem__, tokens), dtype=np.uint64, count=len(tokens))
+        # Los separadores dan la actuación de cada palabra
+        docs = np.cumsum(hashes == np.uint64(_SEPARATOR))
+        words = hashes <= np.uint64(_MAX_STEM_HASH)
+        docs = docs[words]
+        hashes = hashes[words]
+
+        shift = np.uint64(64 - self.bits)
+        keys = []
+        gram = hashes
+        for n in range(1, self.max_n + 1):
+            if n > 1:
+                # Los n-gramas no cruzan de una actuación a otra
+                gram = gram[:-1] * np.uint64(_PRIME) + hashes[n - 1:]
+            columns = ((gram * np.uint64(_MIX)) >> shift).astype(np.int64)
+            keep = docs[:len(gram)] == docs[n - 1:]
+            if active is not None:
+                keep &= active[columns]
+            keys.append((docs[:len(gram)][keep] << self.bits) | columns[keep])
+        flat_keys = np.concatenate(keys)
+        if flat_keys.size == 0:
+            # Ningún n-grama puntúa en el bloque (actuaciones sin palabras clave)
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        flat_keys.sort()
+        unique = flat_keys[np.concatenate(([True], flat_keys[1:] != flat_keys[:-1]))]
+        return unique >> self.bits, unique & ((1 << self.bits) - 1)
+
+    def scores(self, pairs: Sequence[Tuple[Any, Any]]) -> np.ndarray:
+        """Puntajes ``X @ W`` (sin sesgo) de un bloque de ``(tipo, descripcion)``."""
+        docs, columns = self._features(self._block_tokens(pairs), self._active)
+        rows = self.weights[columns]
+        result = np.empty((len(pairs), len(HEADS)), dtype=np.float64)
+        for head in range(len(HEADS)):
+            result[:, head] = np.bincount(docs, weights=rows[:, head], minlength=len(pairs))
+        return result
+
+    def classify(self, pairs: Sequence[Tuple[Any, Any]]) -> List[Classification]:
+        """Clasifica ``(tipo, descripcion)`` con la misma decisión que las reglas."""
+        result: List[Classification] = []
+        for start in range(0, len(pairs), self.block_size):
+            block = pairs[start:start + self.block_size]
+            result.extend(self._decide(block, self.scores(block)))
+        return result
+
+    def _decide(self, pairs: Sequence[Tuple[Any, Any]], raw: np.ndarray) -> List[Classification]:
+        """Tipo y confianza a partir de los puntajes, como ``_classify_texts``."""
+        margin = raw + self.bias
+        con_tipo = np.fromiter((bool(tipo) for tipo, _ in pairs), dtype=bool, count=len(pairs))
+        es_auto = con_tipo & (margin[:, _AUTO] > 0)
+        perentorio = margin[:, _PERENTORIO]
+        tramite = margin[:, _TRAMITE]
+        es_perentorio = (perentorio > tramite) & (perentorio > 0)
+        es_tramite = ~es_perentorio & (tramite > 0)
+        por_plazo = ~es_perentorio & ~es_tramite & (margin[:, _PLAZO] > 0)
+        confianza = np.where(
+            es_perentorio | por_plazo,
+            np.minimum(np.maximum(raw[:, _PERENTORIO], 0) / 3.0, 1.0),
+            np.where(es_tramite, np.minimum(np.maximum(raw[:, _TRAMITE], 0) / 2.0, 1.0), 0.0),
+        ).round(2)
+        tipos = np.where(
+            es_perentorio | por_plazo, "perentorio", np.where(es_tramite, "tramite", "unknown")
+        )
+        return [
+            (True, tipo, conf) if auto else (False, None, 0.0)
+            for auto, tipo, conf in zip(es_auto.tolist(), tipos.tolist(), confianza.tolist())
+        ]
+
+    def train(
+        self,
+        pairs: Sequence[Tuple[Any, Any]],
+        labels: Sequence[Optional[str]],
+        epochs: int = 50,
+        learning_rate: float = 5.0,
+    ) -> "VectorClassifier":
+        """
+        Reentrena los pesos (fuera de línea) con actuaciones etiquetadas.
+
+        Regresión logística por cabeza con descenso de gradiente por
+        lotes, partiendo de los pesos actuales.  Las etiquetas son
+        ``"perentorio"``, ``"tramite"`` o ``None`` (no es auto); la cabeza
+        de plazo no se reentrena.
+
+        Returns:
+            Nuevo clasificador con los pesos reentrenados
+        """
+        docs, columns = self._features(self._block_tokens(pairs))
+        target = np.zeros((len(labels), len(HEADS)))
+        target[:, _AUTO] = [label is not None for label in labels]
+        target[:, _PERENTORIO] = [label == "perentorio" for label in labels]
+        target[:, _TRAMITE] = [label == "tramite" for label in labels]
+        trained = (_AUTO, _PERENTORIO, _TRAMITE)
+
+        weights = self.weights.astype(np.float64)
+        bias = self.bias.astype(np.float64)
+        for epoch in range(epochs):
+            raw = np.empty_like(target)
+            rows = weights[columns]
+            for head in range(len(HEADS)):
+                raw[:, head] = np.bincount(docs, weights=rows[:, head], minlength=len(pairs))
+            error = 1.0 / (1.0 + np.exp(-np.clip(raw + bias, -30, 30))) - target
+            for head in trained:
+                gradient = np.bincount(
+                    columns, weights=error[docs, head], minlength=weights.shape[0]
+                )
+                weights[:, head] -= learning_rate * gradient / len(pairs)
+                bias[head] -= learning_rate * error[:, head].mean()
+            logger.debug(
+                f"Entrenamiento época {epoch + 1}: error medio "
+                f"{np.abs(error[:, list(trained)]).mean():.4f}"
+            )
+        return VectorClassifier(weights.astype(np.float32), bias.astype(np.float32), self.max_n)
+
+    def save(self, path: str) -> None:
+        """Guarda el modelo en un ``.npz`` comprimido."""
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            max_n=self.max_n,
+            stem_len=STEM_LEN,
+            heads=np.array(HEADS),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "VectorClassifier":
+        """Carga un modelo guardado con ``save``."""
+        with np.load(path) as data:
+            if tuple(data["heads"].tolist()) != HEADS or int(data["stem_len"]) != STEM_LEN:
+                raise ValueError(f"Modelo incompatible con esta versión: {path}")
+            model = cls(data["weights"], data["bias"], int(data["max_n"]))
+        logger.info(f"Modelo vectorial cargado de {path} ({model.version})")
+        return model
+
+    def describe(self) -> Dict[str, Any]:
+        """Resumen del modelo (para logs y métricas)."""
+        return {
+            "version": self.version,
+            "features": self.weights.shape[0],
+            "max_n": self.max_n,
+            "nonzero_weights": int(np.count_nonzero(self.weights)),
+        }
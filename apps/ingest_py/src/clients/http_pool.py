@@ -0,0 +1,224 @@
+"""
+Cliente HTTP compartido para la API de la Rama Judicial.
+
+Mantiene un único ``httpx.AsyncClient`` de larga vida con pool de
+conexiones keep-alive y, si el paquete ``h2`` está instalado, HTTP/2
+multiplexado.  Así cada consulta reutiliza la conexión TCP + TLS ya
+establecida con ``consultaprocesos.ramajudicial.gov.co:448`` en lugar
+de pagar un handshake nuevo por intento.
+
+El ciclo de vida lo gestiona el ``lifespan`` de la aplicación FastAPI
+(ver ``main.py``): el cliente se crea bajo demanda y se cierra al
+apagar el servidor.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    """Lee un entero de las variables de entorno con valor por defecto."""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning(f"Valor inválido para {name}, usando {default}")
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Lee un flotante de las variables de entorno con valor por defecto."""
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning(f"Valor inválido para {name}, usando {default}")
+        return default
+
+
+def _http2_available() -> bool:
+    """Indica si el soporte HTTP/2 de httpx (paquete ``h2``) está instalado."""
+    try:
+        import h2  # noqa: F401  pylint: disable=import-outside-toplevel,unused-import
+        return True
+    except ImportError:
+        return False
+
+
+class RamaHttpPool:
+    """
+    Pool de conexiones compartido para la API de Rama Judicial.
+
+    - Un solo ``httpx.AsyncClient`` por proceso, creado de forma perezosa
+    - Keep-alive y HTTP/2 (si ``h2`` está disponible)
+    - Límites de pool configurables por variables de entorno
+    - Contadores de utilización para ``/metrics``
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+    ):
+        """
+        Args:
+            max_connections: Máximo de conexiones simultáneas al host
+            max_keepalive_connections: Conexiones ociosas que se mantienen abiertas
+            keepalive_expiry: Segundos que una conexión ociosa se conserva
+            http2: Si True intenta negociar HTTP/2 (requiere ``h2``)
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and _http2_available()
+        if http2 and not self.http2:
+            logger.warning(
+                "Paquete h2 no instalado, el pool usará HTTP/1.1. "
+                "Instala con: pip install 'httpx[http2]'"
+            )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.requests_total = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.clients_created = 0
+        self.clients_replaced = 0
+        self._closing: Set["asyncio.Task[None]"] = set()
+
+    def client(self) -> httpx.AsyncClient:
+        """Devuelve el cliente compartido, creándolo si aún no existe.
+
+        Si el event loop cambió (scripts con varios ``asyncio.run``) se
+        crea un cliente nuevo, ya que las conexiones quedan ligadas al
+        loop, y el anterior se cierra en segundo plano.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            if self._client is not None and not self._client.is_closed:
+                self._close_replaced(self._client, self._loop, loop)
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                http2=self.http2,
+            )
+            self._loop = loop
+            self.clients_created += 1
+            logger.info(
+                f"Pool HTTP Rama creado (http2={self.http2}, "
+                f"max_connections={self.limits.max_connections})"
+            )
+        return self._client
+
+    def _close_replaced(
+        self,
+        client: httpx.AsyncClient,
+        old_loop: Optional[asyncio.AbstractEventLoop],
+        loop: asyncio.AbstractEventLoop,
+    ):
+        """Cierra el cliente de otro event loop sin bloquear al que lo reemplaza.
+
+        Si el loop anterior sigue corriendo (otro hilo) el cierre se hace
+        allí; si ya terminó, en una tarea del loop actual.
+        """
+        self.clients_replaced += 1
+        logger.warning("Event loop distinto: se reemplaza y cierra el cliente HTTP Rama anterior")
+
+        async def close():
+            try:
+                await client.aclose()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(f"No se pudo cerrar el cliente HTTP Rama reemplazado: {e}")
+
+        if old_loop is not None and old_loop.is_running() and not old_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(close(), old_loop)
+            return
+        task = loop.create_task(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Realiza un GET con el cliente compartido registrando utilización."""
+        client = self.client()
+        self.requests_total += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await client.get(url, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+    async def aclose(self) -> None:
+        """Cierra el cliente y libera todas las conexiones del pool."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Pool HTTP Rama cerrado")
+        self._client = None
+        self._loop = None
+
+    def _connection_counts(self) -> Dict[str, int]:
+        """Cuenta conexiones abiertas/ociosas del pool de httpcore (best effort)."""
+        counts = {"open": 0, "idle": 0, "http2": 0}
+        if self._client is None:
+            return counts
+        transport = getattr(self._client, "_transport", None)
+        pool = getattr(transport, "_pool", None)
+        for conn in getattr(pool, "connections", []) or []:
+            try:
+                if conn.is_closed():
+                    continue
+                counts["open"] += 1
+                if conn.is_idle():
+                    counts["idle"] += 1
+                if "HTTP/2" in repr(conn):
+                    counts["http2"] += 1
+            except Exception:  # pylint: disable=broad-except
+                continue
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        """Serializa la utilización del pool a diccionario."""
+        connections = self._connection_counts()
+        max_connections = self.limits.max_connections or 0
+        return {
+            "http2": self.http2,
+            "max_connections": max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "connections_open": connections["open"],
+            "connections_idle": connections["idle"],
+            "connections_http2": connections["http2"],
+            "requests_total": self.requests_total,
+            "requests_in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "utilization": round(connections["open"] / max_connections, 2) if max_connections else 0.0,
+            "clients_created": self.clients_created,
+            "clients_replaced": self.clients_replaced,
+        }
+
+
+# Instancia global, configurada por variables de entorno
+rama_http = RamaHttpPool(
+    max_connections=_env_int("RAMA_HTTP_MAX_CONNECTIONS", 20),
+    max_keepalive_connections=_env_int("RAMA_HTTP_MAX_KEEPALIVE", 10),
+    keepalive_expiry=_env_float("RAMA_HTTP_KEEPALIVE_EXPIRY", 30.0),
+    http2=os.getenv("RAMA_HTTP2", "true").lower() in ("1", "true", "yes"),
+)
+
+
+@asynccontextmanager
+async def rama_http_lifespan() -> AsyncIterator[RamaHttpPool]:
+    """Context manager para abrir/cerrar el pool junto con la aplicación."""
+    rama_http.client()
+    try:
+        yield rama_http
+    finally:
+        await rama_http.aclose()
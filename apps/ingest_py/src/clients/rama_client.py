@@ -2,24 +2,81 @@
 Cliente completo para la API de la Rama Judicial.
 
 Integra las consultas de procesos y actuaciones en un flujo unico,
-obteniendo datos reales de la API oficial y normalizandolos.
+obteniendo datos reales de la API oficial y normalizandolos.  Tambien
+expone un motor de consulta masiva (``fetch_many_procesos``) con
+concurrencia acotada y presupuesto de peticiones por segundo al host.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
 import time
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 
-from .ramajud import fetch_by_radicado, fetch_actuaciones
+import httpx
+
+from .ramajud import (
+    ENDPOINT_ACTUACIONES,
+    ENDPOINT_CONSULTA,
+    fetch_actuaciones,
+    fetch_by_radicado,
+)
+from ..normalizers.compact import CompactAct, CompactCase, expand
 from ..normalizers.rama import normalize_rama_response
-from .resilience import rama_circuit, rama_cache, metrics
+from ..utils.rate import RateLimiter
+from ..utils.timing import stage
+from .resilience import (
+    rama_circuit,
+    rama_cache,
+    metrics,
+    proceso_flight,
+    actuaciones_flight,
+)
 
 logger = logging.getLogger(__name__)
 
 # Configuracion para version safe
 SAFE_TIMEOUT = 5  # segundos
 SAFE_RETRIES = 2  # intentos
+# Ventana de frescura del cache: dentro de ella se sirve el cache sin
+# consultar; entre la frescura y el TTL se sirve y se refresca en
+# segundo plano (stale-while-revalidate).  0 desactiva el modo.
+SAFE_FRESH_SECONDS = int(os.getenv("RAMA_CACHE_FRESH_SECONDS", "300"))
+
+# Cache negativo: radicados que la API reporta sin procesos se recuerdan
+# durante este tiempo (segundos) sin volver a consultar
+NOT_FOUND_TTL_SECONDS = int(os.getenv("RAMA_NOT_FOUND_TTL_SECONDS", "600"))
+
+# Configuracion para consultas masivas
+BULK_CONCURRENCY = int(os.getenv("RAMA_BULK_CONCURRENCY", "8"))  # radicados en paralelo
+BULK_RATE_PER_SECOND = float(os.getenv("RAMA_BULK_RATE_PER_SECOND", "5"))  # peticiones/s al host
+
+# Presupuesto compartido de peticiones al host de Rama Judicial para
+# todas las consultas masivas en curso (escaneos manuales y scheduler)
+rama_rate_limiter = RateLimiter(rate=BULK_RATE_PER_SECOND)
+
+
+class ProcesoNoEncontrado(ValueError):
+    """La API respondio correctamente pero sin procesos para el radicado."""
+
+
+def is_not_found(result: Dict[str, Any]) -> bool:
+    """Indica si un resultado de ``fetch_proceso_completo_safe`` es "no encontrado"."""
+    return bool(result.get("not_found"))
+
+
+def _not_found_result(radicado: str) -> Dict[str, Any]:
+    """Respuesta para radicados inexistentes (distinta de los datos demo)."""
+    return {
+        "not_found": True,
+        "radicado": radicado,
+        "message": f"No se encontro el proceso {radicado} en la Rama Judicial",
+        "case": None,
+        "parties": [],
+        "acts": [],
+    }
 
 
 async def fetch_proceso_completo(radicado: str) -> Dict[str, Any]:
@@ -37,7 +94,7 @@ async def fetch_proceso_completo(radicado: str) -> Dict[str, Any]:
         proceso_data = await fetch_by_radicado(radicado)
 
         if not proceso_data or not proceso_data.get("procesos"):
-            raise ValueError(f"No se encontro el proceso {radicado}")
+            raise ProcesoNoEncontrado(f"No se encontro el proceso {radicado}")
 
         # Extraer el primer proceso de la respuesta
         proceso = proceso_data["procesos"][0]
@@ -50,7 +107,7 @@ async def fetch_proceso_completo(radicado: str) -> Dict[str, Any]:
 
         # 2. Consultar actuaciones del proceso
         logger.info(f"Consultando actuaciones del proceso ID: {id_proceso}")
-        actuaciones_data = await fetch_actuaciones(id_proceso)
+        actuaciones_data = await _fetch_actuaciones_coalesced(id_proceso)
 
         # 3. Normalizar todo junto
         normalized = normalize_rama_response(proceso_data, actuaciones_data)
@@ -66,7 +123,9 @@ async def fetch_proceso_completo(radicado: str) -> Dict[str, Any]:
         raise
 
 
-async def fetch_proceso_completo_safe(radicado: str) -> Dict[str, Any]:
+async def fetch_proceso_completo_safe(
+    radicado: str, *, rate_limiter: Optional[RateLimiter] = None
+) -> Dict[str, Any]:
     """
     Version segura con circuit breaker, cache y fallback.
 
@@ -75,49 +134,216 @@ async def fetch_proceso_completo_safe(radicado: str) -> Dict[str, Any]:
     2. Intentar API real con timeout reducido y reintentos
     3. Si exito -> guardar en cache y cerrar circuito
     4. Si fallo -> cache o fallback y abrir circuito
-    """
-    cache_key = f"last_good:{radicado}"
 
-    # 1. Circuit breaker abierto -> cache o fallback inmediato
-    if rama_circuit.is_open():
-        logger.warning(f"Circuit breaker abierto, usando cache/fallback para {radicado}")
-        cached = rama_cache.get(cache_key)
+    Antes del flujo anterior se aplica stale-while-revalidate sobre
+    ``last_good:{radicado}``: si la entrada tiene menos de
+    ``SAFE_FRESH_SECONDS`` se devuelve directamente; si es mas vieja
+    (pero sigue dentro del TTL) se devuelve igualmente y se programa un
+    refresco en segundo plano, uno solo por radicado.
+
+    Las llamadas concurrentes para el mismo radicado se coalescen: solo
+    una consulta sale al upstream y todas comparten su resultado.
+
+    Si la API responde sin procesos el radicado no existe: se devuelve
+    un resultado con ``not_found: True`` (ver ``is_not_found``), que se
+    guarda en un cache negativo durante ``NOT_FOUND_TTL_SECONDS`` y no
+    cuenta como fallo para los circuit breakers.
+
+    Args:
+        radicado: Numero de radicacion del proceso
+        rate_limiter: Limitador opcional; si se indica, cada petición al
+            host (proceso y actuaciones, reintentos incluidos) consume un
+            token antes de salir
+    """
+    # El cache negativo solo vive en memoria (TTL propio): lectura sin E/S
+    not_found = rama_cache.get(f"not_found:{radicado}")
+    if not_found:
+        metrics.record_not_found_hit()
+        return not_found
+
+    if SAFE_FRESH_SECONDS > 0:
+        cached, age = await _get_last_good(radicado)
         if cached:
-            logger.info(f"Retornando datos cacheados para {radicado}")
-            metrics.record_cache_hit()
+            if age <= SAFE_FRESH_SECONDS:
+                metrics.record_fresh_hit()
+            else:
+                metrics.record_stale_hit()
+                _schedule_refresh(radicado)
             return cached
-        logger.info(f"Sin cache, retornando datos demo para {radicado}")
-        metrics.record_demo_hit()
-        return _generate_fallback_data(radicado)
 
-    # 2. Intentar API real con configuracion agresiva
-    try:
-        start_time = time.time()
-        logger.info(
-            f"Consultando API de Rama Judicial: {radicado} (timeout: {SAFE_TIMEOUT}s)"
-        )
+    return await proceso_flight.do(
+        radicado,
+        lambda: _fetch_proceso_completo_safe(radicado, rate_limiter=rate_limiter),
+    )
 
-        # Llamar a fetch_by_radicado con reintentos reducidos
-        proceso_data = await fetch_by_radicado(radicado, max_retries=SAFE_RETRIES)
 
-        if not proceso_data or not proceso_data.get("procesos"):
-            raise ValueError(f"No se encontro el proceso {radicado}")
+def _schedule_refresh(radicado: str) -> None:
+    """Programa un refresco en segundo plano, deduplicado por radicado."""
+    if proceso_flight.in_flight(radicado):
+        return
+
+    logger.info(f"Cache vencido para {radicado}, refrescando en segundo plano")
+    metrics.record_refresh()
+    # La tarea queda registrada en proceso_flight mientras corre, de modo
+    # que las peticiones que lleguen entretanto se unen a ella
+    proceso_flight.start(radicado, lambda: _fetch_proceso_completo_safe(radicado))
+
+
+async def _fetch_actuaciones_coalesced(
+    id_proceso: int,
+    *,
+    max_retries: int = 3,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> Dict[str, Any]:
+    """Consulta actuaciones coalesciendo llamadas concurrentes por id_proceso."""
+
+    async def _call() -> Dict[str, Any]:
+        return await fetch_actuaciones(id_proceso, max_retries=max_retries, rate_limiter=rate_limiter)
+
+    return await actuaciones_flight.do(str(id_proceso), _call)
+
+
+def _error_class(exc: BaseException) -> str:
+    """Clasifica un error de la API para elegir el breaker que lo registra."""
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(exc, httpx.HTTPStatusError):
+        return "5xx" if exc.response.status_code >= 500 else "4xx"
+    return "other"
+
 
+async def _get_last_good(radicado: str) -> Tuple[Optional[Dict[str, Any]], float]:
+    """Ultimo dato bueno del cache (expandido con alias) y su edad en segundos.
+
+    El cache guarda ``CompactCase``; cada lectura devuelve un diccionario
+    nuevo, por lo que los llamadores pueden modificarlo sin afectar al cache.
+    """
+    cached, age = await rama_cache.aget_with_age(f"last_good:{radicado}")
+    return (expand(cached) if cached else None), age
+
+
+async def _previous_acts(
+    cache_key: str,
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Dict[int, CompactAct]]]:
+    """Actuaciones del ultimo dato bueno para la normalizacion incremental.
+
+    En cada refresco solo cambian las actuaciones mas recientes: con la
+    lista anterior ``normalize_rama_response`` normaliza unicamente las
+    nuevas, y ``CompactCase.from_normalized`` reutiliza las actuaciones
+    ya compactadas de la cola.
+    """
+    cached, _ = await rama_cache.aget_with_age(cache_key)
+    if not isinstance(cached, CompactCase) or not cached.acts:
+        return None, None
+    return cached.act_dicts()
+
+
+async def _cached_or_fallback(radicado: str) -> Dict[str, Any]:
+    """Devuelve el ultimo dato bueno del cache o, si no hay, datos demo."""
+    cached, _ = await _get_last_good(radicado)
+    if cached:
+        logger.info(f"Retornando datos cacheados para {radicado}")
+        metrics.record_cache_hit()
+        return cached
+    logger.warning(f"Sin cache, retornando datos demo para {radicado}")
+    metrics.record_demo_hit()
+    return _generate_fallback_data(radicado)
+
+
+async def _fetch_proceso_completo_safe(
+    radicado: str, *, rate_limiter: Optional[RateLimiter] = None
+) -> Dict[str, Any]:
+    """Implementacion de ``fetch_proceso_completo_safe`` sin coalescencia.
+
+    Cada endpoint de la API tiene sus propios breakers (ver
+    ``CircuitBreakerGroup``): si solo falla ``/Proceso/Actuaciones`` se
+    sigue consultando ``/Procesos/Consulta`` y, sin cache, se devuelve el
+    proceso sin actuaciones marcado como ``partial``.
+    """
+    cache_key = f"last_good:{radicado}"
+
+    # 1. Breaker de consulta abierto -> cache o fallback inmediato
+    probes = rama_circuit.allow(ENDPOINT_CONSULTA)
+    if probes is None:
+        logger.warning(f"Circuit breaker de consulta abierto, usando cache/fallback para {radicado}")
+        return await _cached_or_fallback(radicado)
+
+    start_time = time.time()
+    logger.info(
+        f"Consultando API de Rama Judicial: {radicado} (timeout: {SAFE_TIMEOUT}s)"
+    )
+
+    # 2. Datos basicos del proceso con reintentos reducidos
+    try:
+        with stage("proceso"):
+            proceso_data = await fetch_by_radicado(
+                radicado, max_retries=SAFE_RETRIES, rate_limiter=rate_limiter
+            )
+    except Exception as exc:
+        logger.error(f"Error consultando proceso {radicado}: {exc}")
+        metrics.record_5xx()
+        rama_circuit.record_failure(ENDPOINT_CONSULTA, _error_class(exc), probes)
+        return await _cached_or_fallback(radicado)
+    rama_circuit.record_success(ENDPOINT_CONSULTA)
+
+    # Respuesta valida sin procesos: el radicado no existe (p. ej. un
+    # error de digitacion), no es una falla del upstream
+    if not proceso_data or not proceso_data.get("procesos"):
+        logger.info(f"Radicado {radicado} no encontrado en la Rama Judicial")
+        metrics.record_not_found()
+        result = _not_found_result(radicado)
+        rama_cache.set(f"not_found:{radicado}", result, ttl=NOT_FOUND_TTL_SECONDS)
+        return result
+
+    try:
         proceso = proceso_data["procesos"][0]
         id_proceso = proceso.get("idProceso")
+        partial = False
+        reuse: Optional[Dict[int, CompactAct]] = None
 
+        probes = rama_circuit.allow(ENDPOINT_ACTUACIONES) if id_proceso else None
         if not id_proceso:
             logger.warning(f"Proceso {radicado} sin idProceso, normalizando sin actuaciones")
-            normalized = normalize_rama_response(proceso_data)
+            with stage("normalize"):
+                normalized = normalize_rama_response(proceso_data)
+        elif probes is None:
+            logger.warning(f"Circuit breaker de actuaciones abierto para {radicado}")
+            partial = True
         else:
-            # Consultar actuaciones tambien con retry reducido
-            actuaciones_data = await fetch_actuaciones(id_proceso, max_retries=SAFE_RETRIES)
-            normalized = normalize_rama_response(proceso_data, actuaciones_data)
-
-        # 3. Exito -> guardar en cache y registrar metricas
+            # 3. Actuaciones tambien con retry reducido
+            try:
+                with stage("actuaciones"):
+                    actuaciones_data = await _fetch_actuaciones_coalesced(
+                        id_proceso, max_retries=SAFE_RETRIES, rate_limiter=rate_limiter
+                    )
+            except Exception as exc:
+                logger.error(f"Error consultando actuaciones de {radicado}: {exc}")
+                metrics.record_5xx()
+                rama_circuit.record_failure(ENDPOINT_ACTUACIONES, _error_class(exc), probes)
+                partial = True
+            else:
+                rama_circuit.record_success(ENDPOINT_ACTUACIONES)
+                previous_acts, reuse = await _previous_acts(cache_key)
+                with stage("normalize"):
+                    normalized = normalize_rama_response(
+                        proceso_data, actuaciones_data, previous_acts
+                    )
+
+        if partial:
+            # Sin actuaciones: preferir el ultimo dato completo; si no hay,
+            # devolver el proceso solo (sin guardarlo como dato bueno)
+            cached, _ = await _get_last_good(radicado)
+            if cached:
+                metrics.record_cache_hit()
+                return cached
+            with stage("normalize"):
+                normalized = normalize_rama_response(proceso_data)
+            normalized["partial"] = True
+            return normalized
+
+        # 4. Exito -> guardar en cache y registrar metricas
         latency_ms = (time.time() - start_time) * 1000
-        rama_cache.set(cache_key, normalized)
-        rama_circuit.record_success()
+        rama_cache.set(cache_key, CompactCase.from_normalized(normalized, reuse))
         metrics.record_success(latency_ms)
         logger.info(
             f"Proceso {radicado} obtenido exitosamente en {latency_ms:.0f}ms: "
@@ -126,24 +352,74 @@ async def fetch_proceso_completo_safe(radicado: str) -> Dict[str, Any]:
         return normalized
 
     except Exception as exc:
-        # 4. Fallo -> registrar metricas y buscar cache o fallback
-        logger.error(f"Error consultando API para {radicado}: {exc}")
-        metrics.record_5xx()
-        rama_circuit.record_failure()
-
-        # Intentar cache primero
-        cached = rama_cache.get(cache_key)
-        if cached:
-            logger.warning(f"API fallo, retornando datos cacheados para {radicado}")
-            metrics.record_cache_hit()
-            return cached
-
-        # Ultimo recurso: datos demo
-        logger.warning(
-            f"API fallo y no hay cache, retornando datos demo para {radicado}"
-        )
-        metrics.record_demo_hit()
-        return _generate_fallback_data(radicado)
+        # 5. Respuesta inesperada (datos malformados): no es un fallo del
+        # upstream, no cuenta para los breakers
+        logger.error(f"Error procesando respuesta para {radicado}: {exc}")
+        return await _cached_or_fallback(radicado)
+
+
+async def fetch_many_procesos(
+    radicados: Iterable[str],
+    concurrency: int = BULK_CONCURRENCY,
+    *,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> AsyncIterator[Tuple[str, Union[Dict[str, Any], Exception]]]:
+    """
+    Consulta muchos radicados en paralelo con concurrencia acotada.
+
+    Cada radicado pasa por ``fetch_proceso_completo_safe``, por lo que se
+    conservan el cache, el circuit breaker y el fallback por elemento.
+    Un pool de ``concurrency`` workers consume los radicados y todas las
+    consultas al host (proceso y actuaciones) comparten el mismo
+    presupuesto de peticiones por segundo.
+
+    Los resultados se entregan a medida que terminan, no en el orden de
+    entrada.  Si un radicado lanza una excepcion inesperada, se entrega
+    la excepcion en lugar del diccionario normalizado (como
+    ``asyncio.gather(return_exceptions=True)``).
+
+    Args:
+        radicados: Radicados a consultar
+        concurrency: Maximo de radicados consultandose simultaneamente
+        rate_limiter: Presupuesto de peticiones al host (default: global)
+
+    Yields:
+        Tuplas ``(radicado, normalizado_o_excepcion)``
+    """
+    limiter = rate_limiter or rama_rate_limiter
+    pending = iter(radicados)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def worker() -> None:
+        # El iterador es compartido: cada worker toma el siguiente radicado
+        try:
+            for radicado in pending:
+                try:
+                    result: Union[Dict[str, Any], Exception] = await fetch_proceso_completo_safe(
+                        radicado, rate_limiter=limiter
+                    )
+                except Exception as exc:  # pylint: disable=broad-except
+                    logger.error(f"Error inesperado consultando {radicado}: {exc}")
+                    result = exc
+                await results.put((radicado, result))
+        finally:
+            await results.put(None)  # Marca de worker terminado
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    finished = 0
+    try:
+        while finished < len(workers):
+            item = await results.get()
+            if item is None:
+                finished += 1
+                continue
+            yield item
+    finally:
+        # Si el consumidor abandona la iteracion, cancelar lo pendiente
+        for task in workers:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
 
 
 def _generate_fallback_data(radicado: str) -> Dict[str, Any]:
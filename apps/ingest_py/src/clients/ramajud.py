@@ -6,6 +6,10 @@ radicado.  El endpoint oficial documentado está en
 La función `fetch_by_radicado` construye la URL con los parámetros
 requeridos y devuelve el JSON de la respuesta.  Se implementan
 reintentos básicos y control de errores.
+
+Todas las peticiones comparten el pool de conexiones ``rama_http``
+(keep-alive y HTTP/2), de modo que los reintentos y la consulta de
+actuaciones reutilizan la conexión TLS ya abierta con el host.
 """
 
 from __future__ import annotations
@@ -13,10 +17,15 @@ from __future__ import annotations
 import asyncio
 import logging
 import random
-from typing import Any, Dict
+import time
+from typing import Any, Dict, Optional
 
 import httpx
 
+from ..utils.rate import RateLimiter
+from .http_pool import rama_http
+from .resilience import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,9 +39,34 @@ ACTUACIONES_URL = (
     "Proceso/Actuaciones/{id_proceso}"
 )
 
+# Nombres de endpoint para breakers y métricas de latencia
+ENDPOINT_CONSULTA = "consulta"
+ENDPOINT_ACTUACIONES = "actuaciones"
+
+
+def _observe(
+    endpoint: str,
+    started: float,
+    response: Optional[httpx.Response] = None,
+    exc: Optional[BaseException] = None,
+):
+    """Registra la latencia de un intento por endpoint y clase de estado."""
+    if response is not None:
+        status_class = f"{response.status_code // 100}xx"
+    elif isinstance(exc, httpx.TimeoutException):
+        status_class = "timeout"
+    else:
+        status_class = "error"
+    metrics.record_upstream(endpoint, status_class, (time.perf_counter() - started) * 1000)
+
 
 async def fetch_by_radicado(
-    radicado: str, *, solo_activos: bool = False, page: int = 1, max_retries: int = 3
+    radicado: str,
+    *,
+    solo_activos: bool = False,
+    page: int = 1,
+    max_retries: int = 3,
+    rate_limiter: Optional[RateLimiter] = None,
 ) -> Dict[str, Any]:
     """Consulta el número de radicado en la API oficial de la Rama Judicial.
 
@@ -41,6 +75,8 @@ async def fetch_by_radicado(
         solo_activos: indica si la API debe filtrar solo procesos activos.
         page: número de página, la API soporta paginación cuando hay varios resultados.
         max_retries: número máximo de reintentos ante fallos de red.
+        rate_limiter: presupuesto de peticiones al host; cada intento
+            (también los reintentos) toma un token.
 
     Returns:
         El cuerpo de la respuesta JSON como diccionario.
@@ -63,11 +99,18 @@ async def fetch_by_radicado(
     attempt = 0
     last_exc: Exception | None = None
     while attempt < max_retries:
+        if rate_limiter:
+            await rate_limiter.acquire()
+        started = time.perf_counter()
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(BASE_URL, params=params)
-                response.raise_for_status()
-                return response.json()
+            try:
+                response = await rama_http.get(BASE_URL, params=params, timeout=timeout)
+            except Exception as exc:
+                _observe(ENDPOINT_CONSULTA, started, exc=exc)
+                raise
+            _observe(ENDPOINT_CONSULTA, started, response)
+            response.raise_for_status()
+            return response.json()
         except Exception as exc:  # pylint: disable=broad-except
             last_exc = exc
             attempt += 1
@@ -86,13 +129,15 @@ async def fetch_by_radicado(
 
 
 async def fetch_actuaciones(
-    id_proceso: int, *, max_retries: int = 3
+    id_proceso: int, *, max_retries: int = 3, rate_limiter: Optional[RateLimiter] = None
 ) -> Dict[str, Any]:
     """Consulta las actuaciones de un proceso por su ID.
 
     Args:
         id_proceso: ID numérico del proceso en la API.
         max_retries: número máximo de reintentos ante fallos de red.
+        rate_limiter: presupuesto de peticiones al host; cada intento
+            (también los reintentos) toma un token.
 
     Returns:
         El cuerpo de la respuesta JSON como diccionario.
@@ -111,11 +156,18 @@ async def fetch_actuaciones(
     attempt = 0
     last_exc: Exception | None = None
     while attempt < max_retries:
+        if rate_limiter:
+            await rate_limiter.acquire()
+        started = time.perf_counter()
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                return response.json()
+            try:
+                response = await rama_http.get(url, timeout=timeout)
+            except Exception as exc:
+                _observe(ENDPOINT_ACTUACIONES, started, exc=exc)
+                raise
+            _observe(ENDPOINT_ACTUACIONES, started, response)
+            response.raise_for_status()
+            return response.json()
         except Exception as exc:  # pylint: disable=broad-except
             last_exc = exc
             attempt += 1
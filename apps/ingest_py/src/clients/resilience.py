@@ -1,18 +1,39 @@
 """
 Sistema de resiliencia: circuit breaker y cache para APIs externas.
 
-Implementa un circuit breaker simple y cache en memoria para tolerar
-fallos de la API de Rama Judicial sin bloquear el sistema.
+Implementa un circuit breaker simple y cache en memoria (LRU acotado
+por entradas y bytes, con un segundo nivel opcional en disco) para
+tolerar fallos de la API de Rama Judicial sin bloquear el sistema,
+además de coalescencia (single-flight) de consultas concurrentes
+idénticas.
+
+Modo multi-proceso: si se define ``INGEST_SHARED_STATE_PATH``, el
+estado del circuit breaker y los contadores de métricas se comparten
+entre workers a través de un archivo SQLite local, y el cache usa ese
+mismo archivo como segundo nivel (salvo que ``RAMA_CACHE_DB_PATH``
+indique otro).
 """
 
+import asyncio
+import json
+import os
+import sqlite3
 import time
 import logging
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Sequence, Tuple, TypeVar
 from dataclasses import dataclass
 from datetime import datetime
 
+from ..normalizers import compact
+from ..storage.cache_store import SQLiteCacheStore
+from ..storage.shared_state import SharedStateStore
+from ..utils.histogram import LogHistogram
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 # Métricas globales
 class Metrics:
@@ -22,15 +43,35 @@ class Metrics:
         self.rama_5xx = 0
         self.cache_hit = 0
         self.demo_hit = 0
-        self.latencies = []  # Lista de latencias en ms
+        self.fresh_hit = 0  # Cache dentro de la ventana de frescura
+        self.stale_hit = 0  # Cache vencido servido mientras se refresca
+        self.refreshes = 0  # Refrescos en segundo plano lanzados
+        self.not_found = 0  # Radicados inexistentes según la API
+        self.not_found_hit = 0  # Respuestas desde el cache negativo
+        self.coalesced: Dict[str, int] = {}  # Llamadas coalescidas por tipo
+        # Latencia de extremo a extremo de las consultas exitosas (ms)
+        self.latency = LogHistogram()
+        # Latencia por intento HTTP: {endpoint: {clase de estado: histograma}}
+        self.upstream: Dict[str, Dict[str, LogHistogram]] = {}
 
     def record_success(self, latency_ms: float):
         """Registra una petición exitosa."""
         self.rama_ok += 1
-        self.latencies.append(latency_ms)
-        # Mantener solo últimas 1000 latencias
-        if len(self.latencies) > 1000:
-            self.latencies = self.latencies[-1000:]
+        self.latency.record(latency_ms)
+
+    def record_upstream(self, endpoint: str, status_class: str, latency_ms: float):
+        """Registra la latencia de un intento HTTP a la API de Rama Judicial.
+
+        Args:
+            endpoint: Endpoint consultado (``consulta``, ``actuaciones``)
+            status_class: ``2xx``/``4xx``/``5xx``... o ``timeout``/``error``
+            latency_ms: Duración del intento
+        """
+        by_class = self.upstream.setdefault(endpoint, {})
+        histogram = by_class.get(status_class)
+        if histogram is None:
+            histogram = by_class[status_class] = LogHistogram()
+        histogram.record(latency_ms)
 
     def record_5xx(self):
         """Registra un error 5xx."""
@@ -44,23 +85,73 @@ class Metrics:
         """Registra uso de datos demo."""
         self.demo_hit += 1
 
-    def get_percentile(self, p: int) -> float:
-        """Calcula percentil de latencias."""
-        if not self.latencies:
-            return 0.0
-        sorted_latencies = sorted(self.latencies)
-        index = int(len(sorted_latencies) * p / 100)
-        return sorted_latencies[min(index, len(sorted_latencies) - 1)]
+    def record_fresh_hit(self):
+        """Registra un hit de cache dentro de la ventana de frescura."""
+        self.fresh_hit += 1
+
+    def record_stale_hit(self):
+        """Registra un hit de cache vencido (stale-while-revalidate)."""
+        self.stale_hit += 1
+
+    def record_refresh(self):
+        """Registra un refresco en segundo plano."""
+        self.refreshes += 1
+
+    def record_not_found(self):
+        """Registra un radicado que la API reporta como inexistente."""
+        self.not_found += 1
+
+    def record_not_found_hit(self):
+        """Registra una respuesta servida desde el cache negativo."""
+        self.not_found_hit += 1
+
+    def record_coalesced(self, name: str):
+        """Registra una llamada que reutilizó una consulta en curso."""
+        self.coalesced[name] = self.coalesced.get(name, 0) + 1
+
+    def get_percentile(self, p: float) -> float:
+        """Calcula percentil de latencias (0-100) desde el histograma."""
+        return self.latency.quantile(p / 100)
+
+    def latency_stats(self) -> Dict[str, Any]:
+        """Cuantiles y ventanas de todos los histogramas de latencia."""
+        return {
+            "total": self.latency.snapshot(),
+            **{
+                endpoint: {cls: h.snapshot() for cls, h in sorted(by_class.items())}
+                for endpoint, by_class in sorted(self.upstream.items())
+            },
+        }
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Serializa métricas a diccionario."""
+    def counters(self) -> Dict[str, int]:
+        """Devuelve los contadores (sumables entre workers)."""
         return {
             "rama_ok": self.rama_ok,
             "rama_5xx": self.rama_5xx,
             "cache_hit": self.cache_hit,
             "demo_hit": self.demo_hit,
+            "fresh_hit": self.fresh_hit,
+            "stale_hit": self.stale_hit,
+            "refreshes": self.refreshes,
+            "not_found": self.not_found,
+            "not_found_hit": self.not_found_hit,
+            **{f"coalesced_{name}": count for name, count in self.coalesced.items()},
+        }
+
+    def to_dict(self, counters: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Serializa métricas a diccionario.
+
+        Args:
+            counters: Contadores agregados de todos los workers; si no se
+                indican se usan los de este proceso.  Las latencias son
+                siempre las del proceso actual.
+        """
+        return {
+            **(counters if counters is not None else self.counters()),
             "latency_ms_p50": round(self.get_percentile(50), 2),
             "latency_ms_p95": round(self.get_percentile(95), 2),
+            "latency_ms_p99": round(self.get_percentile(99), 2),
+            "latency": self.latency_stats(),
         }
 
 
@@ -70,114 +161,850 @@ metrics = Metrics()
 
 @dataclass
 class CacheEntry:
-    """Entrada de cache con timestamp."""
+    """Entrada de cache con timestamp y tamaño aproximado en bytes.
+
+    ``ttl`` permite un tiempo de vida propio (p. ej. cache negativo);
+    si es ``None`` se usa el del cache.
+    """
     data: Dict[str, Any]
     timestamp: float
+    size: int = 0
+    ttl: Optional[float] = None
+
+
+# Estados del circuit breaker
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_INITIAL_STATE: Dict[str, Any] = {
+    "state": CLOSED,
+    "failures": 0,
+    "opened_at": None,
+    "open_count": 0,
+    "probes": 0,
+    "probe_started_at": None,
+}
 
 
 class SimpleCircuitBreaker:
     """
-    Circuit breaker simple para API externa.
-
-    - CERRADO: peticiones pasan normalmente
-    - ABIERTO: peticiones bloqueadas, se devuelve fallback
-    - Se abre después de N fallos consecutivos
-    - Se cierra automáticamente después de TTL
+    Circuit breaker con estados cerrado / abierto / semiabierto.
+
+    - CERRADO: peticiones pasan normalmente; N fallos consecutivos lo abren
+    - ABIERTO: peticiones bloqueadas (se devuelve cache o fallback)
+      durante ``open_duration * backoff_factor ** (aperturas - 1)``
+      segundos, con tope en ``max_open_duration``
+    - SEMIABIERTO: al vencer la apertura se dejan pasar como máximo
+      ``half_open_probes`` peticiones de prueba; si tienen éxito se
+      cierra y se reinicia el backoff, si alguna falla se vuelve a abrir
+      con una duración mayor
+
+    Así, al recuperarse el upstream no se libera de golpe toda la cola de
+    peticiones, y un upstream que sigue caído se sondea cada vez menos.
+
+    Con ``shared`` el estado vive en un ``SharedStateStore`` y se lee/
+    actualiza de forma atómica, de modo que todos los workers ven el
+    mismo circuito.
     """
 
-    def __init__(self, failure_threshold: int = 3, open_duration: int = 600):
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        open_duration: int = 600,
+        name: str = "rama",
+        shared: Optional[SharedStateStore] = None,
+        max_open_duration: Optional[int] = None,
+        backoff_factor: float = 2.0,
+        half_open_probes: int = 1,
+        probe_timeout: int = 60,
+    ):
         """
         Args:
             failure_threshold: Número de fallos consecutivos para abrir
-            open_duration: Segundos que permanece abierto (default 10 min)
+            open_duration: Segundos de la primera apertura
+            name: Nombre del breaker en el almacén compartido y métricas
+            shared: Almacén compartido entre procesos (opcional)
+            max_open_duration: Tope de la apertura con backoff (default: open_duration)
+            backoff_factor: Multiplicador de la duración en cada reapertura
+            half_open_probes: Peticiones de prueba permitidas en semiabierto
+            probe_timeout: Segundos tras los cuales una prueba sin resultado
+                libera su cupo (p. ej. petición cancelada)
         """
         self.failure_threshold = failure_threshold
         self.open_duration = open_duration
+        self.max_open_duration = max_open_duration or open_duration
+        self.backoff_factor = backoff_factor
+        self.half_open_probes = half_open_probes
+        self.probe_timeout = probe_timeout
+        self.name = name
+        self.shared = shared
+        self.state = CLOSED
         self.failures = 0
         self.opened_at: Optional[float] = None
+        self.open_count = 0  # Aperturas consecutivas (para el backoff)
+        self.probes = 0  # Pruebas en curso en semiabierto
+        self.probe_started_at: Optional[float] = None
 
-    def is_open(self) -> bool:
-        """Verifica si el circuito está abierto."""
-        if self.opened_at is None:
-            return False
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_at": self.opened_at,
+            "open_count": self.open_count,
+            "probes": self.probes,
+            "probe_started_at": self.probe_started_at,
+        }
 
-        # Verificar si ya pasó el TTL para cerrarlo
-        elapsed = time.time() - self.opened_at
-        if elapsed >= self.open_duration:
-            logger.info("Circuit breaker: cerrando después de %d segundos", int(elapsed))
-            self.close()
-            return False
+    def _load(self, state: Dict[str, Any]):
+        self.state = state.get("state", CLOSED)
+        self.failures = state.get("failures", 0)
+        self.opened_at = state.get("opened_at")
+        self.open_count = state.get("open_count", 0)
+        self.probes = state.get("probes", 0)
+        self.probe_started_at = state.get("probe_started_at")
+
+    def _sync(self):
+        """Actualiza el estado local desde el almacén compartido."""
+        if self.shared:
+            state = self.shared.load_breaker(self.name)
+            if state is not None:
+                self._load(state)
+
+    def _mutate(self, fn: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        """Aplica un cambio de estado (atómico si es compartido).
+
+        Si el almacén compartido está bloqueado por otro worker más allá
+        de su ``busy_timeout``, el cambio se aplica solo al estado local.
+        """
+        if self.shared:
+            try:
+                state = self.shared.update_breaker(self.name, lambda st: fn({**_INITIAL_STATE, **st}))
+            except sqlite3.Error as e:
+                logger.warning(f"Circuit breaker {self.name}: estado compartido no disponible ({e}), se usa el local")
+                state = fn(self._snapshot())
+        else:
+            state = fn(self._snapshot())
+        self._load(state)
+
+    def current_open_duration(self, open_count: Optional[int] = None) -> float:
+        """Duración de la apertura actual según el backoff exponencial."""
+        count = self.open_count if open_count is None else open_count
+        duration = self.open_duration * self.backoff_factor ** max(count - 1, 0)
+        return min(duration, self.max_open_duration)
+
+    def reset_at(self) -> Optional[float]:
+        """Momento (epoch) en que el circuito abierto pasará a semiabierto."""
+        if self.state != OPEN or self.opened_at is None:
+            return None
+        return self.opened_at + self.current_open_duration()
 
-        return True
+    def is_open(self) -> bool:
+        """Verifica si el circuito rechaza peticiones (sin consumir pruebas)."""
+        self._sync()
+        if self.state == OPEN:
+            return time.time() < (self.reset_at() or 0)
+        if self.state == HALF_OPEN:
+            return self.probes >= self.half_open_probes and not self._probe_expired(self._snapshot())
+        return False
+
+    def _probe_expired(self, st: Dict[str, Any]) -> bool:
+        started = st.get("probe_started_at")
+        return started is not None and time.time() - started >= self.probe_timeout
+
+    def allow_request(self) -> bool:
+        """Decide si una petición puede salir; en semiabierto reserva una prueba."""
+        self._sync()
+        if self.state == CLOSED:
+            return True
+
+        allowed = False
+
+        def apply(st: Dict[str, Any]) -> Dict[str, Any]:
+            nonlocal allowed
+            st = dict(st)
+            now = time.time()
+            if st["state"] == CLOSED:
+                allowed = True
+                return st
+            if st["state"] == OPEN:
+                if now < st["opened_at"] + self.current_open_duration(st["open_count"]):
+                    return st
+                logger.info(f"Circuit breaker {self.name}: SEMIABIERTO, enviando pruebas")
+                st.update(state=HALF_OPEN, probes=0, probe_started_at=None)
+            if self._probe_expired(st):
+                st["probes"] = 0
+            if st["probes"] < self.half_open_probes:
+                st["probes"] += 1
+                st["probe_started_at"] = now
+                allowed = True
+            return st
+
+        self._mutate(apply)
+        return allowed
 
     def record_success(self):
-        """Registra una operación exitosa."""
-        self.failures = 0
-        if self.opened_at:
-            logger.info("Circuit breaker: cerrando después de éxito")
-            self.opened_at = None
-
-    def record_failure(self):
-        """Registra un fallo y abre el circuito si alcanza el threshold."""
-        self.failures += 1
-        logger.warning(f"Circuit breaker: fallo {self.failures}/{self.failure_threshold}")
+        """Registra una operación exitosa (cierra el circuito si era una prueba)."""
+        self._sync()
+        if self.state == CLOSED and self.failures == 0:
+            return
+        if self.state != CLOSED:
+            logger.info(f"Circuit breaker {self.name}: cerrando después de éxito")
+        self._mutate(lambda st: dict(_INITIAL_STATE))
+
+    def release_probe(self):
+        """Libera una prueba reservada que no llegó a enviarse."""
+        def apply(st: Dict[str, Any]) -> Dict[str, Any]:
+            if st["state"] != HALF_OPEN or not st["probes"]:
+                return st
+            return {**st, "probes": st["probes"] - 1}
+
+        self._mutate(apply)
+
+    def record_failure(self, probe_only: bool = False):
+        """Registra un fallo; abre el circuito al llegar al umbral o si falla una prueba.
 
-        if self.failures >= self.failure_threshold and not self.opened_at:
-            self.open()
+        Args:
+            probe_only: Solo reabrir si está semiabierto (la prueba de
+                este breaker falló con otra clase de error)
+        """
+        opened = False
+
+        def apply(st: Dict[str, Any]) -> Dict[str, Any]:
+            nonlocal opened
+            if probe_only and st["state"] != HALF_OPEN:
+                return st
+            st = {**st, "failures": st["failures"] + 1}
+            if st["state"] == HALF_OPEN or (
+                st["state"] == CLOSED and st["failures"] >= self.failure_threshold
+            ):
+                st.update(
+                    state=OPEN, opened_at=time.time(), open_count=st["open_count"] + 1,
+                    probes=0, probe_started_at=None,
+                )
+                opened = True
+            return st
+
+        self._mutate(apply)
+        logger.warning(f"Circuit breaker {self.name}: fallo {self.failures}/{self.failure_threshold}")
+
+        if opened:
+            logger.error(
+                f"Circuit breaker {self.name}: ABIERTO por {self.current_open_duration():.0f}s "
+                f"(apertura #{self.open_count}) después de {self.failures} fallos"
+            )
 
     def open(self):
-        """Abre el circuito."""
-        self.opened_at = time.time()
-        logger.error(
-            f"Circuit breaker: ABIERTO por {self.open_duration}s después de "
-            f"{self.failures} fallos consecutivos"
-        )
+        """Abre el circuito manualmente."""
+        self._mutate(lambda st: {
+            **st, "state": OPEN, "opened_at": time.time(),
+            "open_count": st["open_count"] + 1, "probes": 0,
+        })
+        logger.error(f"Circuit breaker {self.name}: ABIERTO manualmente")
 
     def close(self):
         """Cierra el circuito manualmente."""
-        self.opened_at = None
-        self.failures = 0
+        self._mutate(lambda st: dict(_INITIAL_STATE))
+
+    def stats(self) -> Dict[str, Any]:
+        """Serializa el estado del breaker para ``/metrics``."""
+        self._sync()
+        reset_at = self.reset_at()
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "open_count": self.open_count,
+            "open_duration_s": round(self.current_open_duration(), 1) if self.state != CLOSED else 0,
+            "reset_at": datetime.fromtimestamp(reset_at).isoformat() if reset_at else None,
+            "probes_in_flight": self.probes,
+        }
+
+
+class CircuitBreakerGroup:
+    """
+    Conjunto de breakers por endpoint upstream y clase de error.
+
+    Cada endpoint tiene un breaker independiente por clase de error
+    (``timeout``, ``5xx``, ``4xx``, ``other``), cada uno con su propia
+    política.  Así, un endpoint de actuaciones caído no bloquea la
+    consulta de procesos, y unos pocos 4xx no abren el circuito como lo
+    haría una racha de timeouts.  Una petición al endpoint pasa solo si
+    ninguno de sus breakers la rechaza.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        policies: Dict[str, Dict[str, Any]],
+        shared: Optional[SharedStateStore] = None,
+    ):
+        """
+        Args:
+            name: Prefijo de los breakers (almacén compartido y métricas)
+            policies: Parámetros de ``SimpleCircuitBreaker`` por clase de error
+            shared: Almacén compartido entre procesos (opcional)
+        """
+        self.name = name
+        self.policies = policies
+        self.shared = shared
+        self._breakers: Dict[str, Dict[str, SimpleCircuitBreaker]] = {}
+
+    def breakers(self, endpoint: str) -> Dict[str, SimpleCircuitBreaker]:
+        """Breakers del endpoint por clase de error (se crean bajo demanda)."""
+        if endpoint not in self._breakers:
+            self._breakers[endpoint] = {
+                error_class: SimpleCircuitBreaker(
+                    name=f"{self.name}:{endpoint}:{error_class}", shared=self.shared, **policy
+                )
+                for error_class, policy in self.policies.items()
+            }
+        return self._breakers[endpoint]
+
+    def allow(self, endpoint: str) -> Optional[List[SimpleCircuitBreaker]]:
+        """Decide si una petición al endpoint puede salir.
+
+        Returns:
+            None si algún breaker la rechaza; si no, los breakers
+            semiabiertos en los que la petición reservó una prueba (para
+            pasarlos a ``record_failure``).  Si un breaker la rechaza
+            después de que otros reservaran prueba, esas pruebas se liberan.
+        """
+        breakers = list(self.breakers(endpoint).values())
+        if any(b.is_open() for b in breakers):
+            return None
+        probes: List[SimpleCircuitBreaker] = []
+        allowed = True
+        for breaker in breakers:
+            if not breaker.allow_request():
+                allowed = False
+            elif breaker.state == HALF_OPEN:
+                probes.append(breaker)
+        if not allowed:
+            for breaker in probes:
+                breaker.release_probe()
+            return None
+        return probes
+
+    def record_success(self, endpoint: str):
+        """Registra un éxito en todos los breakers del endpoint (cierra las pruebas)."""
+        for breaker in self.breakers(endpoint).values():
+            breaker.record_success()
+
+    def record_failure(
+        self, endpoint: str, error_class: str, probes: Sequence[SimpleCircuitBreaker] = ()
+    ):
+        """Registra un fallo en el breaker de su clase de error.
+
+        Los breakers de ``probes`` (devueltos por ``allow``) que siguen
+        semiabiertos se reabren aunque el fallo sea de otra clase: su
+        prueba falló.
+        """
+        breakers = self.breakers(endpoint)
+        breaker = breakers.get(error_class) or breakers["other"]
+        breaker.record_failure()
+        for probe in probes:
+            if probe is not breaker:
+                probe.record_failure(probe_only=True)
+
+    def is_open(self, endpoint: Optional[str] = None) -> bool:
+        """Indica si algún breaker (del endpoint o de todos) rechaza peticiones."""
+        endpoints = [endpoint] if endpoint else list(self._breakers)
+        return any(b.is_open() for ep in endpoints for b in self.breakers(ep).values())
+
+    @property
+    def failures(self) -> int:
+        """Mayor número de fallos consecutivos entre todos los breakers."""
+        return max(
+            (b.failures for eps in self._breakers.values() for b in eps.values()), default=0
+        )
+
+    def reset_at(self) -> Optional[float]:
+        """Momento más lejano en que un breaker abierto pasará a semiabierto."""
+        times = [
+            b.reset_at() for eps in self._breakers.values() for b in eps.values()
+            if b.is_open()
+        ]
+        return max((t for t in times if t), default=None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado de cada breaker, agrupado por endpoint y clase de error."""
+        return {
+            endpoint: {error_class: b.stats() for error_class, b in breakers.items()}
+            for endpoint, breakers in self._breakers.items()
+        }
+
+
+def _approx_size(data: Any) -> int:
+    """Estima el tamaño en bytes de un valor a partir de su JSON."""
+    try:
+        return len(json.dumps(data, default=str))
+    except (TypeError, ValueError):
+        return len(repr(data))
+
+
+# Límites superiores (segundos) de los rangos de edad reportados en métricas
+AGE_BUCKETS = [(60, "lt_1m"), (300, "lt_5m"), (3600, "lt_1h"), (21600, "lt_6h")]
 
 
 class SimpleCache:
-    """Cache simple en memoria con TTL."""
+    """
+    Cache en memoria con TTL y desalojo LRU.
+
+    - Límite de entradas y límite aproximado de bytes (tamaño del JSON)
+    - Al superar cualquiera de los dos se desalojan las entradas menos
+      usadas recientemente
+    - Un barrido periódico en segundo plano elimina las entradas
+      expiradas aunque nunca se vuelvan a leer
+    - Opcionalmente, un segundo nivel persistente (``SQLiteCacheStore``):
+      se escribe de forma asíncrona en cada ``set``, se precarga en
+      segundo plano al arrancar y ``aget``/``aget_with_age`` lo leen en
+      un hilo cuando falla la memoria (``get``/``get_with_age`` solo
+      miran la memoria y no hacen E/S en el event loop)
+    - ``encode``/``decode`` convierten los valores guardados en memoria
+      (p. ej. ``CompactCase``) a JSON para el segundo nivel y para
+      estimar su tamaño
+    """
 
-    def __init__(self, ttl: int = 86400):  # 24 horas
+    def __init__(
+        self,
+        ttl: int = 86400,  # 24 horas
+        max_entries: int = 5000,
+        max_bytes: int = 256 * 1024 * 1024,
+        sweep_interval: int = 300,
+        store: Optional[SQLiteCacheStore] = None,
+        encode: Callable[[Any], Any] = lambda value: value,
+        decode: Callable[[Any], Any] = lambda value: value,
+    ):
         """
         Args:
             ttl: Tiempo de vida de las entradas en segundos (default 24h)
+            max_entries: Máximo de entradas antes de desalojar (LRU)
+            max_bytes: Presupuesto aproximado de bytes antes de desalojar
+            sweep_interval: Segundos entre barridos de entradas expiradas
+            store: Segundo nivel persistente opcional
+            encode: Valor en memoria -> forma JSON
+            decode: Forma JSON -> valor en memoria
         """
         self.ttl = ttl
-        self._cache: Dict[str, CacheEntry] = {}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.size_bytes = 0
+        self.evictions: Dict[str, int] = {"lru": 0, "bytes": 0, "expired": 0}
+        self._sweeper: Optional["asyncio.Task[None]"] = None
+        self.store = store
+        self.encode = encode
+        self.decode = decode
+        self.store_hits = 0
+        self.warmed = 0
+        self._warmer: Optional["asyncio.Task[None]"] = None
+
+    def __len__(self) -> int:
+        return len(self._cache)
 
     def get(self, key: str) -> Optional[Dict[str, Any]]:
-        """Obtiene un valor del cache si existe y no ha expirado."""
+        """Obtiene un valor del cache en memoria si existe y no ha expirado."""
+        data, _ = self.get_with_age(key)
+        return data
+
+    def get_with_age(self, key: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Obtiene un valor del cache en memoria junto con su edad en segundos.
+
+        Returns:
+            Tupla ``(data, edad)``; ``(None, 0.0)`` si no existe o expiró.
+        """
+        return self._fresh(key, self._cache.get(key))
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """Como ``get``, consultando el segundo nivel si falla la memoria."""
+        data, _ = await self.aget_with_age(key)
+        return data
+
+    async def aget_with_age(self, key: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Como ``get_with_age``, consultando el segundo nivel si falla la memoria."""
         entry = self._cache.get(key)
+        if entry is None and self.store:
+            entry = await self._load_from_store(key)
+        return self._fresh(key, entry)
+
+    def _fresh(self, key: str, entry: Optional[CacheEntry]) -> Tuple[Optional[Dict[str, Any]], float]:
+        """``(data, edad)`` de una entrada vigente; descarta la expirada."""
         if not entry:
-            return None
+            return None, 0.0
 
         elapsed = time.time() - entry.timestamp
-        if elapsed > self.ttl:
+        if elapsed > self._ttl_of(entry):
             logger.debug(f"Cache: entrada {key} expiró ({int(elapsed)}s)")
-            del self._cache[key]
-            return None
+            self._remove(key)
+            self.evictions["expired"] += 1
+            return None, 0.0
 
+        self._cache.move_to_end(key)
         logger.info(f"Cache: hit para {key} (edad: {int(elapsed)}s)")
-        return entry.data
+        return entry.data, elapsed
+
+    def _ttl_of(self, entry: CacheEntry) -> float:
+        return self.ttl if entry.ttl is None else entry.ttl
 
-    def set(self, key: str, data: Dict[str, Any]):
-        """Guarda un valor en el cache."""
-        self._cache[key] = CacheEntry(data=data, timestamp=time.time())
-        logger.info(f"Cache: guardado {key}")
+    def set(self, key: str, data: Dict[str, Any], ttl: Optional[float] = None):
+        """Guarda un valor en el cache, desalojando entradas si hace falta.
+
+        Args:
+            key: Clave de la entrada
+            data: Valor a guardar
+            ttl: Tiempo de vida propio en segundos.  Las entradas con TTL
+                propio son de vida corta y solo se guardan en memoria (el
+                almacenamiento persistente no conserva TTL por entrada).
+        """
+        encoded = self.encode(data)
+        size = _approx_size(encoded)
+        if size > self.max_bytes:
+            logger.warning(
+                f"Cache: {key} ocupa ~{size} bytes, supera el presupuesto de "
+                f"{self.max_bytes} bytes; no se guarda"
+            )
+            return
+
+        timestamp = time.time()
+        self._insert(key, data, timestamp, size, ttl)
+        if self.store and ttl is None:
+            self.store.put(key, encoded, timestamp)
+        logger.info(f"Cache: guardado {key} (~{size} bytes)")
 
     def clear(self, key: Optional[str] = None):
         """Limpia el cache completo o una entrada específica."""
         if key:
-            self._cache.pop(key, None)
+            self._remove(key)
         else:
             self._cache.clear()
+            self.size_bytes = 0
+        if self.store:
+            if key:
+                self.store.delete(key)
+            else:
+                self.store.clear()
+
+    def _insert(
+        self, key: str, data: Dict[str, Any], timestamp: float, size: int,
+        ttl: Optional[float] = None,
+    ):
+        """Inserta una entrada en memoria y aplica los límites."""
+        self._remove(key)
+        self._cache[key] = CacheEntry(data=data, timestamp=timestamp, size=size, ttl=ttl)
+        self.size_bytes += size
+        self._evict()
+
+    async def _load_from_store(self, key: str) -> Optional[CacheEntry]:
+        """Lee una entrada del segundo nivel en un hilo y la promueve a memoria."""
+        row = await asyncio.to_thread(self._read_store, key)
+        if not row:
+            return None
+        current = self._cache.get(key)
+        if current is not None:
+            # Guardada en memoria mientras se leía el disco: es más reciente
+            return current
+        data, timestamp, size = row
+        self.store_hits += 1
+        logger.info(f"Cache: {key} recuperada del almacenamiento persistente")
+        self._insert(key, data, timestamp, size)
+        return self._cache.get(key)
+
+    def _read_store(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        """Lectura y decodificación de una entrada del segundo nivel (en un hilo)."""
+        row = self.store.get(key)
+        if not row:
+            return None
+        data, timestamp = row
+        size = _approx_size(data)
+        if size > self.max_bytes:
+            return None
+        return self.decode(data), timestamp, size
+
+    def _read_all_store(self) -> List[Tuple[str, Any, float, int]]:
+        """Lectura, tamaño y decodificación de las entradas vigentes (en un hilo)."""
+        rows = []
+        for key, data, timestamp in self.store.load_all(self.ttl, self.max_entries):
+            size = _approx_size(data)
+            if size <= self.max_bytes:
+                rows.append((key, self.decode(data), timestamp, size))
+        return rows
+
+    def _remove(self, key: str):
+        """Elimina una entrada actualizando el contador de bytes."""
+        entry = self._cache.pop(key, None)
+        if entry:
+            self.size_bytes -= entry.size
+
+    def _evict(self):
+        """Desaloja entradas LRU hasta respetar los límites."""
+        while len(self._cache) > self.max_entries:
+            key, entry = self._cache.popitem(last=False)
+            self.size_bytes -= entry.size
+            self.evictions["lru"] += 1
+            logger.debug(f"Cache: desalojada {key} (límite de entradas)")
+
+        while self.size_bytes > self.max_bytes and self._cache:
+            key, entry = self._cache.popitem(last=False)
+            self.size_bytes -= entry.size
+            self.evictions["bytes"] += 1
+            logger.debug(f"Cache: desalojada {key} (presupuesto de bytes)")
+
+    def sweep(self) -> int:
+        """Elimina todas las entradas expiradas.
+
+        Returns:
+            Número de entradas eliminadas.
+        """
+        now = time.time()
+        expired = [k for k, e in self._cache.items() if now - e.timestamp > self._ttl_of(e)]
+        for key in expired:
+            self._remove(key)
+        self.evictions["expired"] += len(expired)
+        if expired:
+            logger.info(f"Cache: barrido eliminó {len(expired)} entradas expiradas")
+        if self.store:
+            self.store.compact(self.ttl)
+        return len(expired)
+
+    async def warm(self):
+        """Precarga en memoria las entradas vigentes del segundo nivel.
+
+        La lectura, el cálculo del tamaño y la decodificación se hacen en
+        un hilo; en el event loop solo se insertan las entradas, sin
+        sobrescribir las que ya estén en memoria (más recientes).
+        """
+        if not self.store:
+            return
+        rows = await asyncio.to_thread(self._read_all_store)
+        loaded = 0
+        for key, data, timestamp, size in rows:
+            if key in self._cache:
+                continue
+            self._insert(key, data, timestamp, size)
+            # El orden de inserción (antiguas primero) no refleja uso real:
+            # dejar las precargadas como las menos recientes
+            self._cache.move_to_end(key, last=False)
+            loaded += 1
+        self.warmed += loaded
+        logger.info(f"Cache: precargadas {loaded} entradas desde {self.store.path}")
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.error(f"Cache: error en barrido: {exc}")
+
+    def start(self):
+        """Inicia el barrido periódico y la precarga en el event loop actual."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.ensure_future(self._sweep_loop())
+        if self.store and self._warmer is None:
+            self._warmer = asyncio.ensure_future(self.warm())
+
+    async def stop(self):
+        """Detiene las tareas en segundo plano y vacía las escrituras pendientes."""
+        for task in (self._sweeper, self._warmer):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._sweeper = None
+        self._warmer = None
+        if self.store:
+            await asyncio.to_thread(self.store.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        """Serializa el estado del cache para ``/metrics``."""
+        now = time.time()
+        ages = {label: 0 for _, label in AGE_BUCKETS}
+        ages["gte_6h"] = 0
+        oldest = 0.0
+        for entry in self._cache.values():
+            age = now - entry.timestamp
+            oldest = max(oldest, age)
+            for limit, label in AGE_BUCKETS:
+                if age < limit:
+                    ages[label] += 1
+                    break
+            else:
+                ages["gte_6h"] += 1
+
+        return {
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": dict(self.evictions),
+            "age_distribution": ages,
+            "oldest_age_s": round(oldest, 1),
+            "store_hits": self.store_hits,
+            "warmed": self.warmed,
+            "persistent": self.store.stats() if self.store else None,
+        }
+
+
+class SingleFlight:
+    """
+    Coalescencia de llamadas concurrentes idénticas (single-flight).
+
+    Mientras hay una consulta en curso para una clave, las demás llamadas
+    con la misma clave esperan ese mismo resultado en lugar de repetir la
+    petición al upstream.  La consulta corre en su propia tarea, así que
+    cancelar a uno de los solicitantes no la cancela para los demás.
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Nombre usado en las métricas (``coalesced_<name>``)
+        """
+        self.name = name
+        self._in_flight: Dict[str, "asyncio.Task[Any]"] = {}
+
+    def in_flight(self, key: str) -> bool:
+        """Indica si hay una consulta en curso para la clave."""
+        return key in self._in_flight
+
+    def start(self, key: str, fn: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        """Lanza ``fn`` en una tarea si no hay otra en curso para ``key``.
+
+        No espera el resultado; devuelve la tarea (nueva o existente).
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        return task
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Ejecuta ``fn`` o se une a la ejecución en curso para ``key``."""
+        if key in self._in_flight:
+            logger.info(f"SingleFlight[{self.name}]: coalesciendo llamada para {key}")
+            metrics.record_coalesced(self.name)
+        return await asyncio.shield(self.start(key, fn))
+
+    def _forget(self, key: str, task: "asyncio.Task[Any]"):
+        """Libera la clave al terminar la consulta."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Marcar la excepción como consultada si todos los solicitantes se cancelaron
+        if not task.cancelled():
+            task.exception()
 
 
 # Instancias globales
-rama_circuit = SimpleCircuitBreaker(failure_threshold=3, open_duration=600)
-rama_cache = SimpleCache(ttl=86400)
+# Estado compartido entre workers; vacío = cada proceso con su estado
+_shared_state_path = os.getenv("INGEST_SHARED_STATE_PATH")
+# Cada cuánto publica un worker sus contadores y relee los breakers; los
+# contadores de un worker que deja de publicar se descartan tras tres
+# intervalos
+METRICS_PUBLISH_SECONDS = float(os.getenv("INGEST_METRICS_PUBLISH_SECONDS", "5"))
+BREAKER_REFRESH_SECONDS = float(os.getenv("INGEST_BREAKER_REFRESH_SECONDS", "1"))
+shared_state = SharedStateStore(
+    _shared_state_path,
+    worker_ttl=3 * METRICS_PUBLISH_SECONDS,
+    busy_timeout=int(os.getenv("INGEST_SHARED_STATE_BUSY_MS", "100")) / 1000,
+    snapshot_max_age=5 * BREAKER_REFRESH_SECONDS,
+) if _shared_state_path else None
+_cache_db_path = os.getenv("RAMA_CACHE_DB_PATH") or _shared_state_path
+
+
+def _breaker_policy(error_class: str, threshold: int, open_s: int, max_open_s: int) -> Dict[str, Any]:
+    """Política de una clase de error (``RAMA_BREAKER_<CLASE>_*`` la sobrescribe)."""
+    prefix = f"RAMA_BREAKER_{error_class.upper()}_"
+    return {
+        "failure_threshold": int(os.getenv(prefix + "THRESHOLD", str(threshold))),
+        "open_duration": int(os.getenv(prefix + "OPEN_SECONDS", str(open_s))),
+        "max_open_duration": int(os.getenv(prefix + "MAX_OPEN_SECONDS", str(max_open_s))),
+        "backoff_factor": float(os.getenv("RAMA_BREAKER_BACKOFF_FACTOR", "2")),
+        "half_open_probes": int(os.getenv("RAMA_BREAKER_HALF_OPEN_PROBES", "1")),
+        "probe_timeout": int(os.getenv("RAMA_BREAKER_PROBE_TIMEOUT_SECONDS", "60")),
+    }
+
+
+# Políticas por clase de error: primera apertura corta y backoff
+# exponencial hasta 10 min; los 4xx necesitan una racha más larga
+rama_circuit = CircuitBreakerGroup(
+    "rama",
+    policies={
+        "timeout": _breaker_policy("timeout", 3, 30, 600),
+        "5xx": _breaker_policy("5xx", 3, 60, 600),
+        "4xx": _breaker_policy("4xx", 10, 60, 600),
+        "other": _breaker_policy("other", 3, 60, 600),
+    },
+    shared=shared_state,
+)
+rama_cache = SimpleCache(
+    ttl=86400,
+    max_entries=int(os.getenv("RAMA_CACHE_MAX_ENTRIES", "5000")),
+    max_bytes=int(os.getenv("RAMA_CACHE_MAX_MB", "256")) * 1024 * 1024,
+    sweep_interval=int(os.getenv("RAMA_CACHE_SWEEP_SECONDS", "300")),
+    # Segundo nivel en disco; vacío = solo memoria
+    store=SQLiteCacheStore(_cache_db_path) if _cache_db_path else None,
+    # Los procesos se guardan como ``CompactCase`` (sin alias duplicados)
+    encode=compact.encode,
+    decode=compact.decode,
+)
+proceso_flight = SingleFlight("proceso")  # Clave: radicado
+actuaciones_flight = SingleFlight("actuaciones")  # Clave: id_proceso
+
+
+def _publish_and_aggregate(counters: Dict[str, int]) -> Dict[str, Any]:
+    """Publica los contadores de este worker y suma los de todos (en un hilo)."""
+    shared_state.publish_counters(counters)
+    return shared_state.aggregate_counters()
+
+
+async def collect_metrics() -> Dict[str, Any]:
+    """Métricas de ``/metrics``, sumadas entre workers en modo compartido.
+
+    La escritura y la consulta de SQLite corren en un hilo; los
+    contadores e histogramas en memoria se leen en el event loop.
+    """
+    if not shared_state:
+        return metrics.to_dict()
+    try:
+        aggregated = await asyncio.to_thread(_publish_and_aggregate, metrics.counters())
+    except sqlite3.Error as exc:
+        logger.warning(f"Estado compartido no disponible, métricas solo de este worker: {exc}")
+        return metrics.to_dict()
+    return {
+        **metrics.to_dict(aggregated["counters"]),
+        "workers": aggregated["workers"],
+    }
+
+
+async def publish_metrics_loop(interval: float = METRICS_PUBLISH_SECONDS):
+    """Publica periódicamente los contadores de este worker (modo compartido)."""
+    while shared_state:
+        try:
+            await asyncio.to_thread(shared_state.publish_counters, metrics.counters())
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error(f"Error publicando métricas compartidas: {exc}")
+        await asyncio.sleep(interval)
+
+
+def release_shared_state():
+    """Borra del almacén compartido los contadores de este worker (al apagar)."""
+    if not shared_state:
+        return
+    try:
+        shared_state.remove_worker()
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning(f"No se pudieron borrar los contadores de este worker: {exc}")
+
+
+async def refresh_breakers_loop(interval: float = BREAKER_REFRESH_SECONDS):
+    """Relee periódicamente, desde un hilo, el estado compartido de los breakers."""
+    while shared_state:
+        try:
+            await asyncio.to_thread(shared_state.refresh_breakers)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(f"Error refrescando los circuit breakers compartidos: {exc}")
+        await asyncio.sleep(interval)
@@ -14,24 +14,93 @@ repositorio y ejecuta:
 
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import asyncio
 import re
 import os
 import time
 from collections import defaultdict
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 from fastapi import FastAPI, HTTPException, Query, Header, Depends, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 # Cargar variables de entorno desde .env
 load_dotenv()
 
-from .clients.rama_client import fetch_proceso_completo, fetch_proceso_completo_safe
-from .analyzers.auto_classifier import batch_analyze, analyze_actuacion
+from .clients.rama_client import (
+    fetch_proceso_completo,
+    fetch_proceso_completo_safe,
+    fetch_many_procesos,
+    is_not_found,
+    ProcesoNoEncontrado,
+)
+from .analyzers.auto_classifier import (
+    analyze_actuacion,
+    batch_analyze_async,
+    classification_cache,
+    shutdown_process_pool,
+)
+from .analyzers.document_extractor import document_store, page_paths
+from .analyzers.ocr_engine import ocr_engine
 from .notifications.notifier import get_notifier
-from .clients.resilience import rama_circuit, rama_cache, metrics
+from .clients.resilience import (
+    rama_circuit,
+    rama_cache,
+    shared_state,
+    metrics,
+    collect_metrics,
+    publish_metrics_loop,
+    refresh_breakers_loop,
+    release_shared_state,
+)
+from .clients.http_pool import rama_http, rama_http_lifespan
+from .utils.prometheus import CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE, PrometheusText
+from .utils.timing import stage, stage_histograms, stage_stats, start_timer
+
+# Cabecera Server-Timing en /ingest/ramajud-normalized por defecto
+# (también se puede pedir por petición con ?timing=true)
+SERVER_TIMING = os.getenv("INGEST_SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida de la aplicación.
+
+    Abre el pool HTTP compartido con la Rama Judicial al arrancar y lo
+    cierra al apagar, liberando las conexiones keep-alive.  También
+    inicia el barrido periódico de entradas expiradas del cache y, si
+    hay cache persistente, su precarga en segundo plano.  En modo
+    multi-proceso (``INGEST_SHARED_STATE_PATH``) publica periódicamente
+    los contadores de este worker en el almacén compartido y relee el
+    estado de los circuit breakers; al apagar borra sus contadores.  Al
+    apagar cierra también el pool de procesos de clasificación de autos,
+    si se creó.
+    """
+    async with rama_http_lifespan():
+        rama_cache.start()
+        background = [
+            asyncio.ensure_future(publish_metrics_loop()),
+            asyncio.ensure_future(refresh_breakers_loop()),
+        ] if shared_state else []
+        try:
+            yield
+        finally:
+            for task in background:
+                task.cancel()
+            release_shared_state()
+            await rama_cache.stop()
+            shutdown_process_pool()
+            ocr_engine.shutdown()
+
 
-app = FastAPI(title="Microservicio Ingesta de Procesos y Vigilancia de Autos")
+app = FastAPI(
+    title="Microservicio Ingesta de Procesos y Vigilancia de Autos",
+    lifespan=lifespan,
+)
 
 
 # Rate limiter simple: 10 requests per minute por IP
@@ -129,39 +198,127 @@ async def healthz() -> Dict[str, Any]:
     return {"ok": True}
 
 
-@app.get("/metrics", tags=["Utils"])
-async def get_metrics() -> Dict[str, Any]:
+BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _prometheus_metrics(data: Dict[str, Any]) -> str:
+    """Convierte el diccionario de ``/metrics`` al formato de texto de Prometheus."""
+    out = PrometheusText()
+    for name in metrics.counters():
+        if name in data:
+            out.counter(name, data[name], f"Contador {name} (suma de workers)")
+    out.gauge("breaker_open", data["breaker_open"], "1 si algún circuit breaker rechaza peticiones")
+    out.gauge("cache_keys", data["cache_keys"], "Entradas en el cache de procesos")
+    if "workers" in data:
+        out.gauge("workers", data["workers"], "Workers con contadores recientes")
+    for endpoint, breakers in data["breakers"].items():
+        for error_class, st in breakers.items():
+            out.gauge(
+                "breaker_state", BREAKER_STATE_VALUES.get(st["state"], 0),
+                "Estado del breaker (0=closed, 1=half_open, 2=open)",
+                endpoint=endpoint, error_class=error_class,
+            )
+    for section in (
+        "cache", "http_pool", "classification_cache", "document_store", "document_extraction", "ocr",
+    ):
+        for key, value in (data.get(section) or {}).items():
+            if isinstance(value, (int, float)):
+                out.gauge(f"{section}_{key}", value, f"{section}.{key}")
+    out.summary("latency_ms", metrics.latency, "Latencia de consultas exitosas (ms)")
+    for name, histogram in sorted(stage_histograms.items()):
+        out.summary(
+            "stage_latency_ms", histogram,
+            "Latencia por etapa del pipeline normalizado (ms)", stage=name,
+        )
+    for endpoint, by_class in sorted(metrics.upstream.items()):
+        for status_class, histogram in sorted(by_class.items()):
+            out.summary(
+                "upstream_latency_ms", histogram,
+                "Latencia por intento HTTP a Rama Judicial (ms)",
+                endpoint=endpoint, status_class=status_class,
+            )
+    return out.render()
+
+
+@app.get("/metrics", tags=["Utils"], response_model=None)
+async def get_metrics(
+    format: str = Query("json", pattern="^(json|prometheus)$"),
+) -> Any:
     """Endpoint de métricas para observabilidad.
 
     Expone contadores y estadísticas del circuit breaker, cache y peticiones
-    a la API de Rama Judicial.
+    a la API de Rama Judicial.  Con ``?format=prometheus`` devuelve las
+    mismas métricas en formato de texto de Prometheus (latencias como
+    ``summary`` con cuantiles).
 
     Returns:
         Diccionario con métricas:
-        - breaker_open: Estado del circuit breaker
-        - failures: Número de fallos consecutivos
-        - reset_at: Timestamp ISO cuando se reabrirá el circuito (si está abierto)
+        - breaker_open: True si algún circuit breaker rechaza peticiones
+        - failures: Mayor número de fallos consecutivos entre los breakers
+        - reset_at: Timestamp ISO en que el último circuito abierto pasará a
+          semiabierto (si hay alguno abierto)
         - cache_keys: Número de entradas en cache
         - rama_ok: Peticiones exitosas a Rama Judicial
         - rama_5xx: Peticiones fallidas (5xx)
         - cache_hit: Hits de cache
         - demo_hit: Fallbacks a datos demo
-        - latency_ms_p50: Latencia p50
-        - latency_ms_p95: Latencia p95
+        - fresh_hit: Respuestas servidas desde cache dentro de la ventana de frescura
+        - stale_hit: Respuestas servidas desde cache vencido mientras se refresca
+        - refreshes: Refrescos de cache lanzados en segundo plano
+        - coalesced_proceso / coalesced_actuaciones: Llamadas coalescidas
+        - not_found / not_found_hit: Radicados inexistentes consultados y
+          respondidos desde el cache negativo
+        - workers: Procesos sumados (solo en modo multi-proceso; los
+          contadores son la suma de todos los workers)
+        - latency_ms_p50 / latency_ms_p95 / latency_ms_p99: Latencia de
+          las consultas exitosas (del proceso actual)
+        - latency: Histogramas de latencia (total y por endpoint y clase
+          de estado) con p50/p90/p95/p99/p999 acumulados y de las
+          ventanas 1m, 5m y 1h
+        - cache: Tamaño en bytes, desalojos y distribución de edades del cache
+        - http_pool: Utilización del pool de conexiones HTTP a Rama Judicial
+        - classification_cache: Tamaño, hits, misses y tasa de acierto del
+          cache de clasificación de autos (del proceso actual)
+        - document_store: Almacén de documentos y texto extraído (si
+          ``DOCUMENT_STORE_DIR`` está definido): bytes usados, tasas de
+          acierto por URL y por texto, bytes de descarga y segundos de
+          extracción ahorrados, desalojos
+        - document_extraction: Documentos procesados y páginas por camino
+          de extracción: capa de texto, OCR, capa de texto pobre
+          conservada (sin OCR) y vacías
+        - ocr: Pool de OCR (procesos, páginas en curso, documentos y
+          páginas procesadas, errores); los tiempos por página están en
+          ``stages`` (ocr_rasterize, ocr_page)
+        - breakers: Estado (closed/open/half_open) de cada breaker por
+          endpoint y clase de error
+        - stages: Histogramas por etapa del pipeline normalizado
+          (proceso, actuaciones, normalize, batch_analyze, serialization)
     """
     from datetime import datetime
 
+    reset_at = rama_circuit.reset_at()
     breaker_data = {
         "breaker_open": rama_circuit.is_open(),
         "failures": rama_circuit.failures,
-        "reset_at": datetime.fromtimestamp(rama_circuit.opened_at).isoformat() if rama_circuit.opened_at else None,
-        "cache_keys": len(rama_cache._cache),
+        "reset_at": datetime.fromtimestamp(reset_at).isoformat() if reset_at else None,
+        "cache_keys": len(rama_cache),
     }
 
-    return {
+    data = {
         **breaker_data,
-        **metrics.to_dict(),
+        **(await collect_metrics()),
+        "cache": rama_cache.stats(),
+        "http_pool": rama_http.stats(),
+        "classification_cache": classification_cache.stats(),
+        "document_store": document_store.stats() if document_store else None,
+        "document_extraction": dict(page_paths),
+        "ocr": ocr_engine.stats(),
+        "breakers": rama_circuit.stats(),
+        "stages": stage_stats(),
     }
+    if format == "prometheus":
+        return PlainTextResponse(_prometheus_metrics(data), media_type=PROMETHEUS_CONTENT_TYPE)
+    return data
 
 
 @app.get("/ingest/ramajud/{radicado}", tags=["Ingest"])
@@ -198,9 +355,10 @@ async def ingest_radicado_normalized(
     request: Request,
     use_safe: bool = True,
     analyze_autos: bool = True,
+    timing: bool = False,
     api_key: str = Depends(verify_api_key),
     client_ip: str = Depends(check_rate_limit)
-) -> Dict[str, Any]:
+) -> JSONResponse:
     """Consulta un radicado y devuelve la respuesta normalizada.
 
     Por defecto usa modo SAFE con circuit breaker, timeout reducido,
@@ -210,7 +368,8 @@ async def ingest_radicado_normalized(
     Flujo del modo SAFE (predeterminado):
     - Timeout de 5 segundos por petición
     - Máximo 2 reintentos
-    - Circuit breaker: se abre después de 3 fallos consecutivos por 10 min
+    - Circuit breakers por endpoint y tipo de error, con reapertura
+      semiabierta y backoff exponencial
     - Cache: datos exitosos se guardan por 24 horas
     - Fallback: si todo falla, retorna último dato cacheado o datos demo
 
@@ -218,6 +377,8 @@ async def ingest_radicado_normalized(
         radicado: Número único de radicación (23 dígitos normalmente).
         use_safe: Si True (default) usa modo resiliente, si False usa API directa sin protección
         analyze_autos: Si True, analiza y clasifica AUTOS automáticamente
+        timing: Si True (o con ``INGEST_SERVER_TIMING``) agrega la cabecera
+            ``Server-Timing`` con la duración de cada etapa
 
     Returns:
         Diccionario con el estado de la operación y el payload normalizado.
@@ -225,7 +386,11 @@ async def ingest_radicado_normalized(
         - case: Datos del proceso
         - parties: Partes procesales
         - acts: Actuaciones (con análisis si analyze_autos=True)
+
+    Raises:
+        HTTPException 404: si la Rama Judicial no tiene el radicado
     """
+    timer = start_timer()
     try:
         # Por defecto usar modo SAFE (resiliente)
         if use_safe:
@@ -234,11 +399,24 @@ async def ingest_radicado_normalized(
             # Modo directo sin protección (solo para debugging)
             normalized = await fetch_proceso_completo(radicado)
 
+        if is_not_found(normalized):
+            raise ProcesoNoEncontrado(normalized["message"])
+
         # Analizar AUTOS si se solicitó
+        # (sin mutar el dict, que puede estar compartido con el cache o
+        # con otras peticiones coalescidas)
         if analyze_autos and normalized.get("acts"):
-            normalized["acts"] = batch_analyze(normalized["acts"])
-
-        return {"ok": True, **normalized}
+            with stage("batch_analyze"):
+                normalized = {**normalized, "acts": await batch_analyze_async(normalized["acts"])}
+
+        # Serialización explícita para poder medirla como una etapa más
+        with stage("serialization"):
+            response = JSONResponse(jsonable_encoder({"ok": True, **normalized}))
+        if timing or SERVER_TIMING:
+            response.headers["Server-Timing"] = timer.server_timing()
+        return response
+    except ProcesoNoEncontrado as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
     except Exception as exc:
         # Solo en modo no-safe se propaga el error como 502
         # En modo safe nunca debería llegar aquí (tiene fallback)
@@ -298,6 +476,7 @@ async def analyze_autos(
     radicado: str,
     request: Request,
     notify: bool = False,
+    engine: Optional[str] = Query(None, pattern="^(rules|vector)$"),
     api_key: str = Depends(verify_api_key),
     client_ip: str = Depends(check_rate_limit)
 ) -> Dict[str, Any]:
@@ -310,6 +489,8 @@ async def analyze_autos(
     Args:
         radicado: Número único de radicación
         notify: Si True, envía notificaciones para autos perentorios
+        engine: Motor de clasificación (``rules``/``vector``); por
+            defecto ``AUTO_CLASSIFIER_ENGINE``
 
     Returns:
         Diccionario con:
@@ -320,10 +501,12 @@ async def analyze_autos(
     try:
         # Consultar proceso completo con API REAL
         normalized = await fetch_proceso_completo_safe(radicado)
+        if is_not_found(normalized):
+            raise ProcesoNoEncontrado(normalized["message"])
         actuaciones = normalized.get("acts", [])
 
         # Analizar todas las actuaciones
-        analyzed = batch_analyze(actuaciones)
+        analyzed = await batch_analyze_async(actuaciones, engine)
 
         # Filtrar autos
         autos_perentorios = [a for a in analyzed if a.get("auto_type") == "perentorio"]
@@ -345,6 +528,8 @@ async def analyze_autos(
             "notificaciones_enviadas": notify,
         }
 
+    except ProcesoNoEncontrado as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
     except Exception as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
@@ -353,6 +538,7 @@ async def analyze_autos(
 async def get_auto_history(
     radicado: str,
     request: Request,
+    engine: Optional[str] = Query(None, pattern="^(rules|vector)$"),
     api_key: str = Depends(verify_api_key),
     client_ip: str = Depends(check_rate_limit)
 ) -> Dict[str, Any]:
@@ -361,6 +547,7 @@ async def get_auto_history(
 
     Args:
         radicado: Número único de radicación
+        engine: Motor de clasificación (``rules``/``vector``)
 
     Returns:
         Historial de autos con análisis completo
@@ -368,10 +555,12 @@ async def get_auto_history(
     try:
         # Consultar proceso completo con API REAL
         normalized = await fetch_proceso_completo_safe(radicado)
+        if is_not_found(normalized):
+            raise ProcesoNoEncontrado(normalized["message"])
         actuaciones = normalized.get("acts", [])
 
         # Analizar y filtrar solo autos
-        analyzed = batch_analyze(actuaciones)
+        analyzed = await batch_analyze_async(actuaciones, engine)
         autos = [a for a in analyzed if a.get("is_auto")]
 
         # Ordenar por fecha (más recientes primero)
@@ -388,6 +577,8 @@ async def get_auto_history(
             "autos": autos_sorted,
         }
 
+    except ProcesoNoEncontrado as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
     except Exception as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
@@ -396,6 +587,7 @@ async def get_auto_history(
 async def trigger_scan(
     radicados: List[str] = Query(...),
     request: Request = None,
+    engine: Optional[str] = Query(None, pattern="^(rules|vector)$"),
     api_key: str = Depends(verify_api_key),
     client_ip: str = Depends(check_rate_limit)
 ) -> Dict[str, Any]:
@@ -403,10 +595,14 @@ async def trigger_scan(
     Dispara un escaneo manual de múltiples radicados.
 
     Este endpoint permite vigilar manualmente un conjunto de procesos
-    para detectar autos nuevos y enviar notificaciones.
+    para detectar autos nuevos y enviar notificaciones.  Los radicados
+    se consultan en paralelo con concurrencia acotada
+    (``fetch_many_procesos``); los resultados se devuelven en el orden
+    de entrada.
 
     Args:
         radicados: Lista de números de radicación a escanear
+        engine: Motor de clasificación (``rules``/``vector``)
 
     Returns:
         Resumen del escaneo con autos detectados
@@ -414,13 +610,23 @@ async def trigger_scan(
     results = []
     notifier = get_notifier()
 
-    for radicado in radicados:
+    async for radicado, normalized in fetch_many_procesos(radicados):
         try:
-            # Consultar proceso completo con API REAL
-            normalized = await fetch_proceso_completo_safe(radicado)
+            if isinstance(normalized, Exception):
+                raise normalized
+
+            if is_not_found(normalized):
+                results.append({
+                    "radicado": radicado,
+                    "ok": False,
+                    "not_found": True,
+                    "error": normalized["message"],
+                })
+                continue
+
             actuaciones = normalized.get("acts", [])
 
-            analyzed = batch_analyze(actuaciones)
+            analyzed = await batch_analyze_async(actuaciones, engine)
             autos_perentorios = [a for a in analyzed if a.get("auto_type") == "perentorio"]
 
             # Notificar autos perentorios
@@ -441,8 +647,12 @@ async def trigger_scan(
                 "error": str(exc),
             })
 
+    # Conservar el orden de entrada en la respuesta
+    orden = {radicado: i for i, radicado in enumerate(radicados)}
+    results.sort(key=lambda r: orden.get(r["radicado"], len(orden)))
+
     return {
         "ok": True,
         "total_escaneados": len(radicados),
         "resultados": results,
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,312 @@
+"""
+Representación compacta en memoria de procesos normalizados.
+
+``normalize_rama_response`` produce, por compatibilidad con Laravel,
+diccionarios con alias duplicados (``fecha``/``date``,
+``tipo``/``type``/``actuacion``, ``hash``/``uniq_key``...).  Con
+procesos de 500-2000 actuaciones eso multiplica la memoria del cache.
+
+Aquí cada actuación se guarda como un objeto con ``__slots__`` que
+almacena cada campo una sola vez; los textos muy repetidos (tipos de
+actuación, fechas) se internan para compartir una sola copia.  Los
+alias se reconstruyen únicamente al serializar (``to_dict``), de modo
+que la salida es idéntica a la del normalizador.
+
+``encode``/``decode`` convierten ``CompactCase`` a una forma JSON sin
+alias (listas de valores por actuación) para el cache persistente.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# Marca de la forma serializada de ``CompactCase`` en el cache persistente
+_COMPACT_MARKER = "__compact_case__"
+_COMPACT_VERSION = 1
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+def _pack_key(value: Any) -> Any:
+    """Guarda un hash SHA-256 hexadecimal como 32 bytes (en lugar de 64 caracteres)."""
+    if isinstance(value, str) and len(value) == 64:
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _unpack_key(value: Any) -> Any:
+    return value.hex() if isinstance(value, bytes) else value
+
+
+class CompactAct:
+    """Actuación normalizada sin alias (un slot por campo)."""
+
+    __slots__ = (
+        "fecha",
+        "tipo",
+        "anotacion",
+        "descripcion",
+        "documento_url",
+        "con_documentos",
+        "uniq_key",
+        "id_reg_actuacion",
+        "cons_actuacion",
+        "fecha_inicial",
+        "fecha_final",
+        "fecha_registro",
+        "cod_regla",
+        "extra",
+    )
+
+    # Claves de la salida de ``normalize_rama_response`` (en su orden)
+    # que se derivan de los slots anteriores
+    DICT_KEYS = (
+        "fecha", "date", "tipo", "type", "actuacion", "anotacion",
+        "descripcion", "title", "description", "documento_url",
+        "con_documentos", "origen", "uniq_key", "hash",
+        "id_reg_actuacion", "cons_actuacion", "fecha_inicial",
+        "fecha_final", "fecha_registro", "cod_regla",
+    )
+
+    def __init__(
+        self,
+        fecha: Optional[str],
+        tipo: Optional[str],
+        anotacion: Optional[str],
+        descripcion: Optional[str],
+        documento_url: Optional[str],
+        con_documentos: Any,
+        uniq_key: str,
+        id_reg_actuacion: Any = None,
+        cons_actuacion: Any = None,
+        fecha_inicial: Optional[str] = None,
+        fecha_final: Optional[str] = None,
+        fecha_registro: Optional[str] = None,
+        cod_regla: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.fecha = _intern(fecha)
+        self.tipo = _intern(tipo)
+        self.anotacion = anotacion
+        self.descripcion = descripcion
+        self.documento_url = documento_url
+        self.con_documentos = con_documentos
+        self.uniq_key = _pack_key(uniq_key)
+        self.id_reg_actuacion = id_reg_actuacion
+        self.cons_actuacion = cons_actuacion
+        self.fecha_inicial = _intern(fecha_inicial)
+        self.fecha_final = _intern(fecha_final)
+        self.fecha_registro = _intern(fecha_registro)
+        self.cod_regla = _intern(cod_regla)
+        # Claves fuera del esquema del normalizador (p. ej. análisis de autos)
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, act: Dict[str, Any]) -> "CompactAct":
+        """Construye la forma compacta a partir de una actuación normalizada."""
+        extra = {k: v for k, v in act.items() if k not in _ACT_KEYS}
+        return cls(
+            fecha=act.get("fecha"),
+            tipo=act.get("tipo"),
+            anotacion=act.get("anotacion"),
+            descripcion=act.get("descripcion"),
+            documento_url=act.get("documento_url"),
+            con_documentos=act.get("con_documentos", False),
+            uniq_key=act.get("uniq_key"),
+            id_reg_actuacion=act.get("id_reg_actuacion"),
+            cons_actuacion=act.get("cons_actuacion"),
+            fecha_inicial=act.get("fecha_inicial"),
+            fecha_final=act.get("fecha_final"),
+            fecha_registro=act.get("fecha_registro"),
+            cod_regla=act.get("cod_regla"),
+            extra=extra,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Expande la actuación al esquema de ``normalize_rama_response`` (con alias)."""
+        uniq_key = _unpack_key(self.uniq_key)
+        act = {
+            "fecha": self.fecha,
+            "date": self.fecha,  # Alias para Laravel
+            "tipo": self.tipo,
+            "type": self.tipo,  # Alias para Laravel
+            "actuacion": self.tipo,  # Nombre oficial Rama Judicial
+            "anotacion": self.anotacion,
+            "descripcion": self.descripcion,
+            "title": self.anotacion if self.anotacion else self.descripcion,
+            "description": self.descripcion,
+            "documento_url": self.documento_url,
+            "con_documentos": self.con_documentos,
+            "origen": "RAMA_API",
+            "uniq_key": uniq_key,
+            "hash": uniq_key,  # Alias para compatibilidad
+            "id_reg_actuacion": self.id_reg_actuacion,
+            "cons_actuacion": self.cons_actuacion,
+            "fecha_inicial": self.fecha_inicial,
+            "fecha_final": self.fecha_final,
+            "fecha_registro": self.fecha_registro,
+            "cod_regla": self.cod_regla,
+        }
+        if self.extra:
+            act.update(self.extra)
+        return act
+
+    def to_row(self) -> List[Any]:
+        """Valores de los slots en orden (forma serializable sin alias)."""
+        row = [getattr(self, slot) for slot in self.__slots__]
+        row[6] = _unpack_key(self.uniq_key)
+        return row
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "CompactAct":
+        """Inverso de ``to_row``."""
+        return cls(*row)
+
+
+_ACT_KEYS = frozenset(CompactAct.DICT_KEYS)
+
+
+class CompactCase:
+    """
+    Proceso normalizado (case, parties, acts) en forma compacta.
+
+    - ``case`` sin los alias ``court``/``despacho``/``status``/``id_proceso``
+    - ``parties`` como tuplas ``(rol, nombre, documento)``
+    - ``acts`` como lista de ``CompactAct``
+    - ``extra`` con claves adicionales del nivel superior (``partial``...)
+    """
+
+    __slots__ = ("case", "parties", "acts", "extra")
+
+    # Alias del bloque ``case``: alias -> campo canónico
+    CASE_ALIASES = {
+        "court": "juzgado",
+        "despacho": "juzgado",
+        "status": "estado_actual",
+        "id_proceso": "id_proceso_rama",
+    }
+
+    # Orden de claves de ``case`` en la salida del normalizador
+    CASE_KEYS = (
+        "radicado", "jurisdiccion", "juzgado", "court", "despacho", "status",
+        "estado_actual", "fuente", "id_proceso", "id_proceso_rama",
+        "fecha_radicacion", "fecha_ultima_actuacion", "es_privado", "ponente",
+        "clase_proceso", "subclase_proceso", "tipo_proceso",
+        "ubicacion_expediente", "recurso", "contenido_radicacion",
+    )
+
+    def __init__(
+        self,
+        case: Optional[Dict[str, Any]],
+        parties: List[Tuple[Optional[str], Optional[str], Optional[str]]],
+        acts: List[CompactAct],
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.case = case
+        self.parties = parties
+        self.acts = acts
+        self.extra = extra or None
+
+    @classmethod
+    def from_normalized(
+        cls,
+        normalized: Dict[str, Any],
+        reuse: Optional[Dict[int, CompactAct]] = None,
+    ) -> "CompactCase":
+        """Construye la forma compacta desde la salida de ``normalize_rama_response``.
+
+        Args:
+            normalized: Proceso normalizado
+            reuse: ``id(dict) -> CompactAct`` de actuaciones que ya vienen
+                de un ``CompactCase`` (ver ``act_dicts``); se reutilizan
+                en lugar de volver a compactarlas
+        """
+        case = normalized.get("case")
+        if case is not None:
+            case = {k: v for k, v in case.items() if k not in cls.CASE_ALIASES}
+        parties = [
+            (p.get("rol"), p.get("nombre"), p.get("documento"))
+            for p in normalized.get("parties") or []
+        ]
+        if reuse:
+            acts = [
+                reuse.get(id(a)) or CompactAct.from_dict(a)
+                for a in normalized.get("acts") or []
+            ]
+        else:
+            acts = [CompactAct.from_dict(a) for a in normalized.get("acts") or []]
+        extra = {k: v for k, v in normalized.items() if k not in ("case", "parties", "acts")}
+        return cls(case, parties, acts, extra)
+
+    def _case_dict(self) -> Optional[Dict[str, Any]]:
+        if self.case is None:
+            return None
+        case = {}
+        for key in self.CASE_KEYS:
+            source = self.CASE_ALIASES.get(key, key)
+            if source in self.case:
+                case[key] = self.case[source]
+        # Claves no previstas en el esquema se conservan al final
+        for key, value in self.case.items():
+            if key not in case:
+                case[key] = value
+        return case
+
+    def act_dicts(self) -> Tuple[List[Dict[str, Any]], Dict[int, CompactAct]]:
+        """Actuaciones expandidas y el mapa ``id(dict) -> CompactAct`` para
+        ``from_normalized(..., reuse=...)``."""
+        dicts = [act.to_dict() for act in self.acts]
+        return dicts, {id(d): act for d, act in zip(dicts, self.acts)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Expande al esquema completo con alias (idéntico al del normalizador)."""
+        result = {
+            "case": self._case_dict(),
+            "parties": [
+                {"rol": rol, "role": rol, "nombre": nombre, "name": nombre, "documento": documento}
+                for rol, nombre, documento in self.parties
+            ],
+            "acts": [act.to_dict() for act in self.acts],
+        }
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.acts)
+
+
+def encode(value: Any) -> Any:
+    """Convierte un valor del cache a forma JSON (``CompactCase`` sin alias)."""
+    if not isinstance(value, CompactCase):
+        return value
+    return {
+        _COMPACT_MARKER: _COMPACT_VERSION,
+        "case": value.case,
+        "parties": [list(p) for p in value.parties],
+        "acts": [act.to_row() for act in value.acts],
+        "extra": value.extra,
+    }
+
+
+def decode(value: Any) -> Any:
+    """Inverso de ``encode``; otros valores se devuelven sin cambios."""
+    if not isinstance(value, dict) or value.get(_COMPACT_MARKER) != _COMPACT_VERSION:
+        return value
+    return CompactCase(
+        value.get("case"),
+        [tuple(p) for p in value.get("parties") or []],
+        [CompactAct.from_row(row) for row in value.get("acts") or []],
+        value.get("extra"),
+    )
+
+
+def expand(value: Any) -> Any:
+    """Devuelve el diccionario completo de un ``CompactCase`` (otros valores igual)."""
+    return value.to_dict() if isinstance(value, CompactCase) else value
@@ -0,0 +1,163 @@
+"""
+Resolución declarativa de campos con alias para el normalizador.
+
+La API de la Rama Judicial (v1 y v2) y los scrapers entregan los mismos
+datos con nombres distintos (``fechaActuacion``/``Fecha``/``fecha``...).
+En lugar de encadenar ``a.get("X") or a.get("x") or ...`` para cada
+registro, cada campo canónico declara sus alias en orden de prioridad
+(``Field``) y un ``FieldResolver`` genera a partir de esa tabla, una
+sola vez, la función que extrae todos los campos de un registro.
+
+Para listas de registros (actuaciones, partes) el resolver toma las
+claves del primer registro, detecta la familia de alias y compila un
+extractor especializado que solo lee los alias presentes.  Los
+registros con exactamente las mismas claves usan ese extractor; el
+resto pasa por la resolución genérica.  Ambos caminos producen el mismo
+resultado que la cadena de ``or`` original.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import (
+    Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional,
+    Sequence, Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _text(val: Any) -> Optional[str]:
+    """Convierte el valor a texto, devolviendo ``None`` si está vacío."""
+    if val is None:
+        return None
+    s = str(val).strip()
+    return s if s else None
+
+
+class Field(NamedTuple):
+    """Campo canónico y sus alias en el payload, en orden de prioridad.
+
+    - ``text=True``: ``_text(a.get(alias1) or a.get(alias2) or ...)``
+    - ``text=False``: valor crudo ``a.get(alias, default)`` (un solo alias)
+    """
+    name: str
+    aliases: Tuple[str, ...]
+    text: bool = True
+    default: Any = None
+
+
+Extractor = Callable[[Dict[str, Any]], Tuple[Any, ...]]
+
+
+def _generic_expr(field: Field) -> str:
+    """Expresión equivalente a la cadena de ``or`` sobre todos los alias."""
+    if not field.text:
+        return f"a.get({field.aliases[0]!r}, {field.default!r})"
+    chain = " or ".join(f"a.get({alias!r})" for alias in field.aliases)
+    return f"_text({chain})"
+
+
+def _specialized_expr(field: Field, keys: FrozenSet[str]) -> str:
+    """Expresión para registros con exactamente las claves ``keys``.
+
+    Omite los alias ausentes y accede por índice a los presentes.  Si
+    el último alias declarado falta, la cadena termina en ``or None``
+    (igual que ``x or a.get(ausente)``), de modo que el resultado es
+    idéntico al de la expresión genérica.
+    """
+    if not field.text:
+        key = field.aliases[0]
+        return f"a[{key!r}]" if key in keys else repr(field.default)
+    present = [f"a[{alias!r}]" for alias in field.aliases if alias in keys]
+    if not present:
+        return "None"
+    if field.aliases[-1] not in keys:
+        present.append("None")
+    # ``_text`` en línea para el caso común (str); otros tipos pasan por la función
+    return f"((t.strip() or None) if (t := {' or '.join(present)}).__class__ is str else _text(t))"
+
+
+def _compile(exprs: Sequence[str]) -> Extractor:
+    """Compila una función ``a -> tupla`` a partir de las expresiones."""
+    source = "lambda a: (" + ", ".join(exprs) + ",)"
+    return eval(source, {"_text": _text})  # pylint: disable=eval-used
+
+
+class FieldResolver:
+    """
+    Extrae una tupla de campos canónicos de registros con alias.
+
+    - ``resolve(record)``: resolución genérica de un registro
+    - ``resolve_many(records)``: especializa según las claves del primero
+    - ``iter_many(records)``: igual, de forma perezosa (se puede cortar)
+    - Los extractores se generan una sola vez (una expresión por campo
+      compilada a función) y los especializados se guardan por conjunto
+      de claves (hasta ``max_compiled``) para reutilizarlos entre peticiones
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fields: Sequence[Field],
+        families: Optional[Dict[str, FrozenSet[str]]] = None,
+        max_compiled: int = 64,
+    ):
+        """
+        Args:
+            name: Nombre para logs (``actuaciones``, ``partes``...)
+            fields: Campos en el orden de la tupla resultante
+            families: Familias de alias conocidas: nombre -> claves que
+                la identifican
+            max_compiled: Máximo de extractores especializados guardados
+        """
+        self.name = name
+        self.fields = tuple(fields)
+        self.names = tuple(f.name for f in self.fields)
+        self.families = families or {}
+        self.max_compiled = max_compiled
+        self.resolve: Extractor = _compile([_generic_expr(f) for f in self.fields])
+        self._compiled: Dict[FrozenSet[str], Extractor] = {}
+
+    def detect_family(self, record: Dict[str, Any]) -> str:
+        """Nombre de la familia de alias del registro (``desconocida`` si ninguna)."""
+        for family, markers in self.families.items():
+            if markers <= record.keys():
+                return family
+        return "desconocida"
+
+    def specialize(self, record: Dict[str, Any]) -> Tuple[FrozenSet[str], Extractor]:
+        """Extractor especializado para las claves de ``record``."""
+        keys = frozenset(record)
+        extractor = self._compiled.get(keys)
+        if extractor is None:
+            extractor = _compile([_specialized_expr(f, keys) for f in self.fields])
+            if len(self._compiled) >= self.max_compiled:
+                self._compiled.pop(next(iter(self._compiled)))
+            self._compiled[keys] = extractor
+            logger.debug(
+                f"Resolver {self.name}: extractor compilado para familia "
+                f"{self.detect_family(record)}"
+            )
+        return keys, extractor
+
+    def resolve_many(self, records: Sequence[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+        """Resuelve una lista de registros (normalmente homogéneos)."""
+        if not records:
+            return []
+        keys, extract = self.specialize(records[0])
+        generic = self.resolve
+        return [
+            extract(record) if record.keys() == keys else generic(record)
+            for record in records
+        ]
+
+    def iter_many(self, records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Any, ...]]:
+        """Como ``resolve_many`` pero perezoso, para recorridos que se detienen antes."""
+        keys: Optional[FrozenSet[str]] = None
+        extract: Optional[Extractor] = None
+        generic = self.resolve
+        for record in records:
+            if extract is None:
+                keys, extract = self.specialize(record)
+            yield extract(record) if record.keys() == keys else generic(record)
@@ -9,27 +9,86 @@ los campos principales del proceso judicial y se genera una lista
 normalizada de partes y actuaciones.  Cada actuación incluye una
 clave única derivada de sus atributos para facilitar operaciones de
 ``upsert`` y evitar duplicados.
+
+En los refrescos se puede pasar la lista de actuaciones de la consulta
+anterior (``previous_acts``) para normalizar solo las nuevas.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import hashlib
+import itertools
+import logging
+import operator
+import re
 
+from .fields import Field, FieldResolver, _text
 
-def _text(val: Any) -> Optional[str]:
-    """Convierte el valor a texto, devolviendo ``None`` si está vacío.
+logger = logging.getLogger(__name__)
 
-    Args:
-        val: Valor a convertir.
+# Campos del proceso: campo canónico -> alias en orden de prioridad
+CASE_FIELDS = (
+    Field("radicado", ("Radicado", "numeroRadicacion", "llaveProceso")),
+    Field("jurisdiccion", ("Jurisdiccion", "jurisdiccion", "departamento")),
+    Field("juzgado", ("Despacho", "juzgado", "despacho")),
+    Field("estado_actual", ("Estado", "estadoActual")),
+    Field("id_proceso_rama", ("idProceso",), text=False),
+    Field("fecha_radicacion", ("fechaProceso",)),
+    Field("fecha_ultima_actuacion", ("fechaUltimaActuacion",)),
+    Field("es_privado", ("esPrivado",), text=False, default=False),
+    Field("ponente", ("ponente",)),
+    Field("clase_proceso", ("clase",)),
+    Field("subclase_proceso", ("subClase",)),
+    Field("tipo_proceso", ("tipoProceso", "tipoProcesoRadicacion")),
+    Field("ubicacion_expediente", ("ubicacion",)),
+    Field("recurso", ("recurso",)),
+    Field("contenido_radicacion", ("contenidoRadicacion",)),
+)
 
-    Returns:
-        Cadena de texto limpia o ``None``.
-    """
-    if val is None:
-        return None
-    s = str(val).strip()
-    return s if s else None
+# Partes en formato lista
+PARTY_FIELDS = (
+    Field("rol", ("Rol", "rol")),
+    Field("nombre", ("Nombre", "nombre")),
+    Field("documento", ("Documento", "documento")),
+)
+
+# Actuaciones: API v2 usa fechaActuacion, actuacion, anotacion; la API
+# v1/legacy y los scrapers usan Fecha/Tipo o fecha/tipo/descripcion
+ACT_FIELDS = (
+    Field("fecha", ("fechaActuacion", "Fecha", "fecha")),
+    Field("tipo", ("actuacion", "Tipo", "tipo")),
+    Field("anotacion", ("anotacion", "Anotacion")),
+    Field("descripcion", ("Observacion", "observacion", "Descripcion", "descripcion")),
+    Field("con_documentos", ("conDocumentos",), text=False, default=False),
+    Field("documento_url", ("DocumentoURL", "documentoUrl", "documento_url")),
+    Field("id_reg_actuacion", ("idRegActuacion",), text=False),
+    Field("cons_actuacion", ("consActuacion",), text=False),
+    Field("fecha_inicial", ("fechaInicial",)),
+    Field("fecha_final", ("fechaFinal",)),  # CRÍTICO para alertas de plazos
+    Field("fecha_registro", ("fechaRegistro",)),
+    Field("cod_regla", ("codRegla",)),
+)
+
+# Familias de alias de actuaciones: claves que identifican cada origen
+ACT_FAMILIES = {
+    "api_v2": frozenset({"fechaActuacion", "actuacion"}),
+    "api_v1": frozenset({"Fecha", "Tipo"}),
+    "playwright": frozenset({"fecha", "actuacion"}),
+    "scraper": frozenset({"fecha", "tipo"}),
+}
+
+_case_resolver = FieldResolver("proceso", CASE_FIELDS)
+_party_resolver = FieldResolver("partes", PARTY_FIELDS)
+_act_resolver = FieldResolver("actuaciones", ACT_FIELDS, families=ACT_FAMILIES)
+
+# Posiciones en la tupla de campos resueltos de una actuación
+_ACT_FECHA = _act_resolver.names.index("fecha")
+_ACT_CONS = _act_resolver.names.index("cons_actuacion")
+# Campos resueltos de una actuación ya normalizada, en el orden del resolver
+_act_values = operator.itemgetter(*_act_resolver.names)
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
 
 
 def _hash(*parts: Optional[str]) -> str:
@@ -50,7 +109,156 @@ def _hash(*parts: Optional[str]) -> str:
     return hashlib.sha256(buf.encode("utf-8")).hexdigest()
 
 
-def normalize_rama_response(raw: Dict[str, Any], actuaciones_raw: Dict[str, Any] = None) -> Dict[str, Any]:
+def _act_dict(
+    fecha: Optional[str],
+    tipo: Optional[str],
+    anotacion: Optional[str],
+    descripcion: Optional[str],
+    con_documentos: Any,
+    doc_url: Optional[str],
+    id_reg_actuacion: Any,
+    cons_actuacion: Any,
+    fecha_inicial: Optional[str],
+    fecha_final: Optional[str],
+    fecha_registro: Optional[str],
+    cod_regla: Optional[str],
+) -> Dict[str, Any]:
+    """Construye una actuación normalizada a partir de sus campos resueltos."""
+    # Crear título combinado para visualización
+    title = anotacion if anotacion else descripcion
+
+    # Igual que _hash(fecha, tipo, title), sin la llamada adicional
+    uniq_key = hashlib.sha256(
+        f"{fecha or ''}|{tipo or ''}|{title or ''}".encode("utf-8")
+    ).hexdigest()
+    return {
+        "fecha": fecha,
+        "date": fecha,  # Alias para Laravel
+        "tipo": tipo,
+        "type": tipo,  # Alias para Laravel
+        "actuacion": tipo,  # Nombre oficial Rama Judicial
+        "anotacion": anotacion,  # Campo oficial Rama Judicial
+        "descripcion": descripcion,
+        "title": title,  # Alias para Laravel
+        "description": descripcion,  # Alias adicional
+        "documento_url": doc_url,
+        "con_documentos": con_documentos,
+        "origen": "RAMA_API",
+        "uniq_key": uniq_key,
+        "hash": uniq_key,  # Alias para compatibilidad
+        # Campos adicionales de Rama Judicial
+        "id_reg_actuacion": id_reg_actuacion,
+        "cons_actuacion": cons_actuacion,
+        "fecha_inicial": fecha_inicial,
+        "fecha_final": fecha_final,
+        "fecha_registro": fecha_registro,
+        "cod_regla": cod_regla,
+    }
+
+
+def _newest_first(first: Tuple[Any, ...], last: Tuple[Any, ...]) -> bool:
+    """Indica si la lista va de la actuación más reciente a la más antigua.
+
+    Compara ``consActuacion`` (consecutivo del proceso) o, si no está,
+    fechas ISO del primer y último registro.  Sin datos suficientes se
+    asume el orden de la API (más reciente primero).
+    """
+    cons_first, cons_last = first[_ACT_CONS], last[_ACT_CONS]
+    if isinstance(cons_first, int) and isinstance(cons_last, int) and cons_first != cons_last:
+        return cons_first > cons_last
+    fecha_first, fecha_last = first[_ACT_FECHA], last[_ACT_FECHA]
+    if fecha_first and fecha_last and _ISO_DATE.match(fecha_first) and _ISO_DATE.match(fecha_last):
+        return fecha_first >= fecha_last
+    return True
+
+
+def _normalize_acts_incremental(
+    acts_raw: List[Dict[str, Any]], previous_acts: Sequence[Dict[str, Any]]
+) -> Optional[List[Dict[str, Any]]]:
+    """Normaliza solo las actuaciones nuevas y reutiliza la cola conocida.
+
+    Recorre la lista de la más reciente a la más antigua y se detiene en
+    la primera actuación que ya estaba en ``previous_acts`` (por
+    ``cons_actuacion`` si existe, si no por ``uniq_key``).  Desde ahí se
+    reutilizan las actuaciones anteriores tal cual, tras comprobar que
+    los campos resueltos de cada una coinciden con los de la anterior
+    (``uniq_key`` no cubre campos que la Rama corrige después, como
+    ``fechaFinal``, ``conDocumentos`` o la URL del documento).  La
+    comprobación solo resuelve los campos: se ahorra construir el
+    diccionario y el hash de las reutilizadas.
+
+    Returns:
+        La lista completa de actuaciones, o ``None`` si la lista previa no
+        encaja con la actual (actuación conocida con otro contenido,
+        actuaciones eliminadas o insertadas en medio) y hay que
+        normalizar todo.
+    """
+    newest_first = _newest_first(
+        _act_resolver.resolve(acts_raw[0]), _act_resolver.resolve(acts_raw[-1])
+    )
+    positions = range(len(previous_acts))
+    if not newest_first:
+        positions = reversed(positions)
+
+    # Posición de cada actuación conocida (la más reciente si se repite)
+    by_cons: Dict[Any, int] = {}
+    by_key: Dict[Any, int] = {}
+    for pos in positions:
+        previous = previous_acts[pos]
+        cons = previous.get("cons_actuacion")
+        if cons is not None:
+            by_cons.setdefault(cons, pos)
+        by_key.setdefault(previous.get("uniq_key"), pos)
+
+    new_acts: List[Dict[str, Any]] = []
+    anchor = None
+    records = acts_raw if newest_first else reversed(acts_raw)
+    resolved = _act_resolver.iter_many(records)
+    for fields in resolved:
+        act = _act_dict(*fields)
+        cons = fields[_ACT_CONS]
+        pos = by_cons.get(cons) if cons is not None else by_key.get(act["uniq_key"])
+        if pos is None:
+            new_acts.append(act)
+            continue
+        anchor = pos
+        break
+
+    if anchor is None:
+        # Ninguna actuación conocida: la lista completa ya está normalizada
+        return new_acts if newest_first else new_acts[::-1]
+
+    if newest_first:
+        reused = previous_acts[anchor:]
+    else:
+        reused = previous_acts[anchor::-1]
+    if len(new_acts) + len(reused) != len(acts_raw):
+        return None
+    # La ancla y el resto de la cola (en el mismo orden del recorrido)
+    # deben tener exactamente los mismos campos que en la consulta anterior
+    for previous, current in zip(reused, itertools.chain((fields,), resolved)):
+        try:
+            if _act_values(previous) != current:
+                return None
+        except KeyError:
+            return None
+
+    if newest_first:
+        acts = new_acts + list(reused)
+    else:
+        acts = list(previous_acts[:anchor + 1]) + new_acts[::-1]
+    logger.debug(
+        f"Normalización incremental: {len(new_acts)} actuaciones nuevas, "
+        f"{len(acts) - len(new_acts)} reutilizadas"
+    )
+    return acts
+
+
+def normalize_rama_response(
+    raw: Dict[str, Any],
+    actuaciones_raw: Dict[str, Any] = None,
+    previous_acts: Optional[Sequence[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
     """Normaliza el JSON de la Rama Judicial a un esquema interno.
 
     Este helper transforma la estructura de datos devuelta por la API
@@ -69,6 +277,12 @@ def normalize_rama_response(raw: Dict[str, Any], actuaciones_raw: Dict[str, Any]
     Args:
         raw: Diccionario tal y como se recibió de la API oficial.
         actuaciones_raw: Diccionario opcional con las actuaciones del proceso.
+        previous_acts: Actuaciones normalizadas de la consulta anterior del
+            mismo proceso (modo incremental).  Solo se normalizan las
+            actuaciones más recientes que la primera ya conocida; el resto
+            se toma de esta lista sin copiarlo.  Si la lista previa no
+            encaja con la actual se normaliza todo, de modo que el
+            resultado es el mismo que sin ``previous_acts``.
 
     Returns:
         Diccionario con las claves ``case``, ``parties`` y ``acts``.
@@ -82,38 +296,12 @@ def normalize_rama_response(raw: Dict[str, Any], actuaciones_raw: Dict[str, Any]
         detalle = raw or {}
 
     # Extraer campos principales del proceso (radicado, jurisdicción, etc.)
-    radicado = _text(
-        detalle.get("Radicado")
-        or detalle.get("numeroRadicacion")
-        or detalle.get("llaveProceso")
-    )
-    jurisdiccion = _text(
-        detalle.get("Jurisdiccion")
-        or detalle.get("jurisdiccion")
-        or detalle.get("departamento")
-    )
-    juzgado = _text(
-        detalle.get("Despacho")
-        or detalle.get("juzgado")
-        or detalle.get("despacho")
-    )
-    estado_actual = _text(
-        detalle.get("Estado")
-        or detalle.get("estadoActual")
-    )
-
-    # Campos adicionales de Rama Judicial
-    id_proceso_rama = detalle.get("idProceso")
-    fecha_radicacion = _text(detalle.get("fechaProceso"))
-    fecha_ultima_actuacion = _text(detalle.get("fechaUltimaActuacion"))
-    es_privado = detalle.get("esPrivado", False)
-    ponente = _text(detalle.get("ponente"))
-    clase_proceso = _text(detalle.get("clase"))
-    subclase_proceso = _text(detalle.get("subClase"))
-    tipo_proceso = _text(detalle.get("tipoProceso") or detalle.get("tipoProcesoRadicacion"))
-    ubicacion_expediente = _text(detalle.get("ubicacion"))
-    recurso = _text(detalle.get("recurso"))
-    contenido_radicacion = _text(detalle.get("contenidoRadicacion"))
+    (
+        radicado, jurisdiccion, juzgado, estado_actual, id_proceso_rama,
+        fecha_radicacion, fecha_ultima_actuacion, es_privado, ponente,
+        clase_proceso, subclase_proceso, tipo_proceso, ubicacion_expediente,
+        recurso, contenido_radicacion,
+    ) = _case_resolver.resolve(detalle)
 
     case: Dict[str, Any] = {
         "radicado": radicado,
@@ -145,10 +333,7 @@ def normalize_rama_response(raw: Dict[str, Any], actuaciones_raw: Dict[str, Any]
 
     # Si viene en formato lista
     if isinstance(partes_raw, list) and len(partes_raw) > 0:
-        for p in partes_raw:
-            rol = _text(p.get("Rol") or p.get("rol"))
-            nombre = _text(p.get("Nombre") or p.get("nombre"))
-            documento = _text(p.get("Documento") or p.get("documento"))
+        for rol, nombre, documento in _party_resolver.resolve_many(partes_raw):
             parties.append({
                 "rol": rol,
                 "role": rol,  # Alias para Laravel
@@ -186,70 +371,15 @@ def normalize_rama_response(raw: Dict[str, Any], actuaciones_raw: Dict[str, Any]
         acts_raw = detalle.get("Actuaciones") or detalle.get("actuaciones") or []
 
     if isinstance(acts_raw, list):
-        for a in acts_raw:
-            # API v2 usa fechaActuacion, actuacion, anotacion
-            fecha = _text(
-                a.get("fechaActuacion") or
-                a.get("Fecha") or
-                a.get("fecha")
-            )
-            tipo = _text(
-                a.get("actuacion") or
-                a.get("Tipo") or
-                a.get("tipo")
-            )
-            # Separar anotación y descripción según estándar Rama Judicial
-            anotacion = _text(
-                a.get("anotacion") or
-                a.get("Anotacion")
-            )
-            # Descripción adicional de observación
-            descripcion = _text(
-                a.get("Observacion") or
-                a.get("observacion") or
-                a.get("Descripcion") or
-                a.get("descripcion")
-            )
-
-            # Verificar si tiene documentos
-            con_documentos = a.get("conDocumentos", False)
-            doc_url = _text(a.get("DocumentoURL") or a.get("documentoUrl") or a.get("documento_url"))
-
-            # Campos adicionales de Rama Judicial (plazos e identificadores)
-            id_reg_actuacion = a.get("idRegActuacion")
-            cons_actuacion = a.get("consActuacion")
-            fecha_inicial = _text(a.get("fechaInicial"))
-            fecha_final = _text(a.get("fechaFinal"))  # CRÍTICO para alertas de plazos
-            fecha_registro = _text(a.get("fechaRegistro"))
-            cod_regla = _text(a.get("codRegla"))
-
-            # Crear título combinado para visualización
-            title = anotacion if anotacion else descripcion
-
-            uniq_key = _hash(fecha, tipo, anotacion or descripcion)
-            acts.append({
-                "fecha": fecha,
-                "date": fecha,  # Alias para Laravel
-                "tipo": tipo,
-                "type": tipo,  # Alias para Laravel
-                "actuacion": tipo,  # Nombre oficial Rama Judicial
-                "anotacion": anotacion,  # Campo oficial Rama Judicial
-                "descripcion": descripcion,
-                "title": title,  # Alias para Laravel
-                "description": descripcion,  # Alias adicional
-                "documento_url": doc_url,
-                "con_documentos": con_documentos,
-                "origen": "RAMA_API",
-                "uniq_key": uniq_key,
-                "hash": uniq_key,  # Alias para compatibilidad
-                # Campos adicionales de Rama Judicial
-                "id_reg_actuacion": id_reg_actuacion,
-                "cons_actuacion": cons_actuacion,
-                "fecha_inicial": fecha_inicial,
-                "fecha_final": fecha_final,
-                "fecha_registro": fecha_registro,
-                "cod_regla": cod_regla,
-            })
+        merged = None
+        if previous_acts and acts_raw:
+            merged = _normalize_acts_incremental(acts_raw, previous_acts)
+        if merged is not None:
+            acts = merged
+        else:
+            # El extractor se especializa según las claves de la primera
+            # actuación (familia de alias) y se aplica al resto
+            acts = [_act_dict(*fields) for fields in _act_resolver.resolve_many(acts_raw)]
 
     return {
         "case": case,
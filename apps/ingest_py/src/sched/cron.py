@@ -12,9 +12,9 @@ from typing import List, Dict, Any
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from ..clients.rama_client import fetch_proceso_completo_safe
+from ..clients.rama_client import fetch_many_procesos, is_not_found
 from ..storage.dao import upsert_case_snapshot
-from ..analyzers.auto_classifier import analyze_actuacion
+from ..analyzers.auto_classifier import batch_analyze_async
 from ..notifications.notifier import get_notifier
 
 logger = logging.getLogger(__name__)
@@ -30,23 +30,31 @@ async def scan_all_active_cases() -> None:
     2. Descarga actuaciones nuevas
     3. Detecta y clasifica AUTOS (perentorio vs trámite)
     4. Envía notificaciones cuando encuentra autos perentorios
+
+    Los radicados se consultan en paralelo con ``fetch_many_procesos``
+    (concurrencia acotada y presupuesto de peticiones al host).
     """
     # TODO: obtener radicados de la base de datos
     radicados: List[str] = ["11001310300020230012300", "11001310300020230012301"]
 
     notifier = get_notifier()
 
-    for radicado in radicados:
+    logger.info(f"Vigilando {len(radicados)} radicados")
+
+    async for radicado, normalized in fetch_many_procesos(radicados):
         try:
-            logger.info(f"Vigilando radicado: {radicado}")
+            if isinstance(normalized, Exception):
+                raise normalized
+
+            if is_not_found(normalized):
+                logger.warning(f"Radicado {radicado} no encontrado en la Rama Judicial, se omite")
+                continue
 
-            # Consultar proceso completo con API REAL
-            normalized = await fetch_proceso_completo_safe(radicado)
             actuaciones = normalized.get("acts", [])
 
-            # Analizar cada actuación para detectar autos
-            for actuacion in actuaciones:
-                analyzed = analyze_actuacion(actuacion)
+            # Analizar cada actuación para detectar autos (lotes grandes
+            # en el pool de procesos, sin bloquear el event loop)
+            for analyzed in await batch_analyze_async(actuaciones):
 
                 # Si es un auto, procesar según tipo
                 if analyzed.get("is_auto"):
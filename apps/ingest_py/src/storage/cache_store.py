@@ -0,0 +1,290 @@
+"""
+Almacenamiento persistente (segundo nivel) para el cache de procesos.
+
+``SQLiteCacheStore`` guarda en un archivo SQLite las mismas entradas que
+el cache en memoria (``SimpleCache``) para que sobrevivan a reinicios y
+despliegues.  Las escrituras se encolan y las realiza un hilo dedicado,
+de modo que ``set`` nunca bloquea el event loop con E/S de disco.  Las
+lecturas puntuales (fallo del cache en memoria) son consultas por clave
+primaria sobre una conexión propia en modo WAL.
+
+El hilo escritor y las conexiones son de cada proceso: se crean con la
+primera operación y se vuelven a crear tras un ``fork`` (workers de
+gunicorn que importan la aplicación antes de bifurcarse).
+
+La compactación elimina las entradas expiradas y ejecuta ``VACUUM``
+cuando las páginas libres superan una fracción del archivo, para que
+éste no crezca indefinidamente.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_timestamp ON cache (timestamp);
+"""
+
+# Operaciones que procesa el hilo escritor
+_PUT = "put"
+_DELETE = "delete"
+_CLEAR = "clear"
+_COMPACT = "compact"
+_STOP = "stop"
+
+
+class SQLiteCacheStore:
+    """
+    Cache persistente en SQLite con escrituras asíncronas.
+
+    - ``put``/``delete`` se encolan y las aplica un hilo escritor
+    - ``get`` lee directamente por clave
+    - ``load_all`` devuelve las entradas vigentes para precargar memoria
+    - ``compact`` elimina expiradas y recupera espacio en disco
+    """
+
+    def __init__(self, path: str, vacuum_ratio: float = 0.25):
+        """
+        Args:
+            path: Ruta del archivo SQLite (se crea el directorio si no existe)
+            vacuum_ratio: Fracción de páginas libres a partir de la cual
+                ``compact`` ejecuta ``VACUUM``
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.vacuum_ratio = vacuum_ratio
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.close()
+        self._pid: Optional[int] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self.reads = 0
+        self.read_hits = 0
+        self.writes = 0
+        self.write_errors = 0
+        self.compactions = 0
+        self.last_compaction_removed = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre una conexión en modo WAL (lectores y escritor concurrentes)."""
+        conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _check_process(self):
+        """Descarta el estado heredado de otro proceso (tras un ``fork``)."""
+        if self._pid != os.getpid():
+            # Las conexiones, colas y cerrojos copiados del padre no son
+            # utilizables y su hilo escritor no existe en el hijo
+            self._pid = os.getpid()
+            self._read_conn = None
+            self._read_lock = threading.Lock()
+            self._queue = queue.Queue()
+            self._writer = None
+            self._start_lock = threading.Lock()
+
+    def _reader(self) -> sqlite3.Connection:
+        """Conexión de lectura (se abre al primer uso; llamar con ``_read_lock``)."""
+        if self._read_conn is None:
+            self._read_conn = self._connect()
+        return self._read_conn
+
+    def _enqueue(self, op: str, arg: Any):
+        """Encola una operación, arrancando el hilo escritor si hace falta."""
+        self._check_process()
+        if self._writer is None:
+            with self._start_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._writer_loop, name="rama-cache-writer", daemon=True
+                    )
+                    self._writer.start()
+        self._queue.put((op, arg))
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def put(self, key: str, data: Dict[str, Any], timestamp: float):
+        """Encola la escritura de una entrada."""
+        self._enqueue(_PUT, (key, data, timestamp))
+
+    def delete(self, key: str):
+        """Encola el borrado de una entrada."""
+        self._enqueue(_DELETE, key)
+
+    def clear(self):
+        """Encola el borrado de todas las entradas."""
+        self._enqueue(_CLEAR, None)
+
+    def compact(self, ttl: float):
+        """Encola una compactación (borrado de expiradas + VACUUM si conviene)."""
+        self._enqueue(_COMPACT, ttl)
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Lee una entrada del disco.
+
+        Returns:
+            Tupla ``(data, timestamp)`` o ``None`` si no existe.
+        """
+        self.reads += 1
+        self._check_process()
+        try:
+            with self._read_lock:
+                row = self._reader().execute(
+                    "SELECT data, timestamp FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.error(f"Cache persistente: error leyendo {key}: {exc}")
+            return None
+        if not row:
+            return None
+        self.read_hits += 1
+        return json.loads(row[0]), row[1]
+
+    def load_all(self, ttl: float, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Devuelve las entradas vigentes, de la más antigua a la más reciente.
+
+        Pensado para ejecutarse en un hilo (``asyncio.to_thread``) al
+        arrancar, ya que decodifica todo el JSON almacenado.
+
+        Args:
+            ttl: Tiempo de vida; se omiten las entradas más viejas
+            limit: Máximo de entradas (las más recientes)
+        """
+        min_ts = time.time() - ttl
+        sql = "SELECT key, data, timestamp FROM cache WHERE timestamp >= ? ORDER BY timestamp DESC"
+        params: Tuple[Any, ...] = (min_ts,)
+        if limit:
+            sql += " LIMIT ?"
+            params = (min_ts, limit)
+        self._check_process()
+        with self._read_lock:
+            rows = self._reader().execute(sql, params).fetchall()
+        return [(key, json.loads(data), ts) for key, data, ts in reversed(rows)]
+
+    def flush(self, timeout: float = 5.0):
+        """Espera a que se apliquen las escrituras pendientes."""
+        self._check_process()
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._queue.put((_STOP, done))
+        done.wait(timeout)
+
+    def close(self):
+        """Aplica lo pendiente y detiene el hilo escritor."""
+        self._check_process()
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put((_STOP, None))
+            self._writer.join(timeout=10)
+        self._writer = None
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Serializa el estado del almacenamiento para ``/metrics``."""
+        try:
+            file_bytes = self.path.stat().st_size
+        except OSError:
+            file_bytes = 0
+        return {
+            "path": str(self.path),
+            "file_bytes": file_bytes,
+            "pending_writes": self._queue.qsize(),
+            "writes": self.writes,
+            "write_errors": self.write_errors,
+            "reads": self.reads,
+            "read_hits": self.read_hits,
+            "compactions": self.compactions,
+            "last_compaction_removed": self.last_compaction_removed,
+        }
+
+    # ------------------------------------------------------------------
+    # Hilo escritor
+    # ------------------------------------------------------------------
+
+    def _writer_loop(self):
+        conn = self._connect()
+        while True:
+            op, arg = self._queue.get()
+            if op == _STOP:
+                # Un STOP con Event es solo un flush: se señala y se sigue
+                if isinstance(arg, threading.Event):
+                    arg.set()
+                    continue
+                break
+            try:
+                self._apply(conn, op, arg)
+                # Agrupar en una transacción lo que ya esté encolado
+                while op != _COMPACT:
+                    try:
+                        op, arg = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if op == _STOP:
+                        self._queue.put((op, arg))
+                        break
+                    self._apply(conn, op, arg)
+                conn.commit()
+            except sqlite3.Error as exc:
+                self.write_errors += 1
+                logger.error(f"Cache persistente: error escribiendo: {exc}")
+                conn.rollback()
+        conn.commit()
+        conn.close()
+
+    def _apply(self, conn: sqlite3.Connection, op: str, arg: Any):
+        if op == _PUT:
+            key, data, timestamp = arg
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, data, timestamp) VALUES (?, ?, ?)",
+                (key, json.dumps(data, default=str), timestamp),
+            )
+            self.writes += 1
+        elif op == _DELETE:
+            conn.execute("DELETE FROM cache WHERE key = ?", (arg,))
+        elif op == _CLEAR:
+            conn.execute("DELETE FROM cache")
+        elif op == _COMPACT:
+            self._compact(conn, arg)
+
+    def _compact(self, conn: sqlite3.Connection, ttl: float):
+        cur = conn.execute("DELETE FROM cache WHERE timestamp < ?", (time.time() - ttl,))
+        removed = cur.rowcount
+        conn.commit()
+
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if page_count and free_pages / page_count >= self.vacuum_ratio:
+            conn.execute("VACUUM")
+            logger.info(f"Cache persistente: VACUUM ({free_pages}/{page_count} páginas libres)")
+
+        self.compactions += 1
+        self.last_compaction_removed = removed
+        if removed:
+            logger.info(f"Cache persistente: compactación eliminó {removed} entradas expiradas")
@@ -0,0 +1,380 @@
+"""
+Almacén direccionado por contenido de documentos y texto extraído.
+
+Los PDF de los autos se consultan una y otra vez con la misma
+``documento_url``; descargarlos y volver a extraer su texto (o pasarles
+OCR, que tarda minutos) en cada llamada es trabajo repetido.
+``DocumentStore`` guarda en disco:
+
+- ``urls``: URL -> SHA-256 del contenido descargado
+- ``blobs``: SHA-256 -> bytes del documento, en
+  ``<directorio>/objects/<2 primeros>/<sha256>``; dos URLs con el mismo
+  contenido comparten archivo
+- ``texts``: (SHA-256, versión del extractor) -> texto extraído y método
+  (texto del PDF u OCR); al cambiar la versión el texto se vuelve a
+  extraer del documento guardado sin descargarlo
+
+El índice es un archivo SQLite (modo WAL) en el mismo directorio.  El
+espacio total (bytes de documentos más bytes de texto) se limita con
+desalojo LRU: se eliminan primero los documentos, con su texto y sus
+URLs, cuyo último acceso es más antiguo.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    text_bytes INTEGER NOT NULL DEFAULT 0,
+    content_type TEXT,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS urls_sha256 ON urls (sha256);
+CREATE TABLE IF NOT EXISTS texts (
+    sha256 TEXT NOT NULL,
+    version TEXT NOT NULL,
+    method TEXT NOT NULL,
+    text TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (sha256, version)
+);
+"""
+
+
+@dataclass
+class StoredDocument:
+    """Documento encontrado en el almacén para una URL.
+
+    ``text`` y ``method`` son None si no hay texto extraído con la
+    versión pedida; ``path`` sigue sirviendo para extraerlo sin descargar.
+    """
+    url: str
+    sha256: str
+    path: Path
+    size: int
+    content_type: Optional[str] = None
+    text: Optional[str] = None
+    method: Optional[str] = None
+
+
+class DocumentStore:
+    """
+    Almacén de documentos y texto extraído con límite de bytes en disco.
+
+    - ``lookup`` resuelve una URL a su documento guardado y, si existe,
+      al texto extraído con la versión pedida
+    - ``put`` mueve al almacén un archivo recién descargado
+    - ``put_text`` guarda el texto extraído de un documento
+    - ``stats`` reporta tasas de acierto y bytes/segundos ahorrados
+
+    Las operaciones son consultas cortas sobre el índice local,
+    protegidas por un lock; el índice se comparte entre workers, así que
+    los llamadores async las ejecutan en un hilo (``asyncio.to_thread``).
+    Si otro proceso retiene el bloqueo de escritura más de
+    ``busy_timeout`` segundos, ``put`` y ``put_text`` lanzan
+    ``sqlite3.Error`` sin haber movido ni borrado archivos, y ``lookup``
+    responde sin actualizar el último acceso.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_bytes: int = 0,
+        url_ttl: float = 0,
+        busy_timeout: float = 0.5,
+    ):
+        """
+        Args:
+            directory: Directorio del almacén (se crea si no existe)
+            max_bytes: Bytes máximos de documentos + texto (0 sin límite)
+            url_ttl: Segundos durante los que una URL se resuelve al
+                contenido ya descargado (0 sin vencimiento)
+            busy_timeout: Segundos máximos de espera del bloqueo de SQLite
+                en las operaciones (la creación del esquema espera más)
+        """
+        self.directory = Path(directory)
+        self.objects = self.directory / "objects"
+        self.staging = self.directory / "tmp"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.staging.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.url_ttl = url_ttl
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.directory / "index.sqlite3"), timeout=30, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        row = self._conn.execute("SELECT COUNT(*), SUM(size + text_bytes) FROM blobs").fetchone()
+        self._entries = row[0]
+        self._total_bytes = row[1] or 0
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+
+        self.lookups = 0
+        self.url_hits = 0
+        self.text_hits = 0
+        self.bytes_saved = 0
+        self.extraction_seconds_saved = 0.0
+        self.stored = 0
+        self.deduplicated = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.objects / sha256[:2] / sha256
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def lookup(self, url: str, version: str) -> Optional[StoredDocument]:
+        """Busca el documento descargado de ``url`` y su texto extraído.
+
+        Un acierto de URL evita la descarga (suma el tamaño del documento
+        a ``bytes_saved``); un acierto de texto evita además la
+        extracción.
+
+        Args:
+            url: URL del documento
+            version: Versión del extractor con la que debe estar el texto
+
+        Returns:
+            ``StoredDocument`` o None si la URL no está (o venció)
+        """
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            row = self._conn.execute(
+                "SELECT u.sha256, u.fetched_at, b.size, b.content_type "
+                "FROM urls u JOIN blobs b ON b.sha256 = u.sha256 WHERE u.url = ?",
+                (url,),
+            ).fetchone()
+            if not row:
+                return None
+            sha256, fetched_at, size, content_type = row
+            if self.url_ttl and now - fetched_at > self.url_ttl:
+                self._try_write(lambda: self._conn.execute("DELETE FROM urls WHERE url = ?", (url,)))
+                return None
+            path = self._blob_path(sha256)
+            if not path.exists():
+                logger.warning(f"Almacén de documentos: falta el archivo de {sha256[:12]}, se descarta")
+                self._try_write(lambda: self._remove(sha256))
+                return None
+
+            text_row = self._conn.execute(
+                "SELECT text, method, seconds FROM texts WHERE sha256 = ? AND version = ?",
+                (sha256, version),
+            ).fetchone()
+            self._try_write(lambda: self._conn.execute(
+                "UPDATE blobs SET last_access = ? WHERE sha256 = ?", (now, sha256)
+            ))
+
+            self.url_hits += 1
+            self.bytes_saved += size
+            document = StoredDocument(url, sha256, path, size, content_type)
+            if text_row:
+                self.text_hits += 1
+                self.extraction_seconds_saved += text_row[2]
+                document.text, document.method = text_row[0], text_row[1]
+            return document
+
+    def put(
+        self,
+        url: str,
+        path: Union[str, Path],
+        sha256: str,
+        content_type: Optional[str] = None,
+    ) -> Path:
+        """Mueve al almacén un documento descargado y asocia la URL.
+
+        Si el contenido ya estaba guardado (otra URL con el mismo
+        documento) el archivo descargado se borra y se reutiliza el
+        guardado.  El archivo se mueve o se borra solo después de que
+        las escrituras del índice obtuvieron el bloqueo: si lanza
+        ``sqlite3.Error`` el archivo sigue en ``path``.
+
+        Args:
+            url: URL de la que se descargó
+            path: Archivo descargado (se mueve o se borra)
+            sha256: SHA-256 del contenido
+            content_type: Content-Type de la respuesta
+
+        Returns:
+            Ruta del documento dentro del almacén
+        """
+        path = Path(path)
+        target = self._blob_path(sha256)
+        now = time.time()
+        with self._lock:
+            try:
+                exists = self._conn.execute(
+                    "SELECT 1 FROM blobs WHERE sha256 = ?", (sha256,)
+                ).fetchone()
+                duplicate = exists and target.exists()
+                if duplicate:
+                    self._conn.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (now, sha256))
+                else:
+                    if exists:
+                        self._remove(sha256)
+                    size = path.stat().st_size
+                    self._conn.execute(
+                        "INSERT INTO blobs (sha256, size, content_type, created_at, last_access) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (sha256, size, content_type, now, now),
+                    )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO urls (url, sha256, fetched_at) VALUES (?, ?, ?)",
+                    (url, sha256, now),
+                )
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+            if duplicate:
+                path.unlink(missing_ok=True)
+                self.deduplicated += 1
+            else:
+                target.parent.mkdir(exist_ok=True)
+                os.replace(path, target)
+                self._entries += 1
+                self._total_bytes += size
+                self.stored += 1
+            self._evict(keep=sha256)
+            self._conn.commit()
+        return target
+
+    def put_text(self, sha256: str, version: str, method: str, text: str, seconds: float):
+        """Guarda el texto extraído de un documento del almacén.
+
+        Args:
+            sha256: SHA-256 del documento
+            version: Versión del extractor
+            method: Método de extracción (p. ej. ``pdf`` u ``ocr``)
+            text: Texto extraído
+            seconds: Duración de la extracción (para ``extraction_seconds_saved``)
+        """
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            if not self._conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha256,)).fetchone():
+                return  # desalojado mientras se extraía
+            old = self._conn.execute(
+                "SELECT LENGTH(CAST(text AS BLOB)) FROM texts WHERE sha256 = ? AND version = ?",
+                (sha256, version),
+            ).fetchone()
+            delta = size - (old[0] if old else 0)
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO texts (sha256, version, method, text, seconds, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (sha256, version, method, text, seconds, time.time()),
+                )
+                self._conn.execute(
+                    "UPDATE blobs SET text_bytes = text_bytes + ? WHERE sha256 = ?", (delta, sha256)
+                )
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+            self._total_bytes += delta
+            self._evict(keep=sha256)
+            self._conn.commit()
+
+    def clear(self):
+        """Elimina todos los documentos y textos."""
+        with self._lock:
+            for (sha256,) in self._conn.execute("SELECT sha256 FROM blobs").fetchall():
+                self._blob_path(sha256).unlink(missing_ok=True)
+            self._conn.execute("DELETE FROM texts")
+            self._conn.execute("DELETE FROM urls")
+            self._conn.execute("DELETE FROM blobs")
+            self._conn.commit()
+            self._entries = 0
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Serializa el estado del almacén para ``/metrics``."""
+        lookups = self.lookups
+        return {
+            "directory": str(self.directory),
+            "entries": self._entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "lookups": lookups,
+            "url_hits": self.url_hits,
+            "text_hits": self.text_hits,
+            "url_hit_rate": round(self.url_hits / lookups, 4) if lookups else 0.0,
+            "text_hit_rate": round(self.text_hits / lookups, 4) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "extraction_seconds_saved": round(self.extraction_seconds_saved, 3),
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+    # ------------------------------------------------------------------
+    # Internos (con el lock tomado)
+    # ------------------------------------------------------------------
+
+    def _try_write(self, fn: Callable[[], Any]):
+        """Escritura accesoria de ``lookup``; si el índice está bloqueado se omite."""
+        try:
+            fn()
+            self._conn.commit()
+        except sqlite3.Error as e:
+            self._conn.rollback()
+            logger.debug(f"Almacén de documentos: escritura omitida ({e})")
+
+    def _remove(self, sha256: str) -> int:
+        """Borra un documento con su texto y sus URLs; devuelve los bytes liberados."""
+        row = self._conn.execute(
+            "SELECT size + text_bytes FROM blobs WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        self._conn.execute("DELETE FROM texts WHERE sha256 = ?", (sha256,))
+        self._conn.execute("DELETE FROM urls WHERE sha256 = ?", (sha256,))
+        self._conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+        self._blob_path(sha256).unlink(missing_ok=True)
+        if not row:
+            return 0
+        self._entries -= 1
+        self._total_bytes -= row[0]
+        return row[0]
+
+    def _evict(self, keep: str):
+        """Desaloja por LRU hasta quedar bajo ``max_bytes`` (sin tocar ``keep``)."""
+        if not self.max_bytes or self._total_bytes <= self.max_bytes:
+            return
+        victims = self._conn.execute(
+            "SELECT sha256 FROM blobs WHERE sha256 != ? ORDER BY last_access", (keep,)
+        ).fetchall()
+        for (sha256,) in victims:
+            if self._total_bytes <= self.max_bytes:
+                break
+            freed = self._remove(sha256)
+            self.evictions += 1
+            self.evicted_bytes += freed
+            logger.info(f"Almacén de documentos: desalojado {sha256[:12]} ({freed} bytes)")
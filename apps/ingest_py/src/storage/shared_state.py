@@ -0,0 +1,215 @@
+"""
+Estado compartido entre procesos worker (uvicorn/gunicorn ``--workers N``).
+
+Con varios workers cada proceso tiene su propio circuit breaker y sus
+propios contadores.  ``SharedStateStore`` usa un archivo SQLite local
+(modo WAL) como almacén común para:
+
+- Estado de los circuit breakers, actualizado de forma atómica
+  (``BEGIN IMMEDIATE``) para que todos los workers vean el mismo
+  circuito abierto/cerrado.  Las lecturas se sirven de una copia en
+  memoria que se refresca fuera del event loop (``refresh_breakers``),
+  así que una petición con el circuito cerrado no toca SQLite.
+- Contadores de métricas: cada worker publica los suyos bajo su PID y
+  ``/metrics`` devuelve la suma de todos los workers activos (los que
+  publicaron en los últimos ``worker_ttl`` segundos; al apagarse, cada
+  worker borra los suyos con ``remove_worker``).
+
+Las escrituras esperan como mucho ``busy_timeout`` segundos a que otro
+worker libere el archivo y si no fallan con ``sqlite3.OperationalError``:
+el llamador decide cómo seguir sin bloquear el event loop.
+
+El cache de procesos se comparte a través de su segundo nivel
+(``SQLiteCacheStore``), que puede vivir en el mismo archivo.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS breaker_state (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    pid INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (pid, name)
+);
+"""
+
+
+class SharedStateStore:
+    """
+    Almacén SQLite para breakers y contadores compartidos entre procesos.
+
+    Todas las operaciones son consultas pequeñas por clave primaria.  La
+    publicación de contadores y el refresco de la copia de los breakers
+    se hacen periódicamente desde un hilo (ver ``main.py``); solo los
+    cambios de estado de un breaker se escriben desde el event loop.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        worker_ttl: float = 15.0,
+        busy_timeout: float = 0.1,
+        snapshot_max_age: float = 5.0,
+    ):
+        """
+        Args:
+            path: Ruta del archivo SQLite compartido
+            worker_ttl: Segundos sin publicar tras los cuales los contadores
+                de un worker dejan de sumarse (workers muertos o de un
+                arranque anterior); unas pocas veces el intervalo de
+                publicación
+            busy_timeout: Segundos máximos de espera del bloqueo de SQLite
+            snapshot_max_age: Antigüedad máxima de la copia en memoria de
+                los breakers; pasada, la siguiente lectura la refresca en
+                línea (cuando no corre el refresco periódico)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.worker_ttl = worker_ttl
+        self.busy_timeout = busy_timeout
+        self.snapshot_max_age = snapshot_max_age
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._breakers: Dict[str, Dict[str, Any]] = {}
+        self._breakers_loaded_at = float("-inf")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(
+            str(self.path), timeout=self.busy_timeout, check_same_thread=False, isolation_level=None
+        )
+
+    def _check_process(self):
+        """Descarta el estado heredado de otro proceso (tras un ``fork``).
+
+        Se llama antes de tomar ``_lock``: si otro hilo del padre lo tenía
+        tomado al hacer ``fork``, el lock copiado queda tomado para
+        siempre en el hijo.
+        """
+        if os.getpid() != self.pid:
+            self.pid = os.getpid()
+            self._lock = threading.Lock()
+            self._conn = self._connect()
+            self._breakers = {}
+            self._breakers_loaded_at = float("-inf")
+
+    # ------------------------------------------------------------------
+    # Circuit breakers
+    # ------------------------------------------------------------------
+
+    def refresh_breakers(self):
+        """Relee el estado de todos los breakers (desde un hilo)."""
+        self._check_process()
+        with self._lock:
+            rows = self._conn.execute("SELECT name, state FROM breaker_state").fetchall()
+        self._breakers = {name: json.loads(state) for name, state in rows}
+        self._breakers_loaded_at = time.monotonic()
+
+    def load_breaker(self, name: str) -> Optional[Dict[str, Any]]:
+        """Estado de un breaker según la copia en memoria, o ``None`` si no existe."""
+        self._check_process()
+        if time.monotonic() - self._breakers_loaded_at > self.snapshot_max_age:
+            try:
+                self.refresh_breakers()
+            except sqlite3.Error as e:
+                logger.warning(f"Estado compartido: no se pudo refrescar los breakers: {e}")
+                self._breakers_loaded_at = time.monotonic()
+        return self._breakers.get(name)
+
+    def update_breaker(
+        self, name: str, fn: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Aplica ``fn`` al estado de un breaker de forma atómica.
+
+        ``fn`` recibe el estado actual (``{}`` si no existe) y devuelve el
+        nuevo estado, que se guarda dentro de la misma transacción.
+        """
+        self._check_process()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT state FROM breaker_state WHERE name = ?", (name,)
+                ).fetchone()
+                state = fn(json.loads(row[0]) if row else {})
+                conn.execute(
+                    "INSERT OR REPLACE INTO breaker_state (name, state, updated_at) VALUES (?, ?, ?)",
+                    (name, json.dumps(state), time.time()),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            self._breakers[name] = state
+        return state
+
+    # ------------------------------------------------------------------
+    # Contadores
+    # ------------------------------------------------------------------
+
+    def publish_counters(self, counters: Dict[str, int]):
+        """Publica los contadores de este worker (reemplaza los anteriores)."""
+        now = time.time()
+        self._check_process()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO counters (pid, name, value, updated_at) VALUES (?, ?, ?, ?)",
+                    [(self.pid, name, int(value), now) for name, value in counters.items()],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+    def remove_worker(self):
+        """Borra los contadores de este worker (al apagarse)."""
+        self._check_process()
+        with self._lock:
+            self._conn.execute("DELETE FROM counters WHERE pid = ?", (self.pid,))
+
+    def aggregate_counters(self) -> Dict[str, Any]:
+        """Suma los contadores de todos los workers activos.
+
+        Returns:
+            Diccionario con ``counters`` (suma por nombre) y ``workers``
+            (número de procesos que publicaron recientemente).
+        """
+        min_ts = time.time() - self.worker_ttl
+        self._check_process()
+        with self._lock:
+            conn = self._conn
+            rows = conn.execute(
+                "SELECT name, SUM(value) FROM counters WHERE updated_at >= ? GROUP BY name",
+                (min_ts,),
+            ).fetchall()
+            workers = conn.execute(
+                "SELECT COUNT(DISTINCT pid) FROM counters WHERE updated_at >= ?", (min_ts,)
+            ).fetchone()[0]
+        return {"counters": {name: total for name, total in rows}, "workers": workers}
@@ -0,0 +1,176 @@
+"""
+Histograma de latencias con buckets logarítmicos (estilo HDR).
+
+Sustituye a la lista de las últimas N latencias: la memoria es fija
+(un contador por bucket), registrar un valor es O(1) y cualquier
+cuantil se obtiene recorriendo los buckets, con un error relativo
+acotado (``relative_error``, 1 % por defecto).
+
+Además del acumulado desde el arranque, cada histograma mantiene un
+anillo de sub-histogramas por minuto para consultar ventanas recientes
+(último minuto, 5 minutos, 1 hora) sin guardar valores individuales.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Ventanas expuestas por defecto en ``snapshot`` (etiqueta, segundos)
+WINDOWS: Tuple[Tuple[str, int], ...] = (("1m", 60), ("5m", 300), ("1h", 3600))
+
+# Cuantiles expuestos por defecto en ``snapshot``
+QUANTILES: Tuple[float, ...] = (0.5, 0.9, 0.95, 0.99, 0.999)
+
+
+def quantile_label(q: float) -> str:
+    """Nombre corto de un cuantil: 0.5 -> ``p50``, 0.999 -> ``p999``."""
+    return "p" + f"{q * 100:g}".replace(".", "")
+
+
+class LogHistogram:
+    """
+    Histograma de buckets logarítmicos con ventanas por minuto.
+
+    - Buckets ``[min_value * g^i, min_value * g^(i+1))`` con
+      ``g = 1 + 2 * relative_error``
+    - Valores por debajo de ``min_value`` caen en el bucket 0 y por
+      encima de ``max_value`` en el último
+    - Ventanas: anillo de ``window_minutes`` histogramas dispersos
+      (solo buckets con datos), uno por minuto
+    """
+
+    def __init__(
+        self,
+        min_value: float = 0.01,
+        max_value: float = 600_000.0,
+        relative_error: float = 0.01,
+        window_minutes: int = 60,
+    ):
+        """
+        Args:
+            min_value: Menor valor distinguible (ms)
+            max_value: Mayor valor distinguible (ms)
+            relative_error: Error relativo máximo de los cuantiles
+            window_minutes: Minutos de historia para las ventanas
+        """
+        self.min_value = min_value
+        self.max_value = max_value
+        self._growth = 1.0 + 2.0 * relative_error
+        self._log_growth = math.log(self._growth)
+        self.bucket_count = self._index(max_value) + 1
+
+        self.counts: List[int] = [0] * self.bucket_count
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+        self.window_minutes = window_minutes
+        # Anillo de [minuto, {bucket: conteo}, suma]
+        self._slots: List[Optional[List[Any]]] = [None] * window_minutes
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return int(math.log(value / self.min_value) / self._log_growth)
+
+    def _bucket_value(self, index: int) -> float:
+        """Valor representativo (punto medio geométrico) de un bucket."""
+        return self.min_value * self._growth ** (index + 0.5)
+
+    def record(self, value: float, now: Optional[float] = None):
+        """Registra un valor (O(1))."""
+        index = min(self._index(value), self.bucket_count - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        minute = int((now if now is not None else time.time()) // 60)
+        pos = minute % self.window_minutes
+        slot = self._slots[pos]
+        if slot is None or slot[0] != minute:
+            slot = [minute, {}, 0.0]
+            self._slots[pos] = slot
+        buckets = slot[1]
+        buckets[index] = buckets.get(index, 0) + 1
+        slot[2] += value
+
+    def _window(self, seconds: int, now: Optional[float] = None) -> Tuple[Dict[int, int], float]:
+        """Buckets y suma de los minutos que caen dentro de la ventana."""
+        current = int((now if now is not None else time.time()) // 60)
+        oldest = current - max(1, math.ceil(seconds / 60)) + 1
+        merged: Dict[int, int] = {}
+        total = 0.0
+        for slot in self._slots:
+            if slot is None or not oldest <= slot[0] <= current:
+                continue
+            for index, n in slot[1].items():
+                merged[index] = merged.get(index, 0) + n
+            total += slot[2]
+        return merged, total
+
+    def _quantiles(
+        self, buckets: Iterable[Tuple[int, int]], count: int, quantiles: Iterable[float]
+    ) -> Dict[float, float]:
+        """Cuantiles por rango más cercano sobre buckets ordenados."""
+        result: Dict[float, float] = {}
+        if not count:
+            return {q: 0.0 for q in quantiles}
+        targets = sorted((max(1, math.ceil(q * count)), q) for q in quantiles)
+        seen = 0
+        pending = iter(targets)
+        target = next(pending, None)
+        for index, n in buckets:
+            seen += n
+            while target is not None and seen >= target[0]:
+                value = self._bucket_value(index)
+                result[target[1]] = float(min(max(value, self.min), self.max))
+                target = next(pending, None)
+            if target is None:
+                break
+        return result
+
+    def quantile(self, q: float, window: Optional[int] = None) -> float:
+        """Cuantil ``q`` (0-1), del acumulado o de los últimos ``window`` segundos."""
+        return self.quantiles([q], window)[q]
+
+    def quantiles(self, qs: Iterable[float], window: Optional[int] = None) -> Dict[float, float]:
+        """Varios cuantiles en una sola pasada."""
+        qs = list(qs)
+        if window is None:
+            return self._quantiles(
+                ((i, n) for i, n in enumerate(self.counts) if n), self.count, qs
+            )
+        buckets, _ = self._window(window)
+        return self._quantiles(sorted(buckets.items()), sum(buckets.values()), qs)
+
+    def snapshot(
+        self,
+        quantiles: Iterable[float] = QUANTILES,
+        windows: Iterable[Tuple[str, int]] = WINDOWS,
+    ) -> Dict[str, Any]:
+        """Serializa el histograma (acumulado y ventanas) para ``/metrics``."""
+        quantiles = list(quantiles)
+
+        def _summary(count: int, total: float, values: Dict[float, float]) -> Dict[str, Any]:
+            return {
+                "count": count,
+                "mean": round(total / count, 2) if count else 0.0,
+                **{quantile_label(q): round(values[q], 2) for q in quantiles},
+            }
+
+        data = _summary(self.count, self.total, self.quantiles(quantiles))
+        data["max"] = round(self.max, 2)
+        for label, seconds in windows:
+            buckets, total = self._window(seconds)
+            count = sum(buckets.values())
+            data[label] = _summary(
+                count, total, self._quantiles(sorted(buckets.items()), count, quantiles)
+            )
+        return data
@@ -0,0 +1,105 @@
+"""
+Formato de exposición de texto de Prometheus (versión 0.0.4).
+
+Utilidad mínima para que ``/metrics?format=prometheus`` pueda ser
+consultado directamente por Prometheus sin añadir la dependencia
+``prometheus_client``: acumula líneas ``# HELP``/``# TYPE`` y muestras
+con etiquetas, y convierte los histogramas de latencia en ``summary``.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Dict, Iterable, List, Set
+
+from .histogram import QUANTILES, LogHistogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INVALID_NAME = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def metric_name(name: str) -> str:
+    """Normaliza un nombre de métrica a ``[a-zA-Z_:][a-zA-Z0-9_:]*``."""
+    name = _INVALID_NAME.sub("_", name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class PrometheusText:
+    """Constructor de una exposición de texto de Prometheus."""
+
+    def __init__(self, prefix: str = "ingest"):
+        """
+        Args:
+            prefix: Prefijo para todos los nombres de métrica
+        """
+        self.prefix = prefix
+        self._lines: List[str] = []
+        self._declared: Set[str] = set()
+
+    def _name(self, name: str) -> str:
+        return metric_name(f"{self.prefix}_{name}" if self.prefix else name)
+
+    def _declare(self, name: str, kind: str, help_text: str):
+        if name in self._declared:
+            return
+        self._declared.add(name)
+        self._lines.append(f"# HELP {name} {_escape(help_text)}")
+        self._lines.append(f"# TYPE {name} {kind}")
+
+    def _sample(self, name: str, value: float, labels: Dict[str, str]):
+        if labels:
+            rendered = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+            self._lines.append(f"{name}{{{rendered}}} {_format_value(value)}")
+        else:
+            self._lines.append(f"{name} {_format_value(value)}")
+
+    def counter(self, name: str, value: float, help_text: str = "", **labels: str):
+        """Agrega una muestra de tipo ``counter`` (se añade el sufijo ``_total``)."""
+        full = self._name(name if name.endswith("_total") else f"{name}_total")
+        self._declare(full, "counter", help_text or name)
+        self._sample(full, value, labels)
+
+    def gauge(self, name: str, value: float, help_text: str = "", **labels: str):
+        """Agrega una muestra de tipo ``gauge``."""
+        full = self._name(name)
+        self._declare(full, "gauge", help_text or name)
+        self._sample(full, value, labels)
+
+    def summary(
+        self,
+        name: str,
+        histogram: LogHistogram,
+        help_text: str = "",
+        quantiles: Iterable[float] = QUANTILES,
+        **labels: str,
+    ):
+        """Agrega un histograma de latencias como ``summary`` (cuantiles, suma y conteo)."""
+        full = self._name(name)
+        self._declare(full, "summary", help_text or name)
+        quantiles = list(quantiles)
+        values = histogram.quantiles(quantiles)
+        for q in quantiles:
+            self._sample(full, values[q], {**labels, "quantile": f"{q:g}"})
+        self._sample(f"{full}_sum", histogram.total, labels)
+        self._sample(f"{full}_count", histogram.count, labels)
+
+    def render(self) -> str:
+        """Devuelve el texto completo de la exposición."""
+        return "\n".join(self._lines) + "\n"
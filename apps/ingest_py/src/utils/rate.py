@@ -6,7 +6,7 @@ llamadas a servicios externos, evitando exceder límites de uso.
 
 import asyncio
 import time
-from typing import Callable, Coroutine, TypeVar
+from typing import Any, Callable, Coroutine, TypeVar
 
 T = TypeVar("T")
 
@@ -15,6 +15,10 @@ class RateLimiter:
     """Un limitador de tasa que permite ejecutar acciones a un máximo de
     `rate` veces por segundo.  Se implementa como un bucket de tokens
     regenerado en intervalos fijos.
+
+    El lock interno queda ligado al event loop en que se usa; si el loop
+    cambia (scripts con varios ``asyncio.run``) se crea uno nuevo, de
+    modo que una instancia global sirve en todos.
     """
 
     def __init__(self, rate: float, capacity: int | None = None) -> None:
@@ -23,9 +27,18 @@ class RateLimiter:
         self.tokens = self.capacity
         self.last_refill = time.monotonic()
         self._lock = asyncio.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _loop_lock(self) -> asyncio.Lock:
+        """Lock del event loop actual (se recrea al cambiar de loop)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
 
     async def acquire(self) -> None:
-        async with self._lock:
+        async with self._loop_lock():
             # Reponer tokens en función del tiempo transcurrido
             now = time.monotonic()
             elapsed = now - self.last_refill
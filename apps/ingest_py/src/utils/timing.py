@@ -0,0 +1,87 @@
+"""
+Medición de latencia por etapa del pipeline de ingesta.
+
+Cada petición crea un ``StageTimer`` (``start_timer``) que se guarda en
+una ``ContextVar``; el código de las distintas capas envuelve sus
+etapas con ``stage("nombre")`` sin recibir el timer como parámetro.
+Las tareas creadas durante la petición (consultas coalescidas,
+refrescos) heredan el contexto y registran en el mismo timer.
+
+Además, cada etapa alimenta un histograma global por nombre
+(``stage_stats`` para ``/metrics``), y el timer puede serializarse
+como cabecera ``Server-Timing``.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from .histogram import LogHistogram
+
+# Histogramas globales por etapa (ms)
+stage_histograms: Dict[str, LogHistogram] = {}
+
+_current_timer: ContextVar[Optional["StageTimer"]] = ContextVar("stage_timer", default=None)
+
+
+class StageTimer:
+    """Acumula la duración de las etapas de una petición."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}  # ms por etapa, en orden de aparición
+
+    def add(self, name: str, duration_ms: float):
+        """Suma ``duration_ms`` a la etapa ``name``."""
+        self.stages[name] = self.stages.get(name, 0.0) + duration_ms
+
+    def elapsed_ms(self) -> float:
+        """Milisegundos desde que se creó el timer."""
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """Valor de la cabecera ``Server-Timing`` (etapas y total)."""
+        parts = [f"{name};dur={ms:.1f}" for name, ms in self.stages.items()]
+        parts.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(parts)
+
+
+def start_timer() -> StageTimer:
+    """Crea un timer y lo asocia al contexto actual (la petición en curso)."""
+    timer = StageTimer()
+    _current_timer.set(timer)
+    return timer
+
+
+def current_timer() -> Optional[StageTimer]:
+    """Timer del contexto actual, o ``None`` fuera de una petición medida."""
+    return _current_timer.get()
+
+
+def record_stage(name: str, duration_ms: float):
+    """Registra una duración en el histograma de la etapa y en el timer actual."""
+    histogram = stage_histograms.get(name)
+    if histogram is None:
+        histogram = stage_histograms[name] = LogHistogram()
+    histogram.record(duration_ms)
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(name, duration_ms)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Mide el bloque como la etapa ``name`` (también si lanza una excepción)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, (time.perf_counter() - started) * 1000)
+
+
+def stage_stats() -> Dict[str, Any]:
+    """Cuantiles y ventanas de cada etapa para ``/metrics``."""
+    return {name: h.snapshot() for name, h in sorted(stage_histograms.items())}
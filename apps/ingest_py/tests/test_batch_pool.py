@@ -0,0 +1,72 @@
+"""``batch_analyze_async`` cuando el pool de clasificación se rompe."""
+
+import asyncio
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.analyzers import auto_classifier as module
+from src.analyzers.auto_classifier import batch_analyze, batch_analyze_async, classification_cache
+
+
+class FakePool(Executor):
+    """Pool en el mismo proceso; los ``broken`` primeros pools están rotos."""
+
+    created = []
+    broken = 0
+
+    def __init__(self, max_workers=None, initializer=None):
+        self.is_broken = len(FakePool.created) < FakePool.broken
+        self.shut_down = False
+        FakePool.created.append(self)
+
+    def submit(self, fn, *args):
+        future = Future()
+        if self.is_broken:
+            future.set_exception(BrokenProcessPool("un proceso terminó de forma abrupta"))
+        else:
+            future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    monkeypatch.setattr(module, "ProcessPoolExecutor", FakePool)
+    monkeypatch.setattr(module, "BATCH_PROCESS_THRESHOLD", 10)
+    monkeypatch.setattr(module, "BATCH_CHUNK_SIZE", 4)
+    monkeypatch.setattr(module, "_process_pool", None)
+    FakePool.created = []
+    yield FakePool
+    module._process_pool = None
+    classification_cache.clear()
+
+
+def _actuaciones():
+    return [
+        {"tipo": "Auto", "descripcion": f"Requiérase a la parte en el término de {i} días so pena de rechazo"}
+        if i % 2 else {"tipo": "Auto", "descripcion": f"Agréguese al expediente el memorial {i}"}
+        for i in range(30)
+    ]
+
+
+def _expected():
+    classification_cache.clear()
+    expected = batch_analyze(_actuaciones(), "rules")
+    classification_cache.clear()
+    return expected
+
+
+@pytest.mark.parametrize("broken,pools_created", [(0, 1), (1, 2), (2, 2)])
+def test_pool_roto_no_rompe_el_lote(pools, broken, pools_created):
+    expected = _expected()
+    pools.broken = broken
+    assert asyncio.run(batch_analyze_async(_actuaciones(), "rules")) == expected
+    assert len(pools.created) == pools_created
+    assert all(pool.shut_down for pool in pools.created[:broken])
+    # Dos roturas seguidas: los bloques se clasifican en hilos y el
+    # siguiente lote vuelve a crear un pool
+    assert module._process_pool is (None if broken == 2 else pools.created[-1])
@@ -0,0 +1,118 @@
+"""Segundo nivel del cache: lectura fuera del event loop y escritor por proceso."""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.clients.resilience import SimpleCache
+from src.storage.cache_store import SQLiteCacheStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteCacheStore(str(tmp_path / "cache.sqlite3"))
+    yield store
+    store.close()
+
+
+def _writers():
+    return [t for t in threading.enumerate() if t.name == "rama-cache-writer"]
+
+
+def test_escritor_se_inicia_con_la_primera_escritura(store):
+    before = len(_writers())
+    assert store._writer is None
+    assert store.get("x") is None
+    assert len(_writers()) == before
+    store.put("x", {"a": 1}, 1.0)
+    store.flush()
+    assert store._writer.is_alive()
+    assert store.get("x") == ({"a": 1}, 1.0)
+
+
+def test_escritor_nuevo_tras_fork(store):
+    store.put("x", {"a": 1}, 1.0)
+    store.flush()
+    parent_writer = store._writer
+    store._pid = -1  # Como si el objeto viniera de otro proceso
+    store.put("y", {"b": 2}, 2.0)
+    store.flush()
+    assert store._writer is not parent_writer and store._writer.is_alive()
+    assert store.get("y") == ({"b": 2}, 2.0)
+
+
+def test_get_solo_memoria_y_aget_con_segundo_nivel(store):
+    writer = SimpleCache(store=store)
+    writer.set("k", {"v": 1})
+    store.flush()
+
+    cache = SimpleCache(store=store)
+    assert cache.get("k") is None
+    assert store.reads == 0
+
+    async def read():
+        loop_thread = threading.get_ident()
+        threads = []
+        original = store.get
+
+        def spy(key):
+            threads.append(threading.get_ident())
+            return original(key)
+
+        store.get = spy
+        try:
+            data = await cache.aget("k")
+        finally:
+            store.get = original
+        return data, threads, loop_thread
+
+    data, threads, loop_thread = asyncio.run(read())
+    assert data == {"v": 1}
+    assert threads and loop_thread not in threads
+    # Promovida a memoria: el siguiente get no va al disco
+    assert cache.get("k") == {"v": 1} and cache.store_hits == 1
+
+
+def test_aget_no_pisa_una_entrada_mas_reciente(store):
+    old = SimpleCache(store=store)
+    old.set("k", {"v": "disco"})
+    store.flush()
+    cache = SimpleCache(store=store)
+    original = store.get
+
+    def slow(key):
+        row = original(key)
+        cache.set("k", {"v": "memoria"})  # Llega mientras se lee el disco
+        return row
+
+    store.get = slow
+    try:
+        assert asyncio.run(cache.aget("k")) == {"v": "memoria"}
+    finally:
+        store.get = original
+
+
+def test_warm_decodifica_en_un_hilo(store):
+    writer = SimpleCache(store=store)
+    writer.set("a", {"v": 1})
+    writer.set("b", {"v": "x" * 500})
+    store.flush()
+    threads = []
+
+    def decode(value):
+        threads.append(threading.get_ident())
+        return dict(value, decodificado=True)
+
+    cache = SimpleCache(store=store, decode=decode, max_bytes=100)
+    cache.set("a", {"v": "memoria"})  # Más reciente que la del disco
+
+    async def warm():
+        await cache.warm()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(warm())
+    assert threads and loop_thread not in threads
+    assert cache.get("a") == {"v": "memoria"}
+    # "b" supera el presupuesto de bytes: no se decodifica ni se carga
+    assert cache.get("b") is None and len(threads) == 1 and cache.warmed == 0
@@ -0,0 +1,191 @@
+"""Transiciones de los circuit breakers y políticas por entorno."""
+
+import pytest
+
+from src.clients import resilience
+from src.clients.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreakerGroup,
+    SimpleCircuitBreaker,
+    _breaker_policy,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "time", clock)
+    return clock
+
+
+def _breaker(**kwargs):
+    policy = dict(failure_threshold=3, open_duration=10, max_open_duration=40, probe_timeout=5)
+    policy.update(kwargs)
+    return SimpleCircuitBreaker(name="test", **policy)
+
+
+def _trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_abre_al_llegar_al_umbral(clock):
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.is_open()
+    assert not breaker.allow_request()
+
+
+def test_exito_reinicia_los_fallos(clock):
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.failures == 1
+
+
+def test_semiabierto_deja_pasar_una_prueba(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock.advance(9)
+    assert not breaker.allow_request()
+    clock.advance(1)
+    assert not breaker.is_open()
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    # La prueba está en curso: el resto espera
+    assert breaker.is_open() and not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.open_count == 0
+    assert breaker.allow_request()
+
+
+def test_prueba_fallida_reabre_con_backoff_y_tope(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    durations = []
+    for _ in range(4):
+        durations.append(breaker.current_open_duration())
+        clock.advance(breaker.current_open_duration())
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+    assert durations == [10, 20, 40, 40]
+
+
+def test_prueba_sin_respuesta_libera_el_cupo(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock.advance(10)
+    assert breaker.allow_request()
+    # La prueba se canceló y nunca registró resultado
+    clock.advance(4)
+    assert not breaker.allow_request()
+    clock.advance(1)
+    assert not breaker.is_open()
+    assert breaker.allow_request()
+    assert breaker.probes == 1
+
+
+def test_varias_pruebas_en_semiabierto(clock):
+    breaker = _breaker(half_open_probes=2)
+    _trip(breaker)
+    clock.advance(10)
+    assert breaker.allow_request() and breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_grupo_aisla_endpoints_y_clases(clock):
+    group = CircuitBreakerGroup("rama", policies={
+        "timeout": {"failure_threshold": 2, "open_duration": 10},
+        "4xx": {"failure_threshold": 5, "open_duration": 10},
+        "other": {"failure_threshold": 2, "open_duration": 10},
+    })
+    for _ in range(4):
+        group.record_failure("actuaciones", "4xx")
+    assert group.allow("actuaciones") == []
+    group.record_failure("actuaciones", "timeout")
+    group.record_failure("actuaciones", "timeout")
+    assert group.allow("actuaciones") is None and group.is_open("actuaciones")
+    assert group.allow("consulta") == [] and not group.is_open("consulta")
+    # Clases desconocidas cuentan como "other"
+    group.record_failure("consulta", "rara")
+    group.record_failure("consulta", "rara")
+    assert group.breakers("consulta")["other"].state == OPEN
+
+
+def _grupo():
+    return CircuitBreakerGroup("rama", policies={
+        "timeout": {"failure_threshold": 2, "open_duration": 10, "max_open_duration": 40, "probe_timeout": 60},
+        "5xx": {"failure_threshold": 2, "open_duration": 10, "max_open_duration": 40, "probe_timeout": 60},
+        "other": {"failure_threshold": 2, "open_duration": 10},
+    })
+
+
+def test_prueba_fallida_con_otra_clase_reabre_el_breaker(clock):
+    group = _grupo()
+    timeout = group.breakers("consulta")["timeout"]
+    group.record_failure("consulta", "timeout")
+    group.record_failure("consulta", "timeout")
+    clock.advance(10)
+    probes = group.allow("consulta")
+    assert probes == [timeout] and timeout.state == HALF_OPEN
+    # La prueba falla con un 5xx: el breaker de timeout también se reabre
+    group.record_failure("consulta", "5xx", probes)
+    assert timeout.state == OPEN and timeout.probes == 0 and timeout.open_count == 2
+    assert group.breakers("consulta")["5xx"].state == CLOSED
+    # Con el backoff configurado (20 s), no con el probe_timeout (60 s)
+    clock.advance(19)
+    assert group.is_open("consulta")
+    clock.advance(1)
+    assert group.allow("consulta") == [timeout]
+    group.record_success("consulta")
+    assert timeout.state == CLOSED and not group.is_open("consulta")
+
+
+def test_rechazo_libera_las_pruebas_reservadas(clock, monkeypatch):
+    group = _grupo()
+    timeout, server = group.breakers("consulta")["timeout"], group.breakers("consulta")["5xx"]
+    for error_class in ("timeout", "timeout", "5xx", "5xx"):
+        group.record_failure("consulta", error_class)
+    clock.advance(10)
+    # Otro worker ocupa la prueba del breaker de 5xx entre la consulta
+    # de ``is_open`` y la reserva
+    assert server.allow_request()
+    monkeypatch.setattr(server, "is_open", lambda: False)
+    assert group.allow("consulta") is None
+    assert timeout.state == HALF_OPEN and timeout.probes == 0
+    assert server.probes == 1
+
+
+def test_politicas_desde_el_entorno(monkeypatch):
+    assert _breaker_policy("5xx", 3, 60, 600) == {
+        "failure_threshold": 3, "open_duration": 60, "max_open_duration": 600,
+        "backoff_factor": 2.0, "half_open_probes": 1, "probe_timeout": 60,
+    }
+    monkeypatch.setenv("RAMA_BREAKER_5XX_THRESHOLD", "7")
+    monkeypatch.setenv("RAMA_BREAKER_5XX_OPEN_SECONDS", "15")
+    monkeypatch.setenv("RAMA_BREAKER_5XX_MAX_OPEN_SECONDS", "120")
+    monkeypatch.setenv("RAMA_BREAKER_PROBE_TIMEOUT_SECONDS", "20")
+    policy = _breaker_policy("5xx", 3, 60, 600)
+    assert (policy["failure_threshold"], policy["open_duration"], policy["max_open_duration"]) == (7, 15, 120)
+    assert policy["probe_timeout"] == 20
+    assert _breaker_policy("4xx", 10, 60, 600)["failure_threshold"] == 10
+    SimpleCircuitBreaker(name="env", **policy)
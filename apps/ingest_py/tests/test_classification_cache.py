@@ -0,0 +1,65 @@
+"""Cache de clasificaciones: la versión de las reglas forma parte de la clave."""
+
+import pytest
+
+from src.analyzers import auto_classifier
+from src.analyzers.auto_classifier import (
+    RULESET_VERSION,
+    ClassificationCache,
+    _cache_key,
+    analyze_actuacion,
+    classification_cache,
+)
+
+ACT = {"tipo": "Auto", "descripcion": "Requiérase en el término de 5 días so pena de rechazo", "uniq_key": "u1"}
+BOGUS = (True, "tramite", 0.01)
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    classification_cache.clear()
+    yield
+    classification_cache.clear()
+
+
+def test_usa_la_clasificacion_memorizada():
+    key, texts = _cache_key(ACT, ACT["tipo"], ACT["descripcion"])
+    assert key[0] == RULESET_VERSION
+    classification_cache.set(key, texts, BOGUS)
+    assert analyze_actuacion(ACT)["auto_type"] == "tramite"
+
+
+def test_entradas_de_otra_version_no_se_usan():
+    key, texts = _cache_key(ACT, ACT["tipo"], ACT["descripcion"], version="reglas-anteriores")
+    classification_cache.set(key, texts, BOGUS)
+    result = analyze_actuacion(ACT)
+    assert result["auto_type"] == "perentorio"
+
+
+def test_misma_uniq_key_con_otro_texto_se_reclasifica():
+    analyze_actuacion(ACT)
+    changed = {**ACT, "descripcion": "Agréguese al expediente"}
+    assert analyze_actuacion(changed)["auto_type"] != "perentorio"
+
+
+def test_version_cambia_con_las_reglas(monkeypatch):
+    import hashlib
+    import json
+
+    def version(perentorio):
+        return hashlib.sha256(json.dumps(
+            [auto_classifier.CANON_VERSION, perentorio, auto_classifier.TRAMITE_FOLDED,
+             auto_classifier.AUTO_FOLDED, auto_classifier.HINTS_FOLDED],
+            ensure_ascii=False,
+        ).encode("utf-8")).hexdigest()[:12]
+
+    assert version(auto_classifier.PERENTORIO_FOLDED) == RULESET_VERSION
+    assert version(auto_classifier.PERENTORIO_FOLDED + ["nueva regla"]) != RULESET_VERSION
+
+
+def test_lru_acotado():
+    cache = ClassificationCache(max_entries=2)
+    for key in "abc":
+        cache.set(key, None, BOGUS)
+    assert cache.get("a") is None and cache.get("c") == BOGUS
+    assert cache.evictions == 1 and cache.stats()["ruleset_version"] == RULESET_VERSION
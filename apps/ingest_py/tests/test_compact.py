@@ -0,0 +1,47 @@
+"""Forma compacta de los procesos en cache: ida y vuelta sin pérdidas."""
+
+import json
+
+import pytest
+
+from benchmarks.corpus import synthetic_case
+from src.normalizers import compact
+from src.normalizers.compact import CompactCase, expand
+from src.normalizers.rama import normalize_rama_response
+
+
+@pytest.fixture(params=[0, 1, 50])
+def normalized(request):
+    proceso, actuaciones = synthetic_case(request.param, seed=request.param)
+    return normalize_rama_response(proceso, actuaciones)
+
+
+def test_to_dict_es_identico_al_normalizador(normalized):
+    assert CompactCase.from_normalized(normalized).to_dict() == normalized
+
+
+def test_encode_decode_por_json(normalized):
+    packed = compact.encode(CompactCase.from_normalized(normalized))
+    restored = compact.decode(json.loads(json.dumps(packed, default=str)))
+    assert isinstance(restored, CompactCase)
+    assert expand(restored) == normalized
+
+
+def test_claves_adicionales_se_conservan(normalized):
+    normalized = {**normalized, "partial": True}
+    assert CompactCase.from_normalized(normalized).to_dict() == normalized
+
+
+def test_reutiliza_actuaciones_compactadas(normalized):
+    cached = CompactCase.from_normalized(normalized)
+    dicts, reuse = cached.act_dicts()
+    rebuilt = CompactCase.from_normalized({**normalized, "acts": dicts}, reuse)
+    assert all(a is b for a, b in zip(rebuilt.acts, cached.acts))
+    assert rebuilt.to_dict() == normalized
+
+
+def test_otros_valores_pasan_sin_cambios():
+    value = {"not_found": True, "acts": []}
+    assert compact.encode(value) is value
+    assert compact.decode(value) is value
+    assert expand(value) is value
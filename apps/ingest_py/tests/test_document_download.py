@@ -0,0 +1,140 @@
+"""Descarga a disco: descargas concurrentes de la misma URL y reintentos de 5xx."""
+
+import asyncio
+import hashlib
+import json
+import threading
+
+import httpx
+import pytest
+
+from src.analyzers import document_extractor
+
+URL = "https://docs.rama/auto.pdf"
+CONTENIDO = bytes(range(256)) * 64
+
+
+class Servidor:
+    """Entrega ``CONTENIDO`` en bloques, cediendo el event loop entre ellos."""
+
+    def __init__(self, errores=0):
+        self.errores = errores
+        self.peticiones = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.peticiones += 1
+        if self.errores:
+            self.errores -= 1
+            return httpx.Response(503)
+
+        async def bloques():
+            for start in range(0, len(CONTENIDO), 1024):
+                await asyncio.sleep(0)
+                yield CONTENIDO[start:start + 1024]
+
+        return httpx.Response(200, content=bloques())
+
+
+def _descargar(directory, servidor, veces=1):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(servidor)) as client:
+            return await asyncio.gather(*(
+                document_extractor.download_document_to_file(URL, directory, client=client)
+                for _ in range(veces)
+            ))
+    return asyncio.run(run())
+
+
+def test_descargas_concurrentes_de_la_misma_url(tmp_path):
+    documentos = _descargar(tmp_path, Servidor(), veces=4)
+    assert all(documentos)
+    assert len({d.path for d in documentos}) == 4
+    for documento in documentos:
+        assert documento.path.read_bytes() == CONTENIDO
+        assert documento.sha256 == hashlib.sha256(CONTENIDO).hexdigest()
+    assert not list(tmp_path.glob("*.part*"))
+    assert not list(tmp_path.glob("*.lock"))
+
+    # Cada llamada es dueña de su archivo: borrar uno no afecta a los demás
+    documentos[0].path.unlink()
+    assert documentos[1].path.read_bytes() == CONTENIDO
+
+
+def test_5xx_se_reintenta_con_espera(tmp_path, monkeypatch):
+    esperas = []
+    sleep = asyncio.sleep
+
+    async def registrar(delay, *args, **kwargs):
+        if delay:
+            esperas.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", registrar)
+    monkeypatch.setattr(document_extractor, "DOCUMENT_RETRY_BACKOFF", 0.5)
+    servidor = Servidor(errores=2)
+    [documento] = _descargar(tmp_path, servidor)
+    assert documento and documento.path.read_bytes() == CONTENIDO
+    assert servidor.peticiones == 3
+    assert esperas == [0.5, 1.0]
+
+
+def test_5xx_agota_los_intentos(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_extractor, "DOCUMENT_RETRY_BACKOFF", 0)
+    servidor = Servidor(errores=10)
+    assert _descargar(tmp_path, servidor) == [None]
+    assert servidor.peticiones == document_extractor.DOCUMENT_DOWNLOAD_ATTEMPTS
+
+
+@pytest.mark.skipif(document_extractor.fcntl is None, reason="sin candados de archivo")
+def test_se_reanuda_la_parte_de_una_llamada_anterior(tmp_path, monkeypatch):
+    name = hashlib.sha256(URL.encode("utf-8")).hexdigest()[:32]
+    (tmp_path / f"{name}.part").write_bytes(CONTENIDO[:4096])
+    (tmp_path / f"{name}.part.json").write_text(json.dumps({"url": URL, "etag": '"v1"'}))
+    rangos = []
+
+    async def servidor(request):
+        rangos.append((request.headers.get("range"), request.headers.get("if-range")))
+        return httpx.Response(
+            206,
+            headers={"content-range": f"bytes 4096-{len(CONTENIDO) - 1}/{len(CONTENIDO)}"},
+            content=CONTENIDO[4096:],
+        )
+
+    threads = []
+    hash_file = document_extractor._hash_file
+
+    def hash_en_hilo(path):
+        threads.append(threading.current_thread())
+        return hash_file(path)
+
+    monkeypatch.setattr(document_extractor, "_hash_file", hash_en_hilo)
+    [documento] = _descargar(tmp_path, servidor)
+    # Lo ya descargado se vuelve a hashear fuera del event loop
+    assert threads and threading.main_thread() not in threads
+    assert rangos == [("bytes=4096-", '"v1"')]
+    assert documento.resumes == 1 and documento.path.read_bytes() == CONTENIDO
+    assert documento.sha256 == hashlib.sha256(CONTENIDO).hexdigest()
+    assert not list(tmp_path.glob("*.part*"))
+
+
+@pytest.mark.skipif(document_extractor.fcntl is None, reason="sin candados de archivo")
+def test_candado_tomado_y_archivo_reemplazado(tmp_path):
+    path = tmp_path / "doc.lock"
+    lock = document_extractor._try_lock(path)
+    assert lock is not None and document_extractor._try_lock(path) is None
+    # El dueño borra el candado al terminar: la siguiente llamada usa uno nuevo
+    path.unlink()
+    other = document_extractor._try_lock(path)
+    assert other is not None
+    lock.close()
+    other.close()
+
+
+def test_parte_reanudable_conserva_el_candado(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_extractor, "DOCUMENT_RETRY_BACKOFF", 0)
+    name = hashlib.sha256(URL.encode("utf-8")).hexdigest()[:32]
+    (tmp_path / f"{name}.part").write_bytes(CONTENIDO[:4096])
+    (tmp_path / f"{name}.part.json").write_text(json.dumps({"url": URL}))
+    assert _descargar(tmp_path, Servidor(errores=10)) == [None]
+    if document_extractor.fcntl is not None:
+        assert (tmp_path / f"{name}.lock").exists()
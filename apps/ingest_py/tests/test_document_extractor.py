@@ -0,0 +1,140 @@
+"""Extracción por páginas: cuándo el texto se considera definitivo."""
+
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("PyPDF2")
+
+from benchmarks.corpus import pdf_document
+from src.analyzers import document_extractor
+from src.analyzers.ocr_engine import OcrResult, PageText
+
+TEXTO = "Procede el Despacho a pronunciarse sobre el escrito allegado por el apoderado"
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    """Páginas 1 y 3 con capa de texto; la 2 en blanco (escaneada)."""
+    path = tmp_path / "auto.pdf"
+    path.write_bytes(pdf_document([[TEXTO] * 5, [], [TEXTO] * 5]))
+    return path
+
+
+def _ocr(monkeypatch, fake):
+    async def ocr(path, first_page=1, last_page=None, pages=None):
+        return fake(pages)
+    monkeypatch.setattr(document_extractor.ocr_engine, "ocr", ocr)
+
+
+def _extract(path, use_ocr=True):
+    return asyncio.run(document_extractor._extract_pages(path, use_ocr))
+
+
+def test_ocr_reconoce_la_pagina(monkeypatch, pdf):
+    _ocr(monkeypatch, lambda pages: OcrResult([PageText(p, "texto reconocido", 1.0, 1.0) for p in pages]))
+    text, method, complete = _extract(pdf)
+    assert "texto reconocido" in text and method == "pdf+ocr" and complete
+
+
+def test_sin_ocr_permitido(pdf):
+    text, method, complete = _extract(pdf, use_ocr=False)
+    assert text and method == "pdf" and not complete
+
+
+@pytest.mark.parametrize("error", [ImportError("pytesseract"), RuntimeError("pool roto")])
+def test_ocr_que_falla_no_es_definitivo(monkeypatch, pdf, error):
+    def fake(pages):
+        raise error
+    _ocr(monkeypatch, fake)
+    text, method, complete = _extract(pdf)
+    assert text and method == "pdf" and not complete
+
+
+@pytest.mark.parametrize("page", [
+    lambda p: PageText(p, "", 0.0, 0.0, "tesseract falló"),
+    lambda p: PageText(p, "  ", 1.0, 1.0),
+])
+def test_pagina_sin_reconocer_no_es_definitiva(monkeypatch, pdf, page):
+    _ocr(monkeypatch, lambda pages: OcrResult([page(p) for p in pages]))
+    text, method, complete = _extract(pdf)
+    assert text and method == "pdf" and not complete
+
+
+def test_texto_incompleto_no_se_guarda(monkeypatch, pdf, tmp_path):
+    from src.storage.document_store import DocumentStore
+
+    def fake(pages):
+        raise RuntimeError("pool roto")
+    _ocr(monkeypatch, fake)
+    store = DocumentStore(str(tmp_path / "store"))
+    url = "https://docs.rama/auto.pdf"
+    store.put(url, pdf, "0" * 64, "application/pdf")
+    monkeypatch.setattr(document_extractor, "document_store", store)
+    try:
+        assert asyncio.run(document_extractor.extract_document_text(url))
+        assert store.lookup(url, document_extractor.EXTRACTOR_VERSION).text is None
+    finally:
+        store.close()
+
+
+def test_capa_de_texto_fuera_del_event_loop(monkeypatch, pdf):
+    hilos = []
+    original = document_extractor.extract_pdf_pages
+
+    def extraer(path):
+        hilos.append(threading.current_thread())
+        return original(path)
+
+    monkeypatch.setattr(document_extractor, "extract_pdf_pages", extraer)
+    text, method, complete = _extract(pdf, use_ocr=False)
+    assert text and hilos and hilos[0] is not threading.main_thread()
+
+
+def test_ocr_completo_cuenta_las_paginas(monkeypatch, pdf):
+    monkeypatch.setattr(document_extractor, "extract_pdf_pages", lambda path: None)
+    monkeypatch.setattr(document_extractor, "page_paths", dict.fromkeys(document_extractor.page_paths, 0))
+    _ocr(monkeypatch, lambda pages: OcrResult([
+        PageText(1, "texto reconocido", 1.0, 1.0),
+        PageText(2, "", 1.0, 1.0),
+        PageText(3, "", 0.0, 0.0, "tesseract falló"),
+    ]))
+    text, method, complete = _extract(pdf)
+    assert text == "texto reconocido" and method == "ocr" and not complete
+    assert document_extractor.page_paths == {
+        "documents": 1, "text_layer": 0, "ocr": 1, "weak_text_layer": 0, "empty": 2,
+    }
+
+
+def _iterar(path, use_ocr=True, paginas=None):
+    async def run():
+        result = []
+        async for page in document_extractor.iter_document_pages(path, use_ocr):
+            result.append(page)
+            if paginas and len(result) == paginas:
+                break
+        return result
+    return asyncio.run(run())
+
+
+def test_paginas_extraidas_en_hilos_y_parada_temprana(monkeypatch, pdf):
+    llamadas = []
+    original = document_extractor._page_texts
+
+    def extraer(pages, start, stop):
+        llamadas.append((start, stop, threading.current_thread() is threading.main_thread()))
+        return original(pages, start, stop)
+
+    monkeypatch.setattr(document_extractor, "_page_texts", extraer)
+    [page] = _iterar(pdf, paginas=1)
+    assert page.number == 1 and page.method == "pdf"
+    # Solo se extrajo la página leída, fuera del hilo del event loop
+    assert llamadas == [(0, 1, False)]
+
+
+def test_paginas_con_ocr_en_tanda(monkeypatch, pdf):
+    _ocr(monkeypatch, lambda pages: OcrResult([PageText(p, "texto reconocido", 1.0, 1.0) for p in pages]))
+    pages = _iterar(pdf)
+    assert [(p.number, p.method) for p in pages] == [(1, "pdf"), (2, "ocr"), (3, "pdf")]
+    assert pages[1].text == "texto reconocido" and TEXTO in pages[2].text
@@ -0,0 +1,80 @@
+"""Almacén de documentos con el índice bloqueado por otro worker."""
+
+import asyncio
+import hashlib
+import sqlite3
+
+import pytest
+
+from src.analyzers import document_extractor
+from src.analyzers.document_extractor import DownloadedDocument
+from src.storage.document_store import DocumentStore
+
+URL = "https://docs.rama/auto.pdf"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DocumentStore(tmp_path / "almacen", busy_timeout=0.05)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def bloqueo(store):
+    """Otra conexión (otro worker) con el bloqueo de escritura tomado."""
+    conn = sqlite3.connect(str(store.directory / "index.sqlite3"), isolation_level=None)
+
+    def tomar():
+        conn.execute("BEGIN IMMEDIATE")
+
+    yield tomar
+    if conn.in_transaction:
+        conn.execute("ROLLBACK")
+    conn.close()
+
+
+def _descargado(store, contenido=b"%PDF-1.4 contenido"):
+    path = store.staging / "descarga.pdf"
+    path.write_bytes(contenido)
+    return path, hashlib.sha256(contenido).hexdigest()
+
+
+def test_put_bloqueado_no_mueve_el_archivo(store, bloqueo):
+    path, sha256 = _descargado(store)
+    bloqueo()
+    with pytest.raises(sqlite3.OperationalError):
+        store.put(URL, path, sha256)
+    assert path.exists()
+    assert store.stats()["entries"] == 0 and not list(store.objects.rglob(sha256))
+
+
+def test_lookup_bloqueado_sigue_respondiendo(store, bloqueo):
+    path, sha256 = _descargado(store)
+    stored = store.put(URL, path, sha256)
+    store.put_text(sha256, "1", "pdf", "texto", 0.5)
+    bloqueo()
+    found = store.lookup(URL, "1")
+    assert found and found.path == stored and found.text == "texto"
+    with pytest.raises(sqlite3.OperationalError):
+        store.put_text(sha256, "2", "pdf", "otro", 0.5)
+    assert store.stats()["bytes"] == len(b"%PDF-1.4 contenido") + len("texto")
+
+
+def test_extraccion_sigue_sin_almacen_si_esta_bloqueado(store, bloqueo, monkeypatch):
+    path, sha256 = _descargado(store)
+
+    async def descargar(url, directory=None, **kwargs):
+        return DownloadedDocument(url, path, path.stat().st_size, sha256)
+
+    async def extraer(pdf_path, use_ocr):
+        assert pdf_path == path
+        return "texto del auto", "pdf", True
+
+    monkeypatch.setattr(document_extractor, "document_store", store)
+    monkeypatch.setattr(document_extractor, "download_document_to_file", descargar)
+    monkeypatch.setattr(document_extractor, "_extract_pages", extraer)
+    bloqueo()
+    assert asyncio.run(document_extractor.extract_document_text(URL)) == "texto del auto"
+    # Sin almacén el archivo descargado se borra al terminar
+    assert not path.exists()
@@ -0,0 +1,56 @@
+"""Pool HTTP de Rama: reemplazo del cliente al cambiar de event loop."""
+
+import asyncio
+import threading
+
+from src.clients.http_pool import RamaHttpPool
+
+
+async def _cliente(pool):
+    return pool.client()
+
+
+def test_mismo_loop_reutiliza_el_cliente():
+    pool = RamaHttpPool(http2=False)
+
+    async def run():
+        return pool.client(), pool.client()
+
+    first, second = asyncio.run(run())
+    assert first is second and pool.clients_created == 1
+    asyncio.run(pool.aclose())
+
+
+def test_loop_nuevo_cierra_el_cliente_anterior():
+    pool = RamaHttpPool(http2=False)
+    old = asyncio.run(_cliente(pool))
+
+    async def run():
+        client = pool.client()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return client
+
+    new = asyncio.run(run())
+    assert new is not old
+    assert old.is_closed and not new.is_closed
+    assert pool.stats()["clients_replaced"] == 1
+    asyncio.run(pool.aclose())
+
+
+def test_loop_anterior_vivo_cierra_en_su_hilo():
+    pool = RamaHttpPool(http2=False)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        old = asyncio.run_coroutine_threadsafe(_cliente(pool), loop).result(5)
+        new = asyncio.run(_cliente(pool))
+        # El cierre corre en el loop del hilo; esperar a que lo procese
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), loop).result(5)
+        assert old.is_closed and new is not old
+        asyncio.run(pool.aclose())
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
@@ -0,0 +1,82 @@
+"""Clasificación de autos por páginas (``IncrementalAutoClassifier``)."""
+
+import random
+
+from src.analyzers.auto_classifier import AutoType, IncrementalAutoClassifier, classify_auto
+
+FRASES = [
+    "Procede el Despacho a pronunciarse sobre el escrito allegado",
+    "contestar la demanda",
+    "dentro de los diez días siguientes",
+    "no interponer los recursos",
+    "producirá los efectos de ley",
+    "Téngase por notificado por conducta concluyente",
+    "Agréguese al expediente",
+    "RESUELVE: PRIMERO",
+    "so pena de rechazo",
+    "en el término de 5 días",
+    "NOTIFÍQUESE Y CÚMPLASE",
+    "Anexo: poder especial otorgado al apoderado",
+]
+
+
+def _leer(paginas):
+    classifier = IncrementalAutoClassifier()
+    for pagina in paginas:
+        classifier.feed(pagina)
+    return classifier
+
+
+def _completo(paginas):
+    auto_type = classify_auto("\n".join(paginas))
+    resultado = _leer(paginas).result()
+    return auto_type, resultado
+
+
+def test_patrones_con_comodin_entre_paginas():
+    relleno = " ".join(["texto de relleno sin palabras clave"] * 20)
+    paginas = [
+        f"Se ordena contestar la demanda. {relleno}",
+        f"{relleno} dentro de los diez días. {relleno} Advertir que no interponer recursos {relleno}",
+        f"{relleno} producirá la firmeza de la providencia.",
+    ]
+    auto_type, (incremental, _) = _completo(paginas)
+    assert auto_type == AutoType.PERENTORIO
+    assert incremental == auto_type
+
+
+def test_lectura_completa_equivale_a_classify_auto():
+    rng = random.Random(0)
+    relleno = " texto de relleno" * 30
+    for _ in range(300):
+        paginas = [
+            " ".join(rng.choice(FRASES) + (relleno if rng.random() < 0.3 else "")
+                     for _ in range(rng.randint(0, 4)))
+            for _ in range(rng.randint(1, 6))
+        ]
+        auto_type, (incremental, confidence) = _completo(paginas)
+        assert incremental == auto_type, paginas
+        if auto_type == AutoType.UNKNOWN:
+            assert confidence == 0.0
+
+
+def test_documento_vacio():
+    assert _leer([]).result() == (AutoType.UNKNOWN, 0.0)
+    assert _leer(["", "   "]).result() == (AutoType.UNKNOWN, 0.0)
+
+
+def test_parada_por_seccion_resolutiva():
+    classifier = _leer([
+        "Procede el Despacho a pronunciarse. RESUELVE: PRIMERO: Agréguese al expediente",
+        "SEGUNDO: Téngase por notificado. NOTIFÍQUESE Y CÚMPLASE",
+    ])
+    assert classifier.operative_done and classifier.done
+    assert classifier.result()[0] == AutoType.TRAMITE
+
+
+def test_parada_por_confianza():
+    classifier = _leer([
+        "Requiérase a la parte en el término de 5 días so pena de rechazo, bajo apercibimiento",
+    ])
+    assert classifier.confident and not classifier.operative_done
+    assert classifier.result() == (AutoType.PERENTORIO, 1.0)
@@ -0,0 +1,58 @@
+"""``KeywordMatcher`` encuentra los mismos patrones que un ``re.search`` por patrón."""
+
+import random
+import re
+
+import pytest
+
+from benchmarks.corpus import LABELED_ACTUACIONES
+from src.analyzers.auto_classifier import KEYWORD_MATCHER, PERENTORIO_FOLDED, TRAMITE_FOLDED
+from src.analyzers.keyword_matcher import KeywordMatcher
+from src.analyzers.text_canon import canonicalize
+
+
+def _expected(matcher, text):
+    return {i for i, pattern in enumerate(matcher.patterns) if re.search(pattern, text)}
+
+
+def _texts():
+    rng = random.Random(0)
+    texts = [canonicalize(f"{tipo} {descripcion}") for tipo, descripcion, _ in LABELED_ACTUACIONES]
+    words = " ".join(texts).split()
+    fragments = [p.replace("\\s+", " ").replace("\\b", "") for p in PERENTORIO_FOLDED + TRAMITE_FOLDED]
+    # Mezclas de palabras clave (solapadas, repetidas, pegadas) con ruido
+    for _ in range(500):
+        parts = rng.sample(words, 2)
+        parts += rng.sample(fragments, rng.randint(1, 4))
+        rng.shuffle(parts)
+        texts.append(rng.choice((" ", "", ", ")).join(parts))
+    return texts
+
+
+def test_equivalente_al_clasificador():
+    for text in _texts():
+        assert KEYWORD_MATCHER.hits(text) == _expected(KEYWORD_MATCHER, text), text
+
+
+def test_counts_por_etiqueta():
+    matcher = KeywordMatcher({"a": [r"plazo", r"plazo\s+de\s+\d+"], "b": [r"traslado"]})
+    assert matcher.counts("corre traslado en el plazo de 5 dias") == {"a": 2, "b": 1}
+    assert matcher.counts("nada") == {"a": 0, "b": 0}
+
+
+@pytest.mark.parametrize("text", [
+    "termino de 5 dias",
+    "terminos",
+    "ab abc abcd",
+    "xabcdx",
+])
+def test_prefijos_comunes_y_conflictos(text):
+    matcher = KeywordMatcher({"x": ["ab", "abc", r"abc\w", r"termino\b", r"termino(?:s)?"], "y": [r"a(?:b|c)", "b"]})
+    assert matcher.hits(text) == _expected(matcher, text)
+
+
+def test_minusculas_con_equivalencia_ignorecase():
+    matcher = KeywordMatcher({"x": ["Traslado", "si"]})
+    assert matcher.hits("traslado") == {0}
+    # "ı" y "ſ" se igualan como haría IGNORECASE
+    assert matcher.hits("ſı") == {1}
@@ -0,0 +1,76 @@
+"""Recuperación del pool de OCR cuando un proceso muere."""
+
+import asyncio
+import sys
+import types
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.analyzers import ocr_engine as module
+from src.analyzers.ocr_engine import OcrEngine
+
+
+class FakePool(Executor):
+    """Pool que se rompe tras ``breaks_after`` tareas (None = nunca).
+
+    ``breaks_after`` se toma del atributo de clase al crearlo.
+    """
+
+    created = []
+    breaks_after = None
+
+    def __init__(self, max_workers=None, initializer=None):
+        self.broken = False
+        self.tasks = 0
+        self.breaks_after = type(self).breaks_after
+        self.shut_down = False
+        FakePool.created.append(self)
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.tasks += 1
+        if self.broken or (self.breaks_after is not None and self.tasks > self.breaks_after):
+            self.broken = True
+            future.set_exception(BrokenProcessPool("un proceso terminó de forma abrupta"))
+        else:
+            _, page, _, _ = args
+            future.set_result((f"pagina {page}", 1.0, 1.0))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pytesseract", types.ModuleType("pytesseract"))
+    monkeypatch.setattr(module, "ProcessPoolExecutor", FakePool)
+    FakePool.created = []
+    FakePool.breaks_after = None
+    return FakePool
+
+
+def test_pool_roto_se_recrea_y_reintenta(pools):
+    pools.breaks_after = 2
+    engine = OcrEngine(workers=2, max_inflight=4)
+    engine._get_pool()
+    pools.breaks_after = None
+    result = asyncio.run(engine.ocr("auto.pdf", pages=[1, 2, 3, 4, 5]))
+    assert [p.text for p in result.pages] == [f"pagina {n}" for n in range(1, 6)]
+    assert result.errors == 0
+    assert engine.pool_restarts == 1
+    assert pools.created[0].shut_down and engine._pool is pools.created[1]
+
+
+def test_pool_que_vuelve_a_romperse(pools):
+    pools.breaks_after = 0
+    engine = OcrEngine(workers=1, max_inflight=1)
+    result = asyncio.run(engine.ocr("auto.pdf", pages=[1]))
+    assert result.errors == 1 and result.pages[0].error
+    # El siguiente documento no hereda el pool roto
+    assert engine._pool is None
+    pools.breaks_after = None
+    result = asyncio.run(engine.ocr("auto.pdf", pages=[1]))
+    assert result.errors == 0 and engine.pool_restarts == 2
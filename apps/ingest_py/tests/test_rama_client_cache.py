@@ -0,0 +1,164 @@
+"""Single-flight, stale-while-revalidate y cache negativo de ``fetch_proceso_completo_safe``."""
+
+import asyncio
+
+import pytest
+
+from src.clients import rama_client
+from src.clients.resilience import CircuitBreakerGroup, SimpleCache, SingleFlight
+from src.normalizers import compact
+
+RADICADO = "11001310300320230012300"
+
+
+class Upstream:
+    """API simulada: cuenta las consultas y puede tardar o no encontrar el proceso."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.found = True
+        self.delay = 0.0
+        self.fail = False
+
+    async def fetch_by_radicado(self, radicado, max_retries=3, rate_limiter=None):
+        self.consultas += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream caído")
+        if not self.found:
+            return {"procesos": []}
+        return {"procesos": [{"idProceso": 7, "llaveProceso": radicado, "despacho": "JUZGADO 3"}]}
+
+    async def fetch_actuaciones(self, id_proceso, max_retries=3, rate_limiter=None):
+        return {"actuaciones": [{
+            "consActuacion": self.consultas, "fechaActuacion": "2024-01-01",
+            "actuacion": "Auto", "anotacion": f"consulta {self.consultas}",
+        }]}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    upstream = Upstream()
+    monkeypatch.setattr(rama_client, "fetch_by_radicado", upstream.fetch_by_radicado)
+    monkeypatch.setattr(rama_client, "fetch_actuaciones", upstream.fetch_actuaciones)
+    monkeypatch.setattr(rama_client, "rama_cache", SimpleCache(encode=compact.encode, decode=compact.decode))
+    monkeypatch.setattr(rama_client, "proceso_flight", SingleFlight("proceso"))
+    monkeypatch.setattr(rama_client, "actuaciones_flight", SingleFlight("actuaciones"))
+    monkeypatch.setattr(rama_client, "rama_circuit", CircuitBreakerGroup("test", policies={
+        "other": {"failure_threshold": 1, "open_duration": 60},
+    }))
+    monkeypatch.setattr(rama_client, "SAFE_FRESH_SECONDS", 300)
+    return upstream
+
+
+def _age(key, seconds):
+    rama_client.rama_cache._cache[key].timestamp -= seconds
+
+
+def test_llamadas_concurrentes_comparten_la_consulta(upstream):
+    upstream.delay = 0.05
+
+    async def run():
+        return await asyncio.gather(*(rama_client.fetch_proceso_completo_safe(RADICADO) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert upstream.consultas == 1
+    assert all(r == results[0] for r in results) and results[0]["acts"]
+
+
+def test_cancelar_un_solicitante_no_cancela_la_consulta(upstream):
+    upstream.delay = 0.05
+
+    async def run():
+        first = asyncio.ensure_future(rama_client.fetch_proceso_completo_safe(RADICADO))
+        second = asyncio.ensure_future(rama_client.fetch_proceso_completo_safe(RADICADO))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run())["acts"]
+    assert upstream.consultas == 1
+
+
+def test_single_flight_propaga_errores_y_libera_la_clave():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("fallo")
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+        assert not flight.in_flight("k")
+        return results
+
+    results = asyncio.run(run())
+    assert len(calls) == 1 and all(isinstance(r, ValueError) for r in results)
+
+
+def test_dato_fresco_se_sirve_sin_consultar(upstream):
+    first = asyncio.run(rama_client.fetch_proceso_completo_safe(RADICADO))
+    again = asyncio.run(rama_client.fetch_proceso_completo_safe(RADICADO))
+    assert upstream.consultas == 1 and again == first
+
+
+def test_dato_vencido_se_sirve_y_se_refresca_una_vez(upstream):
+    asyncio.run(rama_client.fetch_proceso_completo_safe(RADICADO))
+    _age(f"last_good:{RADICADO}", 301)
+
+    async def run():
+        upstream.delay = 0.02
+        stale = await asyncio.gather(*(rama_client.fetch_proceso_completo_safe(RADICADO) for _ in range(5)))
+        # Cinco lecturas vencidas, un solo refresco en curso
+        assert upstream.consultas == 2 and rama_client.proceso_flight.in_flight(RADICADO)
+        await asyncio.sleep(0.1)
+        return stale, await rama_client.fetch_proceso_completo_safe(RADICADO)
+
+    stale, fresh = asyncio.run(run())
+    assert all(s["acts"][0]["anotacion"] == "consulta 1" for s in stale)
+    assert upstream.consultas == 2
+    assert fresh["acts"][0]["anotacion"] == "consulta 2"
+
+
+def test_sin_ventana_de_frescura_siempre_consulta(upstream, monkeypatch):
+    monkeypatch.setattr(rama_client, "SAFE_FRESH_SECONDS", 0)
+    asyncio.run(rama_client.fetch_proceso_completo_safe(RADICADO))
+    asyncio.run(rama_client.fetch_proceso_completo_safe(RADICADO))
+    assert upstream.consultas == 2
+
+
+def test_upstream_caido_sirve_el_ultimo_dato_bueno(upstream):
+    first = asyncio.run(rama_client.fetch_proceso_completo_safe(RADICADO))
+    _age(f"last_good:{RADICADO}", 301)
+    upstream.fail = True
+
+    async def run():
+        served = await rama_client.fetch_proceso_completo_safe(RADICADO)
+        await asyncio.sleep(0.05)  # Refresco en segundo plano (falla)
+        return served
+
+    assert asyncio.run(run()) == first
+    assert rama_client.rama_circuit.is_open()
+
+
+def test_radicado_inexistente_se_cachea_sin_abrir_el_breaker(upstream):
+    upstream.found = False
+    result = asyncio.run(rama_client.fetch_proceso_completo_safe(RADICADO))
+    assert rama_client.is_not_found(result)
+    again = asyncio.run(rama_client.fetch_proceso_completo_safe(RADICADO))
+    assert again == result and upstream.consultas == 1
+    assert not rama_client.rama_circuit.is_open()
+    # Solo vive en memoria y con su propio TTL
+    entry = rama_client.rama_cache._cache[f"not_found:{RADICADO}"]
+    assert entry.ttl == rama_client.NOT_FOUND_TTL_SECONDS
+
+
+def test_cache_negativo_vence(upstream):
+    upstream.found = False
+    asyncio.run(rama_client.fetch_proceso_completo_safe(RADICADO))
+    _age(f"not_found:{RADICADO}", rama_client.NOT_FOUND_TTL_SECONDS + 1)
+    upstream.found = True
+    result = asyncio.run(rama_client.fetch_proceso_completo_safe(RADICADO))
+    assert not rama_client.is_not_found(result) and upstream.consultas == 2
@@ -0,0 +1,77 @@
+"""Normalización incremental de actuaciones (``previous_acts``)."""
+
+import copy
+
+import pytest
+
+from benchmarks.corpus import synthetic_case
+from src.normalizers.rama import normalize_rama_response
+
+
+def _refresh(proceso, actuaciones, previous_acts):
+    full = normalize_rama_response(proceso, actuaciones)["acts"]
+    incremental = normalize_rama_response(proceso, actuaciones, previous_acts=previous_acts)["acts"]
+    assert incremental == full
+    return incremental
+
+
+@pytest.fixture
+def case():
+    proceso, actuaciones = synthetic_case(200, seed=3)
+    previous = normalize_rama_response(proceso, actuaciones)["acts"]
+    return proceso, actuaciones, previous
+
+
+def _nueva(actuaciones, cons):
+    act = dict(actuaciones["actuaciones"][0], consActuacion=cons, idRegActuacion=cons)
+    act["anotacion"] = f"Auto que requiere a la parte - {cons}"
+    return act
+
+
+@pytest.mark.parametrize("newest_first", [True, False])
+def test_actuaciones_nuevas(case, newest_first):
+    proceso, actuaciones, previous = case
+    actuaciones = copy.deepcopy(actuaciones)
+    acts = actuaciones["actuaciones"]
+    acts[:0] = [_nueva(actuaciones, 202), _nueva(actuaciones, 201)]
+    if not newest_first:
+        acts.reverse()
+        previous = previous[::-1]
+    result = _refresh(proceso, actuaciones, previous)
+    assert len(result) == 202
+
+
+@pytest.mark.parametrize("newest_first", [True, False])
+@pytest.mark.parametrize("campo,valor", [
+    ("fechaFinal", "2030-01-01"),
+    ("conDocumentos", True),
+    ("documentoUrl", "https://docs.rama/nuevo.pdf"),
+])
+def test_campo_corregido_en_actuacion_antigua(case, newest_first, campo, valor):
+    """Campos fuera de ``uniq_key`` corregidos en actuaciones de la cola."""
+    proceso, actuaciones, previous = case
+    actuaciones = copy.deepcopy(actuaciones)
+    acts = actuaciones["actuaciones"]
+    acts.insert(0, _nueva(actuaciones, 201))
+    acts[150][campo] = valor
+    if not newest_first:
+        acts.reverse()
+        previous = previous[::-1]
+    result = _refresh(proceso, actuaciones, previous)
+    changed = [a for a in result if a["cons_actuacion"] == acts[150 if newest_first else -151]["consActuacion"]]
+    assert changed[0][{"fechaFinal": "fecha_final", "conDocumentos": "con_documentos",
+                       "documentoUrl": "documento_url"}[campo]] == valor
+
+
+def test_ancla_con_campo_corregido(case):
+    proceso, actuaciones, previous = case
+    actuaciones = copy.deepcopy(actuaciones)
+    actuaciones["actuaciones"][0]["fechaFinal"] = "2030-01-01"
+    result = _refresh(proceso, actuaciones, previous)
+    assert result[0]["fecha_final"] == "2030-01-01"
+
+
+def test_sin_cambios_reutiliza_la_lista(case):
+    proceso, actuaciones, previous = case
+    result = _refresh(proceso, actuaciones, previous)
+    assert all(a is b for a, b in zip(result, previous))
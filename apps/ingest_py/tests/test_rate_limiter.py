@@ -0,0 +1,53 @@
+"""Presupuesto de peticiones al host: un token por intento y entre event loops."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.clients import ramajud
+from src.utils.rate import RateLimiter
+
+
+class Contador(RateLimiter):
+    def __init__(self):
+        super().__init__(rate=1000)
+        self.tokens_tomados = 0
+
+    async def acquire(self):
+        self.tokens_tomados += 1
+        await super().acquire()
+
+
+@pytest.fixture
+def upstream_caido(monkeypatch):
+    async def get(url, **kwargs):
+        raise httpx.ConnectError("sin conexión")
+
+    async def sleep(delay):
+        pass
+
+    monkeypatch.setattr(ramajud.rama_http, "get", get)
+    monkeypatch.setattr(ramajud.asyncio, "sleep", sleep)
+
+
+@pytest.mark.parametrize("fetch, arg", [
+    (ramajud.fetch_by_radicado, "11001310300320230012300"),
+    (ramajud.fetch_actuaciones, 7),
+])
+def test_cada_reintento_toma_un_token(upstream_caido, fetch, arg):
+    limiter = Contador()
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(fetch(arg, max_retries=3, rate_limiter=limiter))
+    assert limiter.tokens_tomados == 3
+
+
+def test_limitador_global_sirve_en_varios_event_loops():
+    # Con un solo token, las llamadas concurrentes compiten por el lock
+    limiter = RateLimiter(rate=200, capacity=1)
+
+    async def run():
+        await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+
+    asyncio.run(run())
+    asyncio.run(run())
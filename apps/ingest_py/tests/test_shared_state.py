@@ -0,0 +1,110 @@
+"""Almacén compartido entre workers: contadores y breakers."""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.clients import resilience
+from src.clients.resilience import OPEN, SimpleCircuitBreaker
+from src.storage.shared_state import SharedStateStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "shared.sqlite3")
+
+
+def test_worker_apagado_no_suma(path):
+    store = SharedStateStore(path)
+    store.publish_counters({"requests": 5})
+    assert store.aggregate_counters() == {"counters": {"requests": 5}, "workers": 1}
+    store.remove_worker()
+    assert store.aggregate_counters() == {"counters": {}, "workers": 0}
+
+
+def test_worker_que_deja_de_publicar_caduca(path):
+    store = SharedStateStore(path, worker_ttl=0.2)
+    store.publish_counters({"requests": 5})
+    assert store.aggregate_counters()["workers"] == 1
+    time.sleep(0.3)
+    assert store.aggregate_counters() == {"counters": {}, "workers": 0}
+
+
+def test_lecturas_desde_la_copia_en_memoria(path):
+    worker_a = SharedStateStore(path, snapshot_max_age=60)
+    worker_b = SharedStateStore(path, snapshot_max_age=60)
+    assert worker_a.load_breaker("rama") is None
+    worker_b.update_breaker("rama", lambda st: {"state": OPEN})
+    # Sin refrescar, A sigue viendo su copia; el refresco trae el cambio
+    assert worker_a.load_breaker("rama") is None
+    worker_a.refresh_breakers()
+    assert worker_a.load_breaker("rama") == {"state": OPEN}
+    # Sus propias escrituras se ven al momento
+    worker_a.update_breaker("rama", lambda st: {**st, "failures": 1})
+    assert worker_a.load_breaker("rama") == {"state": OPEN, "failures": 1}
+
+
+def test_copia_caducada_se_refresca_en_linea(path):
+    worker_a = SharedStateStore(path, snapshot_max_age=0)
+    worker_b = SharedStateStore(path)
+    worker_b.update_breaker("rama", lambda st: {"state": OPEN})
+    assert worker_a.load_breaker("rama") == {"state": OPEN}
+
+
+def test_archivo_bloqueado_no_bloquea_el_breaker(path):
+    store = SharedStateStore(path, busy_timeout=0.05)
+    breaker = SimpleCircuitBreaker(failure_threshold=1, name="rama", shared=store)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.perf_counter()
+        with pytest.raises(sqlite3.OperationalError):
+            store.update_breaker("rama", lambda st: st)
+        breaker.record_failure()
+        assert time.perf_counter() - start < 1
+        # El fallo se aplicó al estado local
+        assert breaker.state == OPEN and breaker.is_open()
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+
+def test_tras_fork_no_hereda_el_lock_tomado(path):
+    store = SharedStateStore(path, snapshot_max_age=60)
+    store.update_breaker("rama", lambda st: {"state": OPEN})
+    inherited = store._lock
+    # Como si otro hilo del padre tuviera el lock al hacer fork
+    inherited.acquire()
+    store.pid = -1
+    try:
+        store.publish_counters({"requests": 1})
+        assert store._lock is not inherited
+        assert store.aggregate_counters()["counters"] == {"requests": 1}
+        # La copia de los breakers se descarta y se vuelve a leer en el hijo
+        assert store._breakers == {}
+        assert store.load_breaker("rama") == {"state": OPEN}
+    finally:
+        inherited.release()
+
+
+def test_collect_metrics_usa_sqlite_en_un_hilo(path, monkeypatch):
+    store = SharedStateStore(path)
+    threads = []
+    original = store.publish_counters
+
+    def publish(counters):
+        threads.append(threading.get_ident())
+        original(counters)
+
+    monkeypatch.setattr(store, "publish_counters", publish)
+    monkeypatch.setattr(resilience, "shared_state", store)
+
+    async def collect():
+        return await resilience.collect_metrics(), threading.get_ident()
+
+    data, loop_thread = asyncio.run(collect())
+    assert data["workers"] == 1
+    assert threads and loop_thread not in threads
@@ -0,0 +1,66 @@
+"""``SimpleCache``: desalojo LRU por entradas y por presupuesto de bytes."""
+
+import time
+
+from src.clients.resilience import SimpleCache, _approx_size
+
+
+def _value(n):
+    return {"data": "x" * n}
+
+
+def test_desaloja_por_bytes_en_orden_lru():
+    size = _approx_size(_value(100))
+    cache = SimpleCache(max_entries=100, max_bytes=3 * size)
+    for key in "abc":
+        cache.set(key, _value(100))
+    assert cache.size_bytes == 3 * size
+    cache.get("a")  # "b" pasa a ser la menos usada
+    cache.set("d", _value(100))
+    assert set(cache._cache) == {"a", "c", "d"}
+    assert cache.evictions["bytes"] == 1 and cache.size_bytes == 3 * size
+
+
+def test_una_entrada_grande_desaloja_varias():
+    small = _approx_size(_value(100))
+    cache = SimpleCache(max_entries=100, max_bytes=4 * small)
+    for key in "abcd":
+        cache.set(key, _value(100))
+    cache.set("big", _value(2 * small))
+    assert "big" in cache._cache and cache.size_bytes <= cache.max_bytes
+    assert cache.evictions["bytes"] == 3
+
+
+def test_entrada_mayor_que_el_presupuesto_no_se_guarda():
+    cache = SimpleCache(max_bytes=50)
+    cache.set("a", _value(10))
+    cache.set("big", _value(100))
+    assert "big" not in cache._cache and "a" in cache._cache
+
+
+def test_desaloja_por_entradas():
+    cache = SimpleCache(max_entries=2)
+    for key in "abc":
+        cache.set(key, _value(1))
+    assert list(cache._cache) == ["b", "c"] and cache.evictions["lru"] == 1
+
+
+def test_reemplazo_actualiza_los_bytes():
+    cache = SimpleCache()
+    cache.set("a", _value(100))
+    cache.set("a", _value(10))
+    assert cache.size_bytes == _approx_size(_value(10))
+    cache.clear("a")
+    assert cache.size_bytes == 0
+
+
+def test_expiracion_y_ttl_propio():
+    cache = SimpleCache(ttl=100)
+    cache.set("largo", _value(1))
+    cache.set("corto", _value(1), ttl=10)
+    cache._cache["largo"].timestamp -= 50
+    cache._cache["corto"].timestamp -= 50
+    assert cache.get("largo") is not None
+    assert cache.get("corto") is None and cache.evictions["expired"] == 1
+    cache._cache["largo"].timestamp = time.time() - 101
+    assert cache.sweep() == 1 and cache.size_bytes == 0
@@ -0,0 +1,48 @@
+"""Motor vectorial del clasificador de autos (``engine="vector"``)."""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.analyzers.auto_classifier import analyze_actuacion, batch_analyze  # noqa: E402
+
+SIN_PALABRAS_CLAVE = [
+    {"tipo": "Memorial", "descripcion": "allegado por la parte"},
+    {"tipo": "", "descripcion": ""},
+    {"tipo": "Constancia secretarial", "descripcion": None},
+]
+
+
+@pytest.mark.parametrize("act", SIN_PALABRAS_CLAVE)
+def test_actuacion_sin_palabras_clave(act):
+    result = analyze_actuacion(act, engine="vector")
+    assert result["is_auto"] is False
+    assert result["auto_type"] is None
+
+
+def test_lote_vacio():
+    assert batch_analyze([], engine="vector") == []
+
+
+def test_lote_sin_palabras_clave():
+    results = batch_analyze(SIN_PALABRAS_CLAVE, engine="vector")
+    assert [r["is_auto"] for r in results] == [False, False, False]
+
+
+def test_lote_mixto_coincide_con_reglas():
+    acts = SIN_PALABRAS_CLAVE + [
+        {"tipo": "Auto requiere", "descripcion": "Requiérase a la parte en el término de 5 días"},
+        {"tipo": "Auto", "descripcion": "Téngase por notificado por conducta concluyente"},
+    ]
+    vector = batch_analyze(acts, engine="vector")
+    rules = batch_analyze(acts, engine="rules")
+    assert [r["auto_type"] for r in vector] == [r["auto_type"] for r in rules]
+    assert vector[3]["auto_type"] == "perentorio"
+    assert vector[4]["auto_type"] == "tramite"
+
+
+def test_raiz_corta_diverge_de_las_reglas():
+    """Divergencia documentada: ``requieren`` comparte raíz con ``requiera``."""
+    act = {"tipo": "Auto", "descripcion": "Se requieren los documentos"}
+    assert analyze_actuacion(act, engine="rules")["auto_type"] == "unknown"
+    assert analyze_actuacion(act, engine="vector")["auto_type"] == "perentorio"